@@ -1,8 +1,13 @@
+import os
 import sys
+from functools import lru_cache
 from random import randrange
+from secrets import randbelow
 from math import isqrt
+from mife.parallel import parallel_map
 from mife.data.matrix import Matrix
-from Crypto.Util.number import getPrime, isPrime, getStrongPrime as getStrongPrimeCrypto
+from mife.data.mod_matrix import ModMatrix, NotInvertibleError
+from Crypto.Util.number import getPrime, isPrime
 
 
 def inner_product(x, y, identity=0):
@@ -19,6 +24,77 @@ def inner_product(x, y, identity=0):
     return sum([x[i] * y[i] for i in range(len(x))], start=identity)
 
 
+def sparse_vector(y):
+    """
+    Sparse representation of a coefficient vector
+
+    :param y: Coefficient vector
+    :return: [(index, coefficient)] for the nonzero coefficients
+    """
+    return [(i, y[i]) for i in range(len(y)) if y[i] != 0]
+
+
+def small_mul(elem, k):
+    """
+    Multiply a group element by an integer, coefficients +-1 take a copy or a negation
+    instead of a full scalar multiplication
+
+    :param elem: Group element
+    :param k: Coefficient
+    :return: k * elem
+    """
+    if k == 1:
+        return elem
+    if k == -1:
+        return -elem
+    return k * elem
+
+
+def sparse_inner_product(x, y_sparse, identity):
+    """
+    Compute the inner product of group elements with a sparse coefficient vector,
+    the cost is proportional to the number of nonzero coefficients
+
+    :param x: Vector of group elements
+    :param y_sparse: Sparse coefficient vector from sparse_vector
+    :param identity: Identity element of the group
+    :return: Inner product of the two vectors
+    """
+    cul = identity
+    for i, k in y_sparse:
+        cul = cul + small_mul(x[i], k)
+    return cul
+
+
+def pack_ints(values, bits):
+    """
+    Pack non-negative integers below 2^bits into bytes, bits per value with no padding
+
+    :param values: Integers in [0, 2^bits)
+    :param bits: Bit width of every value
+    :return: ceil(len(values) * bits / 8) bytes, the first value in the lowest bits
+    """
+    if len(values) == 0:
+        return b""
+    packed = int("".join(format(int(v), f"0{bits}b") for v in reversed(values)), 2)
+    return packed.to_bytes((len(values) * bits + 7) // 8, "little")
+
+
+def unpack_ints(data, count, bits):
+    """
+    Inverse of pack_ints
+
+    :param data: Packed bytes
+    :param count: Number of values
+    :param bits: Bit width of every value
+    :return: List of count integers
+    """
+    if count == 0:
+        return []
+    s = format(int.from_bytes(data, "little"), f"0{count * bits}b")[-count * bits:]
+    return [int(s[i - bits:i], 2) for i in range(len(s), 0, -bits)]
+
+
 # Referenced from
 # https://github.com/sagemath/sagelib/blob/fd0c7c46e6a2da4b84df582e0da0333ce5cf79d9/sage/groups/generic.py#L824
 
@@ -90,28 +166,178 @@ def discrete_log_bound_brute(a, g, bounds):
     raise Exception(f"Discrete log for {a} under base {g} not found in bounds ({bounds[0]}, {bounds[1]})")
 
 
-def invertible_matrix(G, n):
+class DiscreteLogTable:
     """
-    Generate an invertible matrix
-    :param G: Field to use for the matrix
+    Baby-step table {j * g : j} for a fixed base g, grown on demand and reused across discrete logs.
+    If the elements provide a static compress_many(elems), the table is keyed on the compressed encodings.
+    """
+
+    def __init__(self, g):
+        self.g = g
+        self.keys = g.compress_many if hasattr(g, "compress_many") and callable(g.compress_many) \
+            else (lambda elems: elems)
+        self.table = {}
+        self.size = 0
+        self.cursor = 0 * g
+        self.giant = None
+
+    def extend(self, size: int, batch: int = 1024):
+        """
+        Grow the table to hold j * g for j in [0, size)
+
+        :param size: Number of baby steps
+        :param batch: Number of elements compressed at once
+        """
+        while self.size < size:
+            elems = []
+            for _ in range(min(batch, size - self.size)):
+                elems.append(self.cursor)
+                self.cursor = self.cursor + self.g
+            for j, key in enumerate(self.keys(elems), start=self.size):
+                self.table.setdefault(key, j)
+            self.size += len(elems)
+        self.giant = -(self.size * self.g)
+
+    def log(self, a, bounds):
+        """
+        Find the discrete log of a under base g within bounds using baby-step giant-step
+
+        :param a: Target element
+        :param bounds: Bounds for discrete log search
+        :return: Discrete log of a under base g
+        """
+        width = bounds[1] - bounds[0] + 1
+        if self.size * self.size < width:
+            self.extend(isqrt(width) + 1)
+
+        H = a - bounds[0] * self.g
+        for i in range(0, width, self.size):
+            j = self.table.get(self.keys([H])[0])
+            if j is not None and i + j < width:
+                return bounds[0] + i + j
+            H = H + self.giant
+        raise Exception(f"Discrete log for {a} under base {self.g} not found in bounds ({bounds[0]}, {bounds[1]})")
+
+
+@lru_cache(maxsize=4)
+def _discrete_log_table(g):
+    return DiscreteLogTable(g)
+
+
+def discrete_log_bound_table(a, g, bounds):
+    """
+    Find the discrete log of a under base g within bounds, using a baby-step table that is
+    cached for the last 4 bases. Callers that need more, or want to control the memory,
+    should keep their own DiscreteLogTable
+
+    :param a: Target element
+    :param g: Base element
+    :param bounds: Bounds for discrete log search
+    :return: Discrete log of a under base g
+    """
+    return _discrete_log_table(g).log(a, bounds)
+
+
+def invertible_mod_matrix(q, n):
+    """
+    Generate an invertible matrix modulo a prime, its LU factorisation is computed and cached
+    so inverse() and determinant() on the result do not factorise again
+    :param q: Prime modulus
     :param n: Dimension of the matrix
-    :return:
+    :return: ModMatrix
     """
     while True:
-        M = Matrix([[G(randrange(G.order())) for _ in range(n)] for _ in range(n)])
+        M = ModMatrix([randrange(q) for _ in range(n * n)], q, n, n)
         try:
-            M.inverse()
+            M.lu()
             return M
-        except:
+        except NotInvertibleError:
             pass
 
 
+def random_invertible_matrix(q, n):
+    """
+    Sample a uniformly random invertible matrix modulo a prime together with its inverse
+    and determinant (Randall's construction). The matrix is grown one dimension at a time
+    as M = L * N, with L unit lower triangular and N = [x; M'] where x is a uniform nonzero row and
+    M' the previous matrix with a zero column inserted at the first nonzero index of x.
+    Each step costs one modular inverse and O(n^2) operations on the previous inverse.
+    :param q: Prime modulus
+    :param n: Dimension of the matrix
+    :return: (M, M^-1, det(M)) with M and M^-1 as ModMatrix
+    """
+    M, M_inv, det = [], [], 1
+    for m in range(1, n + 1):
+        x = [0] * m
+        while not any(x):
+            x = [randbelow(q) for _ in range(m)]
+        t = [randbelow(q) for _ in range(m - 1)]
+        k = next(i for i in range(m) if x[i])
+        x_k_inv = pow(x[k], -1, q)
+        det = (-det if k % 2 else det) * x[k] % q
+
+        # Rows of M * N: x, then the rows of M' with a zero at column k plus t[i] * x
+        rows = [x]
+        for i in range(m - 1):
+            row = M[i][:k] + [0] + M[i][k:]
+            rows.append([(a + t[i] * b) % q for a, b in zip(row, x)])
+
+        # N^-1 keeps the rows of M'^-1 shifted by one column, row k solves x . z = b_0
+        w = x[:k] + x[k + 1:]
+        u = [0] * (m - 1)
+        for i in range(m - 1):
+            if w[i]:
+                u = [a + w[i] * b for a, b in zip(u, M_inv[i])]
+        inv = [[0] + r for r in M_inv]
+        inv.insert(k, [x_k_inv] + [-a * x_k_inv % q for a in u])
+
+        # M^-1 = N^-1 L^-1, only the first column changes
+        for r in inv:
+            r[0] = (r[0] - sum(a * b for a, b in zip(t, r[1:]))) % q
+
+        M, M_inv = rows, inv
+
+    return ModMatrix(M, q), ModMatrix(M_inv, q), det
+
+
+def invertible_matrix(G, n):
+    """
+    Generate an invertible matrix
+    :param G: Field to use for the matrix
+    :param n: Dimension of the matrix
+    :return:
+    """
+    return invertible_mod_matrix(G.order(), n).to_matrix(G)
+
+
 testprime = 146587529524709226584608678182150310560732245493607530424383103752420694008032314434746390098311798846676971705870171857700058048653275036770298161313862907341226267129457405778196507399731262315844287259617381602798205203902113141569063451666234258167808836110081803275293847197433918819959992552039357447043
 
+def cache_path(name):
+    """
+    :param name: File name
+    :return: Path of the file in the on-disk cache directory, $PYMIFE_CACHE or ~/.cache/pymife
+    """
+    directory = os.environ.get("PYMIFE_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "pymife"))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    return os.path.join(directory, name)
+
+
 def getStrongPrime(n):
     if 'unittest' in sys.modules:
         if n == 1024:
             return testprime
         return getPrime(n)
-    # in case of deprecation
-    return getStrongPrimeCrypto(n)
+    from mife.misc.primes import strong_primes
+    return strong_primes(n)[0]
+
+
+def getStrongPrimes(n, count):
+    """
+    :param n: Bit length of the primes
+    :param count: Number of primes
+    :return: count distinct primes, searched for in parallel (or taken from the prime cache if enabled)
+    """
+    if 'unittest' in sys.modules:
+        return [getPrime(n) for _ in range(count)]
+    from mife.misc.primes import strong_primes
+    return strong_primes(n, count)
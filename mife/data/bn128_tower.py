@@ -0,0 +1,408 @@
+from __future__ import annotations
+
+from typing import Tuple
+from gmpy2 import mpz, invert
+
+# Arithmetic over the BN254 (alt_bn128) extension tower used by the optimised pairing
+#
+#   Fp2  = Fp[u]  / (u^2 + 1)
+#   Fp6  = Fp2[v] / (v^3 - xi),  xi = 9 + u
+#   Fp12 = Fp6[w] / (w^2 - v)
+#
+# Elements are plain nested tuples of mpz, so that they are cheap to hash and pickle.
+# The py_ecc FQ12 representation Fp[w] / (w^12 - 18w^6 + 82) is the same field with
+# w^6 = xi, see from_fq12_coeffs / to_fq12_coeffs.
+#
+# References:
+# https://eprint.iacr.org/2010/354.pdf (Optimal ate pairing, tower arithmetic)
+# https://eprint.iacr.org/2008/490.pdf (Final exponentiation addition chain)
+# https://eprint.iacr.org/2009/565.pdf (Granger-Scott cyclotomic squaring)
+
+Fp2 = Tuple[mpz, mpz]
+Fp6 = Tuple[Fp2, Fp2, Fp2]
+Fp12 = Tuple[Fp6, Fp6]
+G1Affine = Tuple[mpz, mpz]
+G2Affine = Tuple[Fp2, Fp2]
+
+x = 4965661367192848881
+p = mpz(36 * x ** 4 + 36 * x ** 3 + 24 * x ** 2 + 6 * x + 1)
+r = mpz(36 * x ** 4 + 36 * x ** 3 + 18 * x ** 2 + 6 * x + 1)
+
+FP2_ZERO = (mpz(0), mpz(0))
+FP2_ONE = (mpz(1), mpz(0))
+FP6_ZERO = (FP2_ZERO, FP2_ZERO, FP2_ZERO)
+FP6_ONE = (FP2_ONE, FP2_ZERO, FP2_ZERO)
+FP12_ONE = (FP6_ONE, FP6_ZERO)
+
+
+def fp2_add(a: Fp2, b: Fp2) -> Fp2:
+    return (a[0] + b[0]) % p, (a[1] + b[1]) % p
+
+
+def fp2_sub(a: Fp2, b: Fp2) -> Fp2:
+    return (a[0] - b[0]) % p, (a[1] - b[1]) % p
+
+
+def fp2_neg(a: Fp2) -> Fp2:
+    return -a[0] % p, -a[1] % p
+
+
+def fp2_conj(a: Fp2) -> Fp2:
+    return a[0], -a[1] % p
+
+
+def fp2_mul(a: Fp2, b: Fp2) -> Fp2:
+    t0 = a[0] * b[0]
+    t1 = a[1] * b[1]
+    return (t0 - t1) % p, ((a[0] + a[1]) * (b[0] + b[1]) - t0 - t1) % p
+
+
+def fp2_mul_fp(a: Fp2, b: mpz) -> Fp2:
+    return a[0] * b % p, a[1] * b % p
+
+
+def fp2_sqr(a: Fp2) -> Fp2:
+    return (a[0] + a[1]) * (a[0] - a[1]) % p, 2 * a[0] * a[1] % p
+
+
+def fp2_mul_xi(a: Fp2) -> Fp2:
+    return (9 * a[0] - a[1]) % p, (a[0] + 9 * a[1]) % p
+
+
+def fp2_inv(a: Fp2) -> Fp2:
+    t = invert(a[0] * a[0] + a[1] * a[1], p)
+    return a[0] * t % p, -a[1] * t % p
+
+
+def fp2_pow(a: Fp2, e: int) -> Fp2:
+    res = FP2_ONE
+    while e > 0:
+        if e & 1:
+            res = fp2_mul(res, a)
+        a = fp2_sqr(a)
+        e >>= 1
+    return res
+
+
+def fp6_add(a: Fp6, b: Fp6) -> Fp6:
+    return fp2_add(a[0], b[0]), fp2_add(a[1], b[1]), fp2_add(a[2], b[2])
+
+
+def fp6_sub(a: Fp6, b: Fp6) -> Fp6:
+    return fp2_sub(a[0], b[0]), fp2_sub(a[1], b[1]), fp2_sub(a[2], b[2])
+
+
+def fp6_neg(a: Fp6) -> Fp6:
+    return fp2_neg(a[0]), fp2_neg(a[1]), fp2_neg(a[2])
+
+
+def fp6_mul_v(a: Fp6) -> Fp6:
+    return fp2_mul_xi(a[2]), a[0], a[1]
+
+
+def fp6_mul(a: Fp6, b: Fp6) -> Fp6:
+    a0, a1, a2 = a
+    b0, b1, b2 = b
+    t0 = fp2_mul(a0, b0)
+    t1 = fp2_mul(a1, b1)
+    t2 = fp2_mul(a2, b2)
+    c0 = fp2_add(fp2_mul_xi(fp2_sub(fp2_sub(fp2_mul(fp2_add(a1, a2), fp2_add(b1, b2)), t1), t2)), t0)
+    c1 = fp2_add(fp2_sub(fp2_sub(fp2_mul(fp2_add(a0, a1), fp2_add(b0, b1)), t0), t1), fp2_mul_xi(t2))
+    c2 = fp2_add(fp2_sub(fp2_sub(fp2_mul(fp2_add(a0, a2), fp2_add(b0, b2)), t0), t2), t1)
+    return c0, c1, c2
+
+
+def fp6_mul_by_01(a: Fp6, b0: Fp2, b1: Fp2) -> Fp6:
+    # a * (b0 + b1 v)
+    a0, a1, a2 = a
+    c0 = fp2_add(fp2_mul(a0, b0), fp2_mul_xi(fp2_mul(a2, b1)))
+    c1 = fp2_add(fp2_mul(a0, b1), fp2_mul(a1, b0))
+    c2 = fp2_add(fp2_mul(a1, b1), fp2_mul(a2, b0))
+    return c0, c1, c2
+
+
+def fp6_inv(a: Fp6) -> Fp6:
+    a0, a1, a2 = a
+    t0 = fp2_sub(fp2_sqr(a0), fp2_mul_xi(fp2_mul(a1, a2)))
+    t1 = fp2_sub(fp2_mul_xi(fp2_sqr(a2)), fp2_mul(a0, a1))
+    t2 = fp2_sub(fp2_sqr(a1), fp2_mul(a0, a2))
+    t = fp2_add(fp2_mul(a0, t0), fp2_mul_xi(fp2_add(fp2_mul(a2, t1), fp2_mul(a1, t2))))
+    t = fp2_inv(t)
+    return fp2_mul(t0, t), fp2_mul(t1, t), fp2_mul(t2, t)
+
+
+def fp12_mul(a: Fp12, b: Fp12) -> Fp12:
+    t0 = fp6_mul(a[0], b[0])
+    t1 = fp6_mul(a[1], b[1])
+    c1 = fp6_sub(fp6_sub(fp6_mul(fp6_add(a[0], a[1]), fp6_add(b[0], b[1])), t0), t1)
+    return fp6_add(t0, fp6_mul_v(t1)), c1
+
+
+def fp12_sqr(a: Fp12) -> Fp12:
+    g, h = a
+    t = fp6_mul(g, h)
+    c0 = fp6_sub(fp6_sub(fp6_mul(fp6_add(g, h), fp6_add(g, fp6_mul_v(h))), t), fp6_mul_v(t))
+    return c0, fp6_add(t, t)
+
+
+def fp12_inv(a: Fp12) -> Fp12:
+    g, h = a
+    t = fp6_inv(fp6_sub(fp6_mul(g, g), fp6_mul_v(fp6_mul(h, h))))
+    return fp6_mul(g, t), fp6_neg(fp6_mul(h, t))
+
+
+def fp12_conj(a: Fp12) -> Fp12:
+    # a^(p^6), which is the inverse of a for elements of the cyclotomic subgroup
+    return a[0], fp6_neg(a[1])
+
+
+# gamma[k][j] = xi^(j * (p^k - 1) / 6) so that (c w^j)^(p^k) = frob^k(c) * gamma[k][j] * w^j
+_FROBENIUS_COEFFS = [[fp2_pow(fp2_mul_xi(FP2_ONE), j * (p ** k - 1) // 6) for j in range(6)] for k in range(4)]
+
+
+def fp12_frobenius(a: Fp12, k: int) -> Fp12:
+    (c0, c2, c4), (c1, c3, c5) = a
+    if k & 1:
+        c0, c1, c2, c3, c4, c5 = (fp2_conj(c) for c in (c0, c1, c2, c3, c4, c5))
+    gamma = _FROBENIUS_COEFFS[k]
+    return ((c0, fp2_mul(c2, gamma[2]), fp2_mul(c4, gamma[4])),
+            (fp2_mul(c1, gamma[1]), fp2_mul(c3, gamma[3]), fp2_mul(c5, gamma[5])))
+
+
+def _fp4_sqr(a: Fp2, b: Fp2) -> Tuple[Fp2, Fp2]:
+    # (a + b y)^2 with y^2 = xi
+    t = fp2_mul(a, b)
+    c0 = fp2_sub(fp2_sub(fp2_mul(fp2_add(a, b), fp2_add(a, fp2_mul_xi(b))), t), fp2_mul_xi(t))
+    return c0, fp2_add(t, t)
+
+
+def fp12_cyclotomic_sqr(a: Fp12) -> Fp12:
+    """
+    Granger-Scott squaring, only valid for elements of the cyclotomic subgroup
+    (i.e. anything that went through the easy part of the final exponentiation)
+    """
+    (z0, z4, z3), (z2, z1, z5) = a
+    t0, t1 = _fp4_sqr(z0, z1)
+    t2, t3 = _fp4_sqr(z2, z3)
+    t4, t5 = _fp4_sqr(z4, z5)
+    t5 = fp2_mul_xi(t5)
+
+    z0 = ((3 * t0[0] - 2 * z0[0]) % p, (3 * t0[1] - 2 * z0[1]) % p)
+    z1 = ((3 * t1[0] + 2 * z1[0]) % p, (3 * t1[1] + 2 * z1[1]) % p)
+    z2 = ((3 * t5[0] + 2 * z2[0]) % p, (3 * t5[1] + 2 * z2[1]) % p)
+    z3 = ((3 * t4[0] - 2 * z3[0]) % p, (3 * t4[1] - 2 * z3[1]) % p)
+    z4 = ((3 * t2[0] - 2 * z4[0]) % p, (3 * t2[1] - 2 * z4[1]) % p)
+    z5 = ((3 * t3[0] + 2 * z5[0]) % p, (3 * t3[1] + 2 * z5[1]) % p)
+    return (z0, z4, z3), (z2, z1, z5)
+
+
+def _wnaf(k: int, w: int):
+    digits = []
+    while k > 0:
+        if k & 1:
+            d = k & ((1 << w) - 1)
+            if d >= 1 << (w - 1):
+                d -= 1 << w
+            k -= d
+        else:
+            d = 0
+        digits.append(d)
+        k >>= 1
+    return digits
+
+
+def fp12_cyclotomic_pow(a: Fp12, e: int, w: int = 4) -> Fp12:
+    """
+    a^e for a in the cyclotomic subgroup, using a width-w NAF of e with Granger-Scott
+    squarings and conjugation for the negative digits (and for negative e)
+    """
+    if e < 0:
+        a, e = fp12_conj(a), -e
+
+    a2 = fp12_cyclotomic_sqr(a)
+    odd = [a]
+    for _ in range((1 << (w - 2)) - 1):
+        odd.append(fp12_mul(odd[-1], a2))
+    odd_conj = [fp12_conj(t) for t in odd]
+
+    res = None
+    for d in reversed(_wnaf(e, w)):
+        if res is not None:
+            res = fp12_cyclotomic_sqr(res)
+        if d != 0:
+            t = odd[d >> 1] if d > 0 else odd_conj[(-d) >> 1]
+            res = t if res is None else fp12_mul(res, t)
+    return FP12_ONE if res is None else res
+
+
+def final_exponentiation(f: Fp12) -> Fp12:
+    """
+    Compute f^((p^12 - 1) / r)
+    """
+    # Easy part: f^((p^6 - 1)(p^2 + 1)), after which f is in the cyclotomic subgroup
+    f = fp12_mul(fp12_conj(f), fp12_inv(f))
+    f = fp12_mul(fp12_frobenius(f, 2), f)
+
+    # Hard part: f^((p^4 - p^2 + 1) / r) using the addition chain of Scott et al.
+    fx = fp12_cyclotomic_pow(f, x)
+    fx2 = fp12_cyclotomic_pow(fx, x)
+    fx3 = fp12_cyclotomic_pow(fx2, x)
+
+    y0 = fp12_mul(fp12_mul(fp12_frobenius(f, 1), fp12_frobenius(f, 2)), fp12_frobenius(f, 3))
+    y1 = fp12_conj(f)
+    y2 = fp12_frobenius(fx2, 2)
+    y3 = fp12_conj(fp12_frobenius(fx, 1))
+    y4 = fp12_conj(fp12_mul(fx, fp12_frobenius(fx2, 1)))
+    y5 = fp12_conj(fx2)
+    y6 = fp12_conj(fp12_mul(fx3, fp12_frobenius(fx3, 1)))
+
+    t0 = fp12_mul(fp12_mul(fp12_cyclotomic_sqr(y6), y4), y5)
+    t1 = fp12_mul(fp12_mul(y3, y5), t0)
+    t0 = fp12_mul(t0, y2)
+    t1 = fp12_cyclotomic_sqr(fp12_mul(fp12_cyclotomic_sqr(t1), t0))
+    t0 = fp12_mul(t1, y1)
+    t1 = fp12_mul(t1, y0)
+    return fp12_mul(fp12_cyclotomic_sqr(t0), t1)
+
+
+def fp6_inv_many(elems: list) -> list:
+    """
+    Invert a list of non-zero Fp6 elements with a single inversion (Montgomery's trick)
+    """
+    prefix = []
+    acc = FP6_ONE
+    for e in elems:
+        prefix.append(acc)
+        acc = fp6_mul(acc, e)
+    acc = fp6_inv(acc)
+    res = [None] * len(elems)
+    for i in range(len(elems) - 1, -1, -1):
+        res[i] = fp6_mul(acc, prefix[i])
+        acc = fp6_mul(acc, elems[i])
+    return res
+
+
+def fp12_t2_compress_many(elems: list) -> list:
+    """
+    Torus (T2) compression of cyclotomic subgroup elements g + h w into (1 + g) / h in Fp6,
+    the identity (h = 0) is mapped to None
+    """
+    idx = [i for i, (g, h) in enumerate(elems) if h != FP6_ZERO]
+    inv = fp6_inv_many([elems[i][1] for i in idx])
+    res = [None] * len(elems)
+    for i, t in zip(idx, inv):
+        g = elems[i][0]
+        res[i] = fp6_mul((((g[0][0] + 1) % p, g[0][1]), g[1], g[2]), t)
+    return res
+
+
+def _fp12_mul_by_line(f: Fp12, a0: Fp2, a1: Fp2, a3: Fp2) -> Fp12:
+    # f * (a0 + a1 w + a3 w^3), i.e. f * ((a0, 0, 0), (a1, a3, 0))
+    g, h = f
+    t0 = (fp2_mul(g[0], a0), fp2_mul(g[1], a0), fp2_mul(g[2], a0))
+    t1 = fp6_mul_by_01(h, a1, a3)
+    c1 = fp6_sub(fp6_sub(fp6_mul_by_01(fp6_add(g, h), fp2_add(a0, a1), a3), t0), t1)
+    return fp6_add(t0, fp6_mul_v(t1)), c1
+
+
+def _double_step(T, P: G1Affine):
+    # Jacobian doubling on the twist, returns the tangent line evaluated at P scaled by an Fp2 factor
+    X, Y, Z = T
+    A = fp2_sqr(X)
+    B = fp2_sqr(Y)
+    ZZ = fp2_sqr(Z)
+    M = fp2_mul_fp(A, 3)
+    S = fp2_mul_fp(fp2_mul(X, B), 4)
+    X3 = fp2_sub(fp2_sqr(M), fp2_add(S, S))
+    Y3 = fp2_sub(fp2_mul(M, fp2_sub(S, X3)), fp2_mul_fp(fp2_sqr(B), 8))
+    Z3 = fp2_mul_fp(fp2_mul(Y, Z), 2)
+
+    a0 = fp2_mul_fp(fp2_mul(Z3, ZZ), P[1])
+    a1 = fp2_neg(fp2_mul_fp(fp2_mul(M, ZZ), P[0]))
+    a3 = fp2_sub(fp2_mul(M, X), fp2_add(B, B))
+    return (X3, Y3, Z3), (a0, a1, a3)
+
+
+def _add_step(T, Q: G2Affine, P: G1Affine):
+    # Mixed Jacobian + affine addition on the twist, returns the chord evaluated at P scaled by an Fp2 factor
+    X, Y, Z = T
+    xQ, yQ = Q
+    ZZ = fp2_sqr(Z)
+    H = fp2_sub(fp2_mul(xQ, ZZ), X)
+    R = fp2_sub(fp2_mul(yQ, fp2_mul(ZZ, Z)), Y)
+    HH = fp2_sqr(H)
+    HHH = fp2_mul(H, HH)
+    V = fp2_mul(X, HH)
+    X3 = fp2_sub(fp2_sub(fp2_sqr(R), HHH), fp2_add(V, V))
+    Y3 = fp2_sub(fp2_mul(R, fp2_sub(V, X3)), fp2_mul(Y, HHH))
+    Z3 = fp2_mul(Z, H)
+
+    a0 = fp2_mul_fp(Z3, P[1])
+    a1 = fp2_neg(fp2_mul_fp(R, P[0]))
+    a3 = fp2_sub(fp2_mul(R, xQ), fp2_mul(Z3, yQ))
+    return (X3, Y3, Z3), (a0, a1, a3)
+
+
+def _naf(k: int):
+    digits = []
+    while k > 0:
+        if k & 1:
+            d = 2 - (k & 3)
+            k -= d
+        else:
+            d = 0
+        digits.append(d)
+        k >>= 1
+    return digits
+
+
+_ATE_LOOP_NAF = _naf(6 * x + 2)
+
+
+def miller_loop(Q: G2Affine, P: G1Affine) -> Fp12:
+    """
+    Optimal ate Miller loop f_{6x+2,Q}(P) * l_{T,pi(Q)}(P) * l_{T',-pi^2(Q)}(P) for affine points,
+    Q on the sextic twist over Fp2 and P over Fp
+    """
+    negQ = (Q[0], fp2_neg(Q[1]))
+    T = (Q[0], Q[1], FP2_ONE)
+    f = FP12_ONE
+    for digit in reversed(_ATE_LOOP_NAF[:-1]):
+        T, line = _double_step(T, P)
+        f = _fp12_mul_by_line(fp12_sqr(f), *line)
+        if digit == 1:
+            T, line = _add_step(T, Q, P)
+            f = _fp12_mul_by_line(f, *line)
+        elif digit == -1:
+            T, line = _add_step(T, negQ, P)
+            f = _fp12_mul_by_line(f, *line)
+
+    gamma1, gamma2 = _FROBENIUS_COEFFS[1], _FROBENIUS_COEFFS[2]
+    Q1 = (fp2_mul(fp2_conj(Q[0]), gamma1[2]), fp2_mul(fp2_conj(Q[1]), gamma1[3]))
+    Q2 = (fp2_mul(Q[0], gamma2[2]), fp2_neg(fp2_mul(Q[1], gamma2[3])))
+    T, line = _add_step(T, Q1, P)
+    f = _fp12_mul_by_line(f, *line)
+    T, line = _add_step(T, Q2, P)
+    return _fp12_mul_by_line(f, *line)
+
+
+def pairing(Q: G2Affine, P: G1Affine) -> Fp12:
+    return final_exponentiation(miller_loop(Q, P))
+
+
+def from_fq12_coeffs(coeffs) -> Fp12:
+    """
+    Convert the 12 coefficients of a py_ecc FQ12 (basis w^0 ... w^11) into the tower representation
+    """
+    a = [mpz(int(c)) for c in coeffs]
+    c = [((a[j] + 9 * a[j + 6]) % p, a[j + 6] % p) for j in range(6)]
+    return (c[0], c[2], c[4]), (c[1], c[3], c[5])
+
+
+def to_fq12_coeffs(f: Fp12) -> list:
+    """
+    Convert a tower element into the 12 coefficients of a py_ecc FQ12 (basis w^0 ... w^11)
+    """
+    (c0, c2, c4), (c1, c3, c5) = f
+    c = [c0, c1, c2, c3, c4, c5]
+    return [int((c[j][0] - 9 * c[j][1]) % p) for j in range(6)] + [int(c[j][1]) for j in range(6)]
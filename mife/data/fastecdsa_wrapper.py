@@ -1,7 +1,11 @@
 from mife.data.group import GroupBase, GroupElem
+from fastecdsa import curve as fastecdsa_curve
 from fastecdsa.curve import Curve
 from fastecdsa.point import Point
 
+# fastecdsa curves compare by identity, unpickled points are mapped back to the module curves
+_CURVES = {c.name: c for c in vars(fastecdsa_curve).values() if isinstance(c, Curve)}
+
 class WrapCurve(GroupBase):
 
     def __init__(self, curve: Curve):
@@ -41,8 +45,20 @@ class WrapPoint(GroupElem):
     def __hash__(self):
         return hash(str(self.point.x) + "," + str(self.point.y))
 
+    def __reduce__(self):
+        curve = self.point.curve
+        if curve is not None and _CURVES.get(curve.name) is curve:
+            curve = curve.name
+        return _point_from_coords, (self.point.x, self.point.y, curve)
+
     def export(self) -> dict:
         return {
             "x": self.point.x,
             "y": self.point.y,
-        }
\ No newline at end of file
+        }
+
+
+def _point_from_coords(x: int, y: int, curve: Curve | str | None) -> WrapPoint:
+    if isinstance(curve, str):
+        curve = _CURVES[curve]
+    return WrapPoint(Point(x, y, curve=curve))
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from typing import Any, Callable
+
+
+_combs = {}
+
+
+def _registered_comb(name: str) -> FixedBaseComb:
+    return _combs[name]
+
+
+class FixedBaseComb:
+    """
+    Lim-Lee comb for fixed-base scalar multiplication on a raw point representation.
+    The scalar is cut into `width` rows of `d` bits, one multiplication then costs
+    d doublings and at most d additions against a table of 2^width - 1 points.
+    The table is built on the first multiplication.
+    A named comb is registered at module level and pickles by name, so worker processes
+    reuse their own table instead of receiving a copy of it.
+    """
+
+    def __init__(self, point: Any, bits: int, add: Callable, double: Callable, identity: Any,
+                 width: int = 8, name: str = None):
+        """
+        :param point: Base point
+        :param bits: Upper bound on the bit length of the scalars
+        :param add: Point addition (must handle equal points)
+        :param double: Point doubling
+        :param identity: Identity point, returned for a zero scalar
+        :param width: Number of teeth of the comb
+        :param name: Registry name, required for the comb to be pickled
+        """
+        self.point = point
+        self.bits = bits
+        self.add = add
+        self.double = double
+        self.identity = identity
+        self.width = width
+        self.d = -(-bits // width)
+        self.table = None
+        self.name = name
+        if name is not None:
+            _combs[name] = self
+
+    def __reduce__(self):
+        if self.name is None:
+            raise Exception("Only named combs can be pickled")
+        return _registered_comb, (self.name,)
+
+    def _build_table(self):
+        teeth = [self.point]
+        for _ in range(self.width - 1):
+            tooth = teeth[-1]
+            for _ in range(self.d):
+                tooth = self.double(tooth)
+            teeth.append(tooth)
+
+        table = [None] * (1 << self.width)
+        for s in range(1, 1 << self.width):
+            low = s & -s
+            rest = s ^ low
+            tooth = teeth[low.bit_length() - 1]
+            table[s] = tooth if rest == 0 else self.add(table[rest], tooth)
+        self.table = table
+
+    def multiply(self, k: int) -> Any:
+        """
+        :param k: Scalar within [0, 2^bits)
+        :return: k * point
+        """
+        if k < 0 or k.bit_length() > self.bits:
+            raise Exception(f"Scalar must be within [0, 2^{self.bits})")
+        if self.table is None:
+            self._build_table()
+
+        mask = (1 << self.d) - 1
+        rows = [(k >> (j * self.d)) & mask for j in range(self.width)]
+
+        res = None
+        for i in range(self.d - 1, -1, -1):
+            if res is not None:
+                res = self.double(res)
+            s = 0
+            for j in range(self.width):
+                s |= ((rows[j] >> i) & 1) << j
+            if s:
+                res = self.table[s] if res is None else self.add(res, self.table[s])
+
+        return self.identity if res is None else res
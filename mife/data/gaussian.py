@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import math
+import os
+from functools import lru_cache
+
+import numpy as np
+
+# Discrete Gaussian sampling in bulk. Randomness is read from os.urandom in one call per batch
+# and turned into NumPy arrays. For small sigma the values come from a cumulative distribution
+# table (CDT) searched with 63 bit uniforms. For large sigma a rounded continuous Gaussian is
+# statistically indistinguishable from the discrete one, so it is drawn with Box-Muller.
+
+CDT_MAX_SIGMA = 1 << 12
+TAIL = 12
+
+# Box-Muller samples keep about 53 bits, wider Gaussians are composed as t * D_a + D_b with D_b wide
+# enough to smooth the multiples of t (Peikert's convolution theorem)
+BOX_MULLER_MAX_SIGMA = 1 << 40
+
+
+def random_uint64(size: int) -> np.ndarray:
+    """
+    :param size: Number of values
+    :return: Uniform uint64 values from the operating system CSPRNG
+    """
+    return np.frombuffer(os.urandom(8 * size), dtype=np.uint64)
+
+
+def random_unit(size: int) -> np.ndarray:
+    """
+    :param size: Number of values
+    :return: Uniform float64 values in (0, 1] with 53 bits of randomness
+    """
+    return ((random_uint64(size) >> np.uint64(11)) + 1).astype(np.float64) * 2.0 ** -53
+
+
+class DiscreteGaussian:
+
+    def __init__(self, sigma: float, tail: int = TAIL):
+        """
+        :param sigma: Standard deviation, centered at 0
+        :param tail: Samples are cut at tail * sigma when a CDT is used
+        """
+        self.sigma = float(sigma)
+        self.cdt = None
+        self.bound = None
+        if self.sigma <= CDT_MAX_SIGMA:
+            self.bound = max(1, math.ceil(tail * self.sigma))
+            x = np.arange(-self.bound, self.bound + 1, dtype=np.float64)
+            pdf = np.exp(-x * x / (2 * self.sigma * self.sigma)) if self.sigma > 0 else (x == 0).astype(np.float64)
+            cdf = np.cumsum(pdf) / pdf.sum()
+            # Value -bound + i is drawn when the 63 bit uniform falls in [cdt[i - 1], cdt[i])
+            self.cdt = np.minimum(cdf * 2.0 ** 63, 2.0 ** 63).astype(np.uint64)
+            self.cdt[-1] = np.uint64(1 << 63)
+
+    def sample(self, size: int) -> np.ndarray:
+        """
+        :param size: Number of samples
+        :return: int64 array, or object array when the samples may not fit in 63 bits
+        """
+        if self.cdt is not None:
+            u = random_uint64(size) >> np.uint64(1)
+            return np.searchsorted(self.cdt, u, side="right").astype(np.int64) - self.bound
+
+        if self.sigma > BOX_MULLER_MAX_SIGMA:
+            t = 1 << (int(self.sigma).bit_length() - 30)
+            sigma_b = 4 * t
+            sigma_a = math.sqrt(self.sigma ** 2 - sigma_b ** 2) / t
+            hi = DiscreteGaussian(sigma_a).sample(size).astype(object)
+            return hi * t + DiscreteGaussian(sigma_b).sample(size).astype(object)
+
+        half = (size + 1) // 2
+        radius = np.sqrt(-2 * np.log(random_unit(half)))
+        angle = 2 * math.pi * random_unit(half)
+        z = np.concatenate((radius * np.cos(angle), radius * np.sin(angle)))[:size]
+        res = np.rint(z * self.sigma)
+        if self.sigma * TAIL * 4 < 2.0 ** 62:
+            return res.astype(np.int64)
+        return np.array([int(v) for v in res], dtype=object)
+
+
+@lru_cache(maxsize=32)
+def _sampler(sigma: float) -> DiscreteGaussian:
+    return DiscreteGaussian(sigma)
+
+
+def discrete_gaussian(sigma: float, size: int) -> np.ndarray:
+    """
+    Sample from the discrete Gaussian, the samplers (and their tables) of the last 32 sigmas are cached
+
+    :param sigma: Standard deviation
+    :param size: Number of samples
+    :return: int64 or object NumPy array of samples
+    """
+    return _sampler(float(sigma)).sample(size)
@@ -0,0 +1,13 @@
+from gmpy2 import powmod
+
+# powmod_exp_list and powmod_base_list were added in gmpy2 2.2, older versions get plain loops
+# with the same results (but without releasing the GIL)
+
+try:
+    from gmpy2 import powmod_exp_list, powmod_base_list
+except ImportError:
+    def powmod_exp_list(base, exps, mod):
+        return [powmod(base, e, mod) for e in exps]
+
+    def powmod_base_list(bases, exp, mod):
+        return [powmod(b, exp, mod) for b in bases]
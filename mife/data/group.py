@@ -1,6 +1,10 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from functools import partial
+from typing import List
+
+from mife.parallel import parallel_map
 
 class GroupBase(ABC):
 
@@ -51,7 +55,29 @@ class GroupElem(ABC):
     def __sub__(self, other):
         return self.__add__(other.__neg__())
 
+    def mul_many(self, scalars: List[int], workers: int = 1) -> List[GroupElem]:
+        """
+        :param scalars: Scalars to multiply with
+        :param workers: Number of processes, None for the cpu count
+        :return: [k * self for k in scalars]
+        """
+        return parallel_map(partial(_rmul, self), scalars, workers)
+
+    @classmethod
+    def scale_many(cls, elems: List[GroupElem], k: int, workers: int = 1) -> List[GroupElem]:
+        """
+        :param elems: Elements to scale
+        :param k: Scalar
+        :param workers: Number of processes, None for the cpu count
+        :return: [k * e for e in elems]
+        """
+        return parallel_map(partial(_rmul, k=k), elems, workers)
+
     @abstractmethod
     def export(self) -> dict:
         # Export the group object details as dictionary for export
         pass
+
+
+def _rmul(elem: GroupElem, k: int) -> GroupElem:
+    return k * elem
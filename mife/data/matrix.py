@@ -133,8 +133,20 @@ class Matrix:
                     return False
         return True
 
-    def apply_func(self, func: Callable) -> Self:
-        return Matrix([[func(self.M[i][j]) for j in range(self.m)] for i in range(self.n)])
+    def apply_func(self, func: Callable, workers: int = 1, chunksize: int = None) -> Self:
+        """
+        Apply func to every cell
+
+        :param func: Function to apply, must be picklable (no lambda) when workers > 1
+        :param workers: Number of processes, None for the cpu count
+        :param chunksize: Number of cells sent to a process at a time
+        :return: Matrix of results
+        """
+        if workers == 1:
+            return Matrix([[func(self.M[i][j]) for j in range(self.m)] for i in range(self.n)])
+        from mife.parallel import parallel_map
+        res = parallel_map(func, self.flatten(self.M), workers, chunksize)
+        return Matrix(self.unflatten(res, self.n, self.m))
 
     def row(self, i) -> Self:
         return Matrix(self.M[i])
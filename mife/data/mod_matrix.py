@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+from typing import List, Self, Any, Tuple
+
+from mife.data.matrix import Matrix
+
+
+class NotInvertibleError(Exception):
+    pass
+
+
+class ModMatrix:
+    """
+    Matrix over Z_q stored as one flat row-major buffer of ints reduced to [0, q).
+    Products accumulate unreduced and reduce once per output cell.
+    Entries are not meant to be modified in place, the LU factorisation is cached.
+    """
+
+    def __init__(self, M: List[List[int] | int], q: int, n: int = None, m: int = None):
+        """
+        :param M: List of rows, a single row, or a flat row-major buffer when n and m are given
+        :param q: Modulus
+        :param n: Number of rows of the flat buffer
+        :param m: Number of columns of the flat buffer
+        """
+        self.q = q
+        if n is not None and m is not None:
+            if len(M) != n * m:
+                raise Exception("Matrix size not consistent")
+            self.n, self.m = n, m
+            self.buf = [int(x) % q for x in M]
+            self._lu = None
+            return
+        if len(M) == 0:
+            raise Exception("Matrix can't be size 0x0")
+        if isinstance(M[0], list):
+            self.n, self.m = len(M), len(M[0])
+            self.buf = []
+            for row in M:
+                if len(row) != self.m:
+                    raise Exception("Matrix size not consistent")
+                self.buf.extend(int(x) % q for x in row)
+        else:
+            self.n, self.m = 1, len(M)
+            self.buf = [int(x) % q for x in M]
+        self._lu = None
+
+    @staticmethod
+    def _raw(buf: List[int], q: int, n: int, m: int) -> ModMatrix:
+        # Wrap an already reduced buffer without copying it
+        res = ModMatrix.__new__(ModMatrix)
+        res.q, res.n, res.m, res.buf = q, n, m, buf
+        res._lu = None
+        return res
+
+    @staticmethod
+    def from_matrix(M: Matrix, q: int) -> ModMatrix:
+        return ModMatrix(Matrix.flatten(M.M), q, M.n, M.m)
+
+    def to_matrix(self, G: Any) -> Matrix:
+        """
+        :param G: Ring to wrap the entries in, e.g. ZmodR(q)
+        :return: Matrix of ring elements
+        """
+        return Matrix([[G(x) for x in row] for row in self.rows()])
+
+    @staticmethod
+    def stack(rows: List[ModMatrix]) -> ModMatrix:
+        """
+        Stack matrices with the same number of columns on top of each other
+        """
+        m = rows[0].m
+        buf = []
+        for row in rows:
+            if row.m != m:
+                raise Exception("Matrix size not consistent")
+            buf.extend(row.buf)
+        return ModMatrix._raw(buf, rows[0].q, len(buf) // m, m)
+
+    @property
+    def isVector(self):
+        return self.n == 1 or self.m == 1
+
+    @property
+    def T(self) -> Self:
+        buf = [self.buf[i * self.m + j] for j in range(self.m) for i in range(self.n)]
+        return ModMatrix._raw(buf, self.q, self.m, self.n)
+
+    def rows(self) -> List[List[int]]:
+        return [self.buf[i * self.m:(i + 1) * self.m] for i in range(self.n)]
+
+    def row(self, i) -> Self:
+        return ModMatrix._raw(self[i], self.q, 1, self.m)
+
+    def __getitem__(self, index) -> List[int]:
+        return self.buf[index * self.m:(index + 1) * self.m]
+
+    def _check_same_shape(self, other: Self, op: str):
+        if self.n != other.n or self.m != other.m:
+            raise Exception(f"Matrix {op} not supported for size {self.n} x {self.m} and {other.n} x {other.m}")
+
+    def __add__(self, other: Self) -> Self:
+        self._check_same_shape(other, "addition")
+        q = self.q
+        return ModMatrix._raw([(a + b) % q for a, b in zip(self.buf, other.buf)], q, self.n, self.m)
+
+    def __sub__(self, other: Self) -> Self:
+        self._check_same_shape(other, "subtraction")
+        q = self.q
+        return ModMatrix._raw([(a - b) % q for a, b in zip(self.buf, other.buf)], q, self.n, self.m)
+
+    def __neg__(self) -> Self:
+        q = self.q
+        return ModMatrix._raw([-a % q for a in self.buf], q, self.n, self.m)
+
+    def __rmul__(self, other: int) -> Self:
+        q = self.q
+        other = int(other) % q
+        return ModMatrix._raw([a * other % q for a in self.buf], q, self.n, self.m)
+
+    def __mul__(self, other: Self | int) -> Self:
+        if not isinstance(other, ModMatrix):
+            return self.__rmul__(other)
+        if self.m != other.n:
+            raise Exception(f"Matrix multiplication not supported for size {self.n} x {self.m} and {other.n} x {other.m}")
+        # Accumulate scaled rows of other, zero entries (e.g. of 0/1 vectors) are skipped
+        q = self.q
+        other_rows = other.rows()
+        buf = []
+        for row in self.rows():
+            acc = [0] * other.m
+            for a, other_row in zip(row, other_rows):
+                if a:
+                    acc = [x + a * b for x, b in zip(acc, other_row)]
+            buf.extend(x % q for x in acc)
+        return ModMatrix._raw(buf, q, self.n, other.m)
+
+    def dot(self, other: Self) -> int:
+        if not (self.isVector and other.isVector):
+            raise Exception(f"Dot product only applicable for vector")
+        if len(self.buf) != len(other.buf):
+            raise Exception("Dimension different for dot product")
+        return sum(a * b for a, b in zip(self.buf, other.buf)) % self.q
+
+    def lu(self) -> Tuple[List[List[int]], List[int], List[int], int]:
+        """
+        LU factorisation with row pivoting modulo a prime q, PA = LU.
+        One modular inverse per pivot, the result is cached on the matrix.
+
+        :return: (L and U packed in one list of rows, row permutation, pivot inverses, determinant)
+        """
+        if self._lu is not None:
+            return self._lu
+        if self.n != self.m:
+            raise Exception("Matrix must be square to be invertible")
+        n, q = self.n, self.q
+        A = self.rows()
+        perm = list(range(n))
+        pivot_inverses = []
+        det = 1
+        for i in range(n):
+            pivot = i
+            while pivot < n and A[pivot][i] == 0:
+                pivot += 1
+            if pivot == n:
+                raise NotInvertibleError("Matrix is not invertible")
+            if pivot != i:
+                A[i], A[pivot] = A[pivot], A[i]
+                perm[i], perm[pivot] = perm[pivot], perm[i]
+                det = -det
+            det = det * A[i][i] % q
+            factor = pow(A[i][i], -1, q)
+            pivot_inverses.append(factor)
+            tail = A[i][i + 1:]
+            for j in range(i + 1, n):
+                t = A[j][i] * factor % q
+                A[j][i] = t
+                if t:
+                    A[j][i + 1:] = [(a - t * b) % q for a, b in zip(A[j][i + 1:], tail)]
+
+        self._lu = (A, perm, pivot_inverses, det % q)
+        return self._lu
+
+    def inverse(self, with_determinant=False) -> Self:
+        """
+        Inverse modulo a prime q from the cached LU factorisation, A^-1 = U^-1 L^-1 P
+
+        :param with_determinant: Also return the determinant
+        :return: Inverse, or (inverse, determinant)
+        """
+        LU, perm, pivot_inverses, det = self.lu()
+        n, q = self.n, self.q
+
+        # Forward substitution L Y = P, rows are reduced once after accumulating
+        Y = []
+        for i in range(n):
+            acc = [0] * n
+            acc[perm[i]] = 1
+            for k in range(i):
+                t = LU[i][k]
+                if t:
+                    acc = [a - t * b for a, b in zip(acc, Y[k])]
+            Y.append([a % q for a in acc])
+
+        # Back substitution U X = Y
+        X = [None] * n
+        for i in range(n - 1, -1, -1):
+            acc = Y[i]
+            for k in range(i + 1, n):
+                t = LU[i][k]
+                if t:
+                    acc = [a - t * b for a, b in zip(acc, X[k])]
+            X[i] = [a * pivot_inverses[i] % q for a in acc]
+
+        inv = ModMatrix._raw(Matrix.flatten(X), q, n, n)
+        if with_determinant:
+            return inv, det
+        return inv
+
+    def determinant(self) -> int:
+        return self.lu()[3]
+
+    def __eq__(self, other):
+        if not isinstance(other, ModMatrix):
+            return False
+        return self.n == other.n and self.m == other.m and self.q == other.q and self.buf == other.buf
+
+    def export(self) -> dict:
+        # Same layout as Matrix.export over Z_q
+        return {
+            "n": self.n,
+            "m": self.m,
+            "M": [[str(x) for x in row] for row in self.rows()]
+        }
+
+    def __str__(self):
+        s = "[\n"
+        for row in self.rows():
+            s += "\t[ "
+            for x in row:
+                s += str(x)
+                s += " "
+            s += "]\n"
+        s += "]"
+        return s
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from typing import List
+
+import numpy as np
+from Crypto.Util.number import isPrime
+
+# Negacyclic number theoretic transform over Z_p[X]/(X^N + 1) for several NTT friendly primes
+# p = 1 mod 2N below 2^30 at once. Polynomials are uint64 residue arrays of shape (k, ..., N), one row
+# per prime, so butterfly products stay below 2^60. The forward transform is a Gentleman-Sande
+# (decimation in frequency) pass leaving the output in bit-reversed order and the inverse is the
+# matching Cooley-Tukey pass, so no permutation is needed between them.
+
+NTT_PRIME_BITS = 30
+
+
+def ntt_primes(N: int, k: int, bits: int = NTT_PRIME_BITS) -> List[int]:
+    """
+    :param N: Ring degree, a power of two
+    :param k: Number of primes
+    :param bits: Bit length bound of the primes
+    :return: The k largest primes below 2^bits which are 1 mod 2N
+    """
+    primes = []
+    candidate = ((1 << bits) - 1) // (2 * N) * (2 * N) + 1
+    while len(primes) < k:
+        if candidate < 2 * N:
+            raise Exception(f"Not enough {bits} bit NTT primes for N = {N}")
+        if isPrime(candidate):
+            primes.append(candidate)
+        candidate -= 2 * N
+    return primes
+
+
+def _root_of_unity(order: int, p: int) -> int:
+    # Primitive root of unity of a power of two order
+    for x in range(2, p):
+        root = pow(x, (p - 1) // order, p)
+        if pow(root, order // 2, p) == p - 1:
+            return root
+    raise Exception(f"No root of unity of order {order} modulo {p}")
+
+
+class NegacyclicNTT:
+
+    def __init__(self, N: int, primes: List[int]):
+        """
+        :param N: Ring degree, a power of two
+        :param primes: Primes which are 1 mod 2N
+        """
+        if N & (N - 1) or N < 2:
+            raise Exception("Ring degree must be a power of two")
+        self.N = N
+        self.primes = primes
+        self.k = len(primes)
+        self.p = np.array(primes, dtype=np.uint64).reshape(self.k, 1, 1)
+
+        twist, untwist, omega, omega_inv = [], [], [], []
+        for p in primes:
+            if (p - 1) % (2 * N):
+                raise Exception(f"{p} is not 1 mod 2N")
+            psi = _root_of_unity(2 * N, p)
+            psi_inv = pow(psi, -1, p)
+            n_inv = pow(N, -1, p)
+            twist.append(self._powers(psi, 1, N, p))
+            untwist.append(self._powers(psi_inv, n_inv, N, p))
+            omega.append(self._powers(psi * psi % p, 1, N, p))
+            omega_inv.append(self._powers(psi_inv * psi_inv % p, 1, N, p))
+        self.twist = np.array(twist, dtype=np.uint64).reshape(self.k, 1, N)
+        self.untwist = np.array(untwist, dtype=np.uint64).reshape(self.k, 1, N)
+
+        # Twiddles of the stage with half size h: w^j for j < h where w has order 2h
+        self.stages = []
+        h = N // 2
+        while h >= 1:
+            step = N // (2 * h)
+            w = np.array([row[::step][:h] for row in omega], dtype=np.uint64).reshape(self.k, 1, 1, h)
+            w_inv = np.array([row[::step][:h] for row in omega_inv], dtype=np.uint64).reshape(self.k, 1, 1, h)
+            self.stages.append((h, w, w_inv))
+            h //= 2
+
+    @staticmethod
+    def _powers(base: int, start: int, count: int, p: int) -> List[int]:
+        res = [start % p]
+        for _ in range(count - 1):
+            res.append(res[-1] * base % p)
+        return res
+
+    def forward(self, x: np.ndarray) -> np.ndarray:
+        """
+        :param x: Residues of shape (k, ..., N) reduced modulo the primes
+        :return: Evaluations in bit-reversed order, same shape
+        """
+        shape = x.shape
+        p = self.p.reshape(self.k, 1, 1, 1)
+        x = x.reshape(self.k, -1, self.N) * self.twist % self.p
+        batch = x.shape[1]
+        for h, w, _ in self.stages:
+            x = x.reshape(self.k, batch, -1, 2, h)
+            a, b = x[:, :, :, 0], x[:, :, :, 1]
+            x = np.stack(((a + b) % p, (a + p - b) * w % p), axis=3)
+        return x.reshape(shape)
+
+    def inverse(self, x: np.ndarray) -> np.ndarray:
+        """
+        :param x: Evaluations in bit-reversed order of shape (k, ..., N)
+        :return: Residues of the coefficients, same shape
+        """
+        shape = x.shape
+        p = self.p.reshape(self.k, 1, 1, 1)
+        x = x.reshape(self.k, -1, self.N)
+        batch = x.shape[1]
+        for h, _, w_inv in reversed(self.stages):
+            x = x.reshape(self.k, batch, -1, 2, h)
+            a, b = x[:, :, :, 0], x[:, :, :, 1] * w_inv % p
+            x = np.stack(((a + b) % p, (a + p - b) % p), axis=3)
+        return (x.reshape(self.k, batch, self.N) * self.untwist % self.p).reshape(shape)
+
+    def multiply(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """
+        :return: a * b in Z_p[X]/(X^N + 1) for every prime, operands broadcast over the batch dimensions
+        """
+        return self.inverse(self.forward(a) * self.forward(b) % self.p.reshape((self.k,) + (1,) * (a.ndim - 1)))
+
+    def encode(self, x: np.ndarray) -> np.ndarray:
+        """
+        :param x: Integer coefficients of shape (..., N), int64 or object
+        :return: Residues of shape (k, ..., N)
+        """
+        if x.dtype == object:
+            return np.stack([(x % p).astype(np.uint64) for p in self.primes])
+        return np.stack([x.astype(np.int64) % p for p in self.primes]).astype(np.uint64)
@@ -1,37 +1,146 @@
 from __future__ import annotations
 from Crypto.Util.number import inverse
-from secrets import randbits
-from mife.common import getStrongPrime
+from secrets import randbelow
+from mife.common import getStrongPrime, getStrongPrimes
 from math import gcd
-from gmpy2 import mpz
+from collections import deque
+from typing import List
+from gmpy2 import mpz, powmod
+from mife.data.gmpy_compat import powmod_base_list
+import threading
 
 
 class PaillierKey:
-    def __init__(self, n, g, lcm=None):
+    def __init__(self, n, g, lcm=None, p=None, q=None):
+        """
+        :param n: Modulus
+        :param g: Generator, n + 1 lets encryption skip the exponentiation g^m
+        :param lcm: lcm(p - 1, q - 1), the private key
+        :param p: Prime factor of n, with q enables CRT decryption and r^n
+        :param q: Prime factor of n
+        """
         self.n = n
         self.g = g
         self.lcm = lcm
         self.n2 = self.n ** 2
+        self.u = None
+        self.p, self.q = p, q
         if lcm is not None:
             self.u = inverse(lcm, n)
+        if p is not None and q is not None:
+            self.p2, self.q2 = p * p, q * q
+            # h_p = L_p(g^(p - 1) mod p^2)^-1 mod p, and the same for q
+            self.hp = inverse((powmod(g, p - 1, self.p2) - 1) // p, p)
+            self.hq = inverse((powmod(g, q - 1, self.q2) - 1) // q, q)
+            self.q_inv = inverse(q, p)
+            self.q2_inv = inverse(self.q2, self.p2)
+        self._pub = None
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._pool_event = threading.Event()
+        self._pool_stop = None
 
     def getPublicKey(self):
-        return PaillierKey(self.n, self.g)
+        if self._pub is None:
+            self._pub = PaillierKey(self.n, self.g) if self.hasPrivateKey() else self
+        return self._pub
 
     def hasPrivateKey(self):
         return self.u is not None
 
-    def encrypt(self, m: int):
+    def _random_r(self) -> int:
         while True:
-            r = randbits(self.n.bit_length())
-            if r < self.n and gcd(r, self.n) == 1:
-                break
-        return PaillierElem(self.getPublicKey(), (pow(self.g, m, self.n2) * pow(r, self.n, self.n2)) % self.n2)
+            r = randbelow(self.n)
+            if r > 0 and gcd(r, self.n) == 1:
+                return r
+
+    def random_rn(self, count: int) -> List[mpz]:
+        """
+        :param count: Number of values
+        :return: Fresh r^n mod n^2 values, by CRT when the factors are known
+        """
+        rs = [self._random_r() for _ in range(count)]
+        if self.p is None:
+            # powmod_base_list releases the GIL, so the pool thread does not block encryption
+            return powmod_base_list(rs, self.n, self.n2)
+        rp = powmod_base_list(rs, self.n % (self.p2 - self.p), self.p2)
+        rq = powmod_base_list(rs, self.n % (self.q2 - self.q), self.q2)
+        return [b + self.q2 * ((a - b) * self.q2_inv % self.p2) for a, b in zip(rp, rq)]
+
+    def start_pool(self, size: int = 256, batch: int = 16):
+        """
+        Keep up to size values of r^n precomputed by a background thread, encrypt takes them from the pool
+
+        :param size: Number of values kept ready
+        :param batch: Number of values computed at once
+        """
+        with self._pool_lock:
+            if self._pool_stop is not None:
+                return
+            self._pool = deque()
+            self._pool_stop = threading.Event()
+        stop = self._pool_stop
+
+        def fill():
+            while not stop.is_set():
+                if len(self._pool) < size:
+                    self._pool.extend(self.random_rn(min(batch, size - len(self._pool))))
+                else:
+                    self._pool_event.wait(0.1)
+                    self._pool_event.clear()
+
+        threading.Thread(target=fill, daemon=True).start()
+
+    def stop_pool(self):
+        with self._pool_lock:
+            if self._pool_stop is not None:
+                self._pool_stop.set()
+                self._pool_stop = None
+
+    def _rn(self) -> int:
+        pool = self._pool
+        if pool is not None:
+            try:
+                rn = pool.popleft()
+                self._pool_event.set()
+                return rn
+            except IndexError:
+                pass
+        return self.random_rn(1)[0]
+
+    def _gm(self, m: int) -> int:
+        if self.g == self.n + 1:
+            # (n + 1)^m = 1 + m * n mod n^2
+            return (1 + (m % self.n) * self.n) % self.n2
+        return powmod(self.g, m, self.n2)
+
+    def encrypt(self, m: int):
+        return PaillierElem(self.getPublicKey(), self._gm(m) * self._rn() % self.n2)
+
+    def encrypt_many(self, ms: List[int]) -> List[PaillierElem]:
+        """
+        Encrypt several messages, all r^n values not in the pool are computed in one batch
+        """
+        rns = []
+        if self._pool is not None:
+            while len(rns) < len(ms) and self._pool:
+                try:
+                    rns.append(self._pool.popleft())
+                except IndexError:
+                    break
+            self._pool_event.set()
+        rns.extend(self.random_rn(len(ms) - len(rns)))
+        return [PaillierElem(self.getPublicKey(), self._gm(m) * rn % self.n2) for m, rn in zip(ms, rns)]
 
     def decrypt(self, c: PaillierElem) -> int:
         if not self.hasPrivateKey():
             raise ValueError("No private key")
-        return (((pow(c.c, self.lcm, self.n2) - 1) // self.n) * self.u) % self.n
+        if self.p is None or self.q is None:
+            return (((pow(c.c, self.lcm, self.n2) - 1) // self.n) * self.u) % self.n
+        # m_p = L_p(c^(p - 1) mod p^2) * h_p mod p, and the same for q, combined by CRT
+        mp = (powmod(c.c, self.p - 1, self.p2) - 1) // self.p * self.hp % self.p
+        mq = (powmod(c.c, self.q - 1, self.q2) - 1) // self.q * self.hq % self.q
+        return int(mq + self.q * ((mp - mq) * self.q_inv % self.p))
 
 
 class PaillierElem:
@@ -53,9 +162,64 @@ class PaillierElem:
         return PaillierElem(self.pk, pow(self.c, other, self.pk.n2))
 
 
+def _window(count: int, bits: int) -> int:
+    # Window minimising (bits / c) * (count + 2 * 2^c) multiplications
+    return min(range(1, 17), key=lambda c: ((bits + c - 1) // c) * (count + (2 << c)))
+
+
+def multi_exp(cs: List[PaillierElem], es: List[int]) -> PaillierElem:
+    """
+    Homomorphic sum of es[i] * cs[i] computed as one multi-exponentiation (Pippenger) modulo n^2
+
+    :param cs: Cipher texts under the same public key
+    :param es: Integer scalars, negative ones are reduced modulo n
+    :return: Cipher text of sum(es[i] * m[i])
+    """
+    if len(cs) != len(es):
+        raise Exception("Number of cipher texts and scalars must be equal")
+    if len(cs) == 0:
+        raise Exception("Empty multi-exponentiation")
+    pk = cs[0].pk
+    n2 = pk.n2
+    terms = []
+    for c, e in zip(cs, es):
+        if c.pk.n != pk.n:
+            raise ValueError("Different public keys")
+        e = mpz(e) % pk.n if e < 0 else mpz(e)
+        if e:
+            terms.append((mpz(c.c), e))
+    if not terms:
+        return PaillierElem(pk, mpz(1))
+
+    bits = max(e.bit_length() for _, e in terms)
+    c = _window(len(terms), bits)
+    mask = (1 << c) - 1
+    res = mpz(1)
+    for w in reversed(range(0, bits, c)):
+        res = powmod(res, 1 << c, n2)
+        buckets = [None] * (mask + 1)
+        for base, e in terms:
+            d = (e >> w) & mask
+            if d:
+                x = buckets[d]
+                buckets[d] = base if x is None else x * base % n2
+        # sum(d * bucket[d]) as running products from the top bucket down
+        run, acc = None, mpz(1)
+        for d in range(mask, 0, -1):
+            x = buckets[d]
+            if x is not None:
+                run = x if run is None else run * x % n2
+            if run is not None:
+                acc = acc * run % n2
+        res = res * acc % n2
+    return PaillierElem(pk, res)
+
+
 class Paillier:
     @staticmethod
     def generate(bits=1024, p=None, q=None):
+        if p is None and q is None:
+            p, q = getStrongPrimes(bits, 2)
         if p is None:
             p = getStrongPrime(bits)
         if q is None:
@@ -63,9 +227,4 @@ class Paillier:
         n = p * q
         g = n + 1
         lcm = (p - 1) * (q - 1) // gcd(p - 1, q - 1)
-        return PaillierKey(mpz(n), mpz(g), mpz(lcm))
-
-
-
-
-
+        return PaillierKey(mpz(n), mpz(g), mpz(lcm), mpz(p), mpz(q))
@@ -1,10 +1,17 @@
 from __future__ import annotations
 
+from typing import List, Tuple
+
+from mife.data import bn128_tower
 from mife.data.pairing import PairingBase, GroupElem
+from mife.data.fixed_base import FixedBaseComb
 from py_ecc.bn128.bn128_pairing import pairing, curve_order
-from py_ecc.bn128.bn128_curve import (G1, G2, FQ, FQ2, FQ12, add, neg, eq, multiply)
+from py_ecc.bn128.bn128_curve import (G1, G2, FQ, FQ2, FQ12, add, double, neg, eq, multiply)
 from py_ecc.typing import Point2D
 
+_G1_COMB = FixedBaseComb(G1, curve_order.bit_length(), add, double, None, name="bn128.G1")
+_G2_COMB = FixedBaseComb(G2, curve_order.bit_length(), add, double, None, name="bn128.G2")
+
 
 class Bn128Pairing(PairingBase):
 
@@ -15,14 +22,14 @@ class Bn128Pairing(PairingBase):
         return curve_order
 
     def generator1(self) -> Bn128PairingPoint1:
-        return Bn128PairingPoint1(G1)
+        return Bn128PairingPoint1(G1, _G1_COMB)
 
     def generator2(self) -> Bn128PairingPoint2:
-        return Bn128PairingPoint2(G2)
+        return Bn128PairingPoint2(G2, _G2_COMB)
 
     def generatorT(self) -> Bn128PairingPointT:
         if self.identity_t is None:
-            self.identity_t = Bn128PairingPointT(pairing(G2, G1))
+            self.identity_t = Bn128PairingPointT.from_fq12(pairing(G2, G1))
         return self.identity_t
 
     def identity1(self) -> GroupElem:
@@ -32,16 +39,17 @@ class Bn128Pairing(PairingBase):
         return Bn128PairingPoint2(None)
 
     def identityT(self) -> GroupElem:
-        return Bn128PairingPointT(None)
+        return Bn128PairingPointT(bn128_tower.FP12_ONE)
 
     def pairing(self, g1: Bn128PairingPoint1, g2: Bn128PairingPoint2) -> GroupElem:
-        return Bn128PairingPointT(pairing(g2.point, g1.point))
+        return Bn128PairingPointT.from_fq12(pairing(g2.point, g1.point))
 
 
 class Bn128PairingPoint1(GroupElem):
 
-    def __init__(self, point: Point2D[FQ]):
+    def __init__(self, point: Point2D[FQ], comb: FixedBaseComb = None):
         self.point = point
+        self.comb = comb
 
     def __add__(self, other):
         return Bn128PairingPoint1(add(self.point, other.point))
@@ -50,11 +58,19 @@ class Bn128PairingPoint1(GroupElem):
         return Bn128PairingPoint1(neg(self.point))
 
     def __rmul__(self, other):
+        if self.comb is not None:
+            return Bn128PairingPoint1(self.comb.multiply(other % curve_order))
         return Bn128PairingPoint1(multiply(self.point, other))
 
     def __eq__(self, other):
         return eq(self.point, other.point)
 
+    def __reduce__(self):
+        # py_ecc.bn128 field elements are not picklable, send the coordinates as ints instead
+        if self.point is None:
+            return Bn128PairingPoint1, (None, self.comb)
+        return _point1_from_ints, (tuple(int(c) for c in self.point), self.comb)
+
     def __hash__(self):
         pass
 
@@ -64,8 +80,9 @@ class Bn128PairingPoint1(GroupElem):
 
 class Bn128PairingPoint2(GroupElem):
 
-    def __init__(self, point: Point2D[FQ2]):
+    def __init__(self, point: Point2D[FQ2], comb: FixedBaseComb = None):
         self.point = point
+        self.comb = comb
 
     def __add__(self, other):
         return Bn128PairingPoint2(add(self.point, other.point))
@@ -74,11 +91,18 @@ class Bn128PairingPoint2(GroupElem):
         return Bn128PairingPoint2(neg(self.point))
 
     def __rmul__(self, other):
+        if self.comb is not None:
+            return Bn128PairingPoint2(self.comb.multiply(other % curve_order))
         return Bn128PairingPoint2(multiply(self.point, other))
 
     def __eq__(self, other):
         return eq(self.point, other.point)
 
+    def __reduce__(self):
+        if self.point is None:
+            return Bn128PairingPoint2, (None, self.comb)
+        return _point2_from_ints, (tuple(tuple(int(c) for c in v.coeffs) for v in self.point), self.comb)
+
     def __hash__(self):
         pass
 
@@ -86,25 +110,49 @@ class Bn128PairingPoint2(GroupElem):
         pass
 
 
+def _point1_from_ints(point: Tuple[int, int], comb: FixedBaseComb) -> Bn128PairingPoint1:
+    return Bn128PairingPoint1((FQ(point[0]), FQ(point[1])), comb)
+
+
+def _point2_from_ints(point: Tuple[Tuple[int, int], Tuple[int, int]], comb: FixedBaseComb) -> Bn128PairingPoint2:
+    return Bn128PairingPoint2((FQ2(list(point[0])), FQ2(list(point[1]))), comb)
+
+
 class Bn128PairingPointT(GroupElem):
+    # Elements of GT lie in the cyclotomic subgroup of Fp12, they are kept in the bn128_tower
+    # representation so that inversion is a conjugation and squaring is Granger-Scott squaring
 
-    def __init__(self, val: FQ12):
+    def __init__(self, val: bn128_tower.Fp12):
         self.val = val
 
+    @staticmethod
+    def from_fq12(val: FQ12) -> Bn128PairingPointT:
+        return Bn128PairingPointT(bn128_tower.from_fq12_coeffs(val.coeffs))
+
     def __add__(self, other):
-        return Bn128PairingPointT(self.val * other.val)
+        return Bn128PairingPointT(bn128_tower.fp12_mul(self.val, other.val))
 
     def __neg__(self):
-        return Bn128PairingPointT(FQ12.one() / self.val)
+        return Bn128PairingPointT(bn128_tower.fp12_conj(self.val))
 
     def __rmul__(self, other):
-        return Bn128PairingPointT(self.val ** other)
+        other %= curve_order
+        if other > curve_order // 2:
+            other -= curve_order
+        return Bn128PairingPointT(bn128_tower.fp12_cyclotomic_pow(self.val, other))
+
+    @staticmethod
+    def compress_many(elems: List[Bn128PairingPointT]) -> List[Tuple]:
+        # Torus compression halves the size of dlog table keys
+        return bn128_tower.fp12_t2_compress_many([e.val for e in elems])
 
     def __eq__(self, other):
         return self.val == other.val
 
     def __hash__(self):
-        return hash(str(self.val))
+        return hash(self.val)
 
     def export(self) -> dict:
-        pass
+        return {
+            "val": bn128_tower.to_fq12_coeffs(self.val)
+        }
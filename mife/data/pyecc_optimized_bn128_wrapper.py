@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from mife.data import bn128_tower
+from mife.data.pairing import PairingBase, GroupElem
+from mife.data.fixed_base import FixedBaseComb
+from mife.data.pyecc_bn128_wrapper import Bn128PairingPointT
+from py_ecc.optimized_bn128.optimized_curve import (G1, G2, Z1, Z2, FQ, FQ2, curve_order,
+                                                    add, double, neg, eq, multiply, normalize, is_inf)
+from py_ecc.typing import Optimized_Point3D
+from gmpy2 import mpz
+
+
+_G1_COMB = FixedBaseComb(G1, curve_order.bit_length(), add, double, Z1, name="optimized_bn128.G1")
+_G2_COMB = FixedBaseComb(G2, curve_order.bit_length(), add, double, Z2, name="optimized_bn128.G2")
+
+
+# Same curve and target group as Bn128Pairing, but G1 / G2 use projective coordinates from
+# py_ecc.optimized_bn128 and the pairing itself is computed with bn128_tower (optimal ate
+# Miller loop with sparse line multiplication and a cyclotomic final exponentiation).
+# Target group elements are shared with Bn128Pairing, so results of both backends compare equal.
+
+class OptimizedBn128Pairing(PairingBase):
+
+    def __init__(self):
+        self.generator_t = None
+
+    def order(self) -> int:
+        return curve_order
+
+    def generator1(self) -> OptimizedBn128PairingPoint1:
+        return OptimizedBn128PairingPoint1(G1, _G1_COMB)
+
+    def generator2(self) -> OptimizedBn128PairingPoint2:
+        return OptimizedBn128PairingPoint2(G2, _G2_COMB)
+
+    def generatorT(self) -> Bn128PairingPointT:
+        if self.generator_t is None:
+            self.generator_t = self.pairing(self.generator1(), self.generator2())
+        return self.generator_t
+
+    def identity1(self) -> GroupElem:
+        return OptimizedBn128PairingPoint1(Z1)
+
+    def identity2(self) -> GroupElem:
+        return OptimizedBn128PairingPoint2(Z2)
+
+    def identityT(self) -> GroupElem:
+        return Bn128PairingPointT(bn128_tower.FP12_ONE)
+
+    def pairing(self, g1: OptimizedBn128PairingPoint1, g2: OptimizedBn128PairingPoint2) -> GroupElem:
+        if is_inf(g1.point) or is_inf(g2.point):
+            return Bn128PairingPointT(bn128_tower.FP12_ONE)
+        return Bn128PairingPointT(bn128_tower.pairing(g2.affine(), g1.affine()))
+
+
+class OptimizedBn128PairingPoint1(GroupElem):
+
+    def __init__(self, point: Optimized_Point3D[FQ], comb: FixedBaseComb = None):
+        self.point = point
+        self.comb = comb
+
+    def affine(self):
+        x, y = normalize(self.point)
+        return mpz(x.n), mpz(y.n)
+
+    def __add__(self, other):
+        return OptimizedBn128PairingPoint1(add(self.point, other.point))
+
+    def __neg__(self):
+        return OptimizedBn128PairingPoint1(neg(self.point))
+
+    def __rmul__(self, other):
+        if self.comb is not None:
+            return OptimizedBn128PairingPoint1(self.comb.multiply(other % curve_order))
+        return OptimizedBn128PairingPoint1(multiply(self.point, other % curve_order))
+
+    def __eq__(self, other):
+        return eq(self.point, other.point)
+
+    def __hash__(self):
+        if is_inf(self.point):
+            return hash(None)
+        return hash(self.affine())
+
+    def export(self) -> dict:
+        if is_inf(self.point):
+            return {"x": None, "y": None}
+        x, y = self.affine()
+        return {"x": int(x), "y": int(y)}
+
+
+class OptimizedBn128PairingPoint2(GroupElem):
+
+    def __init__(self, point: Optimized_Point3D[FQ2], comb: FixedBaseComb = None):
+        self.point = point
+        self.comb = comb
+
+    def affine(self):
+        x, y = normalize(self.point)
+        return (mpz(x.coeffs[0]), mpz(x.coeffs[1])), (mpz(y.coeffs[0]), mpz(y.coeffs[1]))
+
+    def __add__(self, other):
+        return OptimizedBn128PairingPoint2(add(self.point, other.point))
+
+    def __neg__(self):
+        return OptimizedBn128PairingPoint2(neg(self.point))
+
+    def __rmul__(self, other):
+        if self.comb is not None:
+            return OptimizedBn128PairingPoint2(self.comb.multiply(other % curve_order))
+        return OptimizedBn128PairingPoint2(multiply(self.point, other % curve_order))
+
+    def __eq__(self, other):
+        return eq(self.point, other.point)
+
+    def __hash__(self):
+        if is_inf(self.point):
+            return hash(None)
+        return hash(self.affine())
+
+    def export(self) -> dict:
+        if is_inf(self.point):
+            return {"x": None, "y": None}
+        x, y = self.affine()
+        return {"x": [int(c) for c in x], "y": [int(c) for c in y]}
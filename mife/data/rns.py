@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+from typing import List, Tuple, Any
+
+import numpy as np
+from Crypto.Util.number import isPrime
+
+# Residue number system: an integer matrix is held as its residues modulo several ~30 bit
+# primes in uint64 arrays of shape (k, rows, cols). For a matmul both operands are split in
+# 15 bit limbs and multiplied as float64 through BLAS: limb products are below 2^30, so up to
+# 2^22 of them sum exactly within the 53 bit mantissa before the result is reduced.
+
+PRIME_BITS = 30
+_LIMB_BITS = 15
+_LIMB_MASK = (1 << _LIMB_BITS) - 1
+_BLOCK = 1 << 21
+
+_primes = []
+
+
+def rns_primes(k: int) -> List[int]:
+    """
+    :param k: Number of primes
+    :return: The k largest primes below 2^PRIME_BITS
+    """
+    candidate = _primes[-1] - 2 if _primes else (1 << PRIME_BITS) - 1
+    while len(_primes) < k:
+        if isPrime(candidate):
+            _primes.append(candidate)
+        candidate -= 2
+    return _primes[:k]
+
+
+class RNSBasis:
+
+    def __init__(self, primes: List[int]):
+        self.primes = primes
+        self.k = len(primes)
+        self.p = np.array(primes, dtype=np.uint64).reshape(self.k, 1, 1)
+        self.Q = 1
+        for prime in primes:
+            self.Q *= prime
+        # Garner constants, inv[i][j] = p_j^-1 mod p_i for j < i
+        self.inv = [[pow(primes[j], -1, primes[i]) for j in range(i)] for i in range(self.k)]
+
+    @staticmethod
+    def for_bits(bits: int) -> RNSBasis:
+        """
+        :param bits: Upper bound on the bit length of the absolute value of any result
+        :return: Basis whose product exceeds 2^(bits + 1), so signed results decode exactly
+        """
+        return RNSBasis(rns_primes((bits + 1) // (PRIME_BITS - 1) + 1))
+
+    def __eq__(self, other):
+        return isinstance(other, RNSBasis) and self.primes == other.primes
+
+    def encode(self, X: Any) -> RNSMatrix:
+        """
+        :param X: Integer, vector or matrix of ints (lists, int64 or object arrays)
+        :return: Residues of X
+        """
+        arr = np.asarray(X)
+        shape = arr.shape
+        if arr.ndim == 0:
+            arr = arr.reshape(1, 1)
+        elif arr.ndim == 1:
+            arr = arr.reshape(1, -1)
+        if arr.dtype.kind in "iu" and arr.dtype.itemsize <= 8 and np.abs(arr).max(initial=0) < (1 << 62):
+            arr = arr.astype(np.int64)
+            res = np.stack([arr % p for p in self.primes]).astype(np.uint64)
+        else:
+            res = self._encode_big(arr)
+        return RNSMatrix(self, res, shape)
+
+    def _encode_big(self, arr: np.ndarray) -> np.ndarray:
+        arr = arr.astype(object)
+        return np.stack([(arr % p).astype(np.uint64) for p in self.primes])
+
+
+class RNSMatrix:
+
+    def __init__(self, basis: RNSBasis, res: np.ndarray, shape: Tuple[int, ...]):
+        """
+        :param basis: RNS basis
+        :param res: Residues of shape (k, rows, cols)
+        :param shape: Logical shape, vectors are stored as a single row
+        """
+        self.basis = basis
+        self.res = res
+        self.shape = shape
+        self._limbs = None
+
+    def limbs(self) -> Tuple[np.ndarray, np.ndarray]:
+        # float64 limbs of the residues, cached since keys reuse the same matrix in every product
+        if self._limbs is None:
+            res = self.res
+            if len(self.shape) == 1:
+                res = res.reshape(self.basis.k, -1, 1)
+            self._limbs = (res & _LIMB_MASK).astype(np.float64), (res >> _LIMB_BITS).astype(np.float64)
+        return self._limbs
+
+    def __matmul__(self, other: RNSMatrix) -> RNSMatrix:
+        if self.basis != other.basis:
+            raise Exception("RNS basis mismatch")
+        a_lo, a_hi = self.limbs() if len(self.shape) != 1 else (l.reshape(self.basis.k, 1, -1) for l in self.limbs())
+        b_lo, b_hi = other.limbs()
+        if a_lo.shape[2] != b_lo.shape[1]:
+            raise Exception(f"Matrix multiplication not supported for size {self.shape} and {other.shape}")
+        p = self.basis.p
+        res = np.zeros((a_lo.shape[0], a_lo.shape[1], b_lo.shape[2]), dtype=np.uint64)
+        for s in range(0, a_lo.shape[2], _BLOCK):
+            blk = slice(s, s + _BLOCK)
+            ll = np.matmul(a_lo[:, :, blk], b_lo[:, blk]).astype(np.uint64) % p
+            mid = (np.matmul(a_lo[:, :, blk], b_hi[:, blk]).astype(np.uint64) +
+                   np.matmul(a_hi[:, :, blk], b_lo[:, blk]).astype(np.uint64)) % p
+            hh = np.matmul(a_hi[:, :, blk], b_hi[:, blk]).astype(np.uint64) % p
+            res = (res + ll + (mid << np.uint64(_LIMB_BITS)) % p + (hh << np.uint64(2 * _LIMB_BITS)) % p) % p
+
+        shape = self.shape[:-1] + other.shape[1:]
+        if len(self.shape) == 1 and len(other.shape) == 1:
+            shape = ()
+        elif len(shape) == 1:
+            # Vectors are stored as a single row
+            res = res.reshape(self.basis.k, 1, -1)
+        return RNSMatrix(self.basis, res, shape)
+
+    def _check_shape(self, other: RNSMatrix):
+        if self.basis != other.basis or self.shape != other.shape:
+            raise Exception(f"Shape or basis mismatch for {self.shape} and {other.shape}")
+
+    def __add__(self, other: RNSMatrix) -> RNSMatrix:
+        self._check_shape(other)
+        return RNSMatrix(self.basis, (self.res + other.res) % self.basis.p, self.shape)
+
+    def __sub__(self, other: RNSMatrix) -> RNSMatrix:
+        self._check_shape(other)
+        return RNSMatrix(self.basis, (self.res + self.basis.p - other.res) % self.basis.p, self.shape)
+
+    def __neg__(self) -> RNSMatrix:
+        return RNSMatrix(self.basis, (self.basis.p - self.res) % self.basis.p, self.shape)
+
+    def __rmul__(self, other: int) -> RNSMatrix:
+        s = np.array([other % p for p in self.basis.primes], dtype=np.uint64).reshape(-1, 1, 1)
+        return RNSMatrix(self.basis, (self.res * s) % self.basis.p, self.shape)
+
+    def __mul__(self, other: int) -> RNSMatrix:
+        return self.__rmul__(other)
+
+    @property
+    def T(self) -> RNSMatrix:
+        if len(self.shape) < 2:
+            return self
+        return RNSMatrix(self.basis, np.ascontiguousarray(self.res.transpose(0, 2, 1)), self.shape[::-1])
+
+    def rows(self, start: int, stop: int) -> RNSMatrix:
+        """
+        :return: Rows [start, stop) of a matrix
+        """
+        return RNSMatrix(self.basis, self.res[:, start:stop], (min(stop, self.shape[0]) - start, self.shape[1]))
+
+    def decode(self) -> np.ndarray:
+        """
+        Garner CRT reconstruction
+
+        :return: Object array of the signed integers in (-Q/2, Q/2]
+        """
+        basis = self.basis
+        primes = basis.primes
+        x = self.res
+        digits = []
+        for i in range(basis.k):
+            p = np.uint64(primes[i])
+            t = x[i]
+            for j in range(i):
+                t = ((t + p - digits[j] % p) % p) * np.uint64(basis.inv[i][j]) % p
+            digits.append(t)
+
+        acc = digits[-1].astype(object)
+        for i in range(basis.k - 2, -1, -1):
+            acc = acc * primes[i] + digits[i].astype(object)
+        acc = np.where(acc > basis.Q // 2, acc - basis.Q, acc)
+        return acc.reshape(self.shape)
+
+    def mod(self, q: int) -> np.ndarray:
+        """
+        :param q: Modulus
+        :return: Object array of the decoded integers reduced modulo q
+        """
+        return self.decode() % q
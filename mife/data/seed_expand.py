@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import os
+from hashlib import shake_128
+from typing import Iterator, Tuple
+
+import numpy as np
+
+# Uniform matrices mod q expanded from a 32 byte seed. Row i is read from SHAKE-128(seed || i),
+# so any block of rows can be regenerated on its own. Candidates are little-endian 64 bit words
+# masked to the bit length of q and rejected when >= q. Since SHAKE output is prefix consistent,
+# how many candidates are drawn per row does not change the matrix.
+
+SEED_BYTES = 32
+
+
+def new_seed() -> bytes:
+    return os.urandom(SEED_BYTES)
+
+
+def _row_stream(seed: bytes, i: int, size: int) -> bytes:
+    return shake_128(seed + i.to_bytes(8, "little")).digest(size)
+
+
+def _candidates(buf: bytes, q: int) -> Tuple[np.ndarray, np.ndarray]:
+    # Candidate words (masked to the bit length of q) and which of them are below q.
+    # Acceptance is decided on the top word, the full comparison is only needed when it equals the top of q.
+    words = (q.bit_length() + 63) // 64
+    top_shift = 64 * (words - 1)
+    arr = np.frombuffer(buf, dtype="<u8").reshape(-1, words).copy()
+    arr[:, -1] &= np.uint64((1 << (q.bit_length() - top_shift)) - 1)
+    q_top = np.uint64(q >> top_shift)
+    accepted = arr[:, -1] < q_top
+    if words > 1:
+        for i in np.flatnonzero(arr[:, -1] == q_top):
+            accepted[i] = int.from_bytes(arr[i].tobytes(), "little") < q
+    return arr, accepted
+
+
+def _to_ints(arr: np.ndarray, q: int) -> np.ndarray:
+    # int64 values when q < 2^63, otherwise an object array of Python ints
+    if arr.shape[1] == 1 and q < (1 << 63):
+        return arr[:, 0].astype(np.int64)
+    size = 8 * arr.shape[1]
+    buf = arr.tobytes()
+    from_bytes = int.from_bytes
+    return np.array([from_bytes(buf[i:i + size], "little") for i in range(0, len(buf), size)], dtype=object)
+
+
+def _count(q: int, n: int) -> int:
+    # Candidates drawn per row, enough for n accepted ones except with negligible probability
+    return int(n * (1 << q.bit_length()) / q * 1.2) + 16
+
+
+def expand_row(seed: bytes, q: int, n: int, i: int) -> np.ndarray:
+    """
+    :return: Row i of the matrix, n uniform integers mod q
+    """
+    word_bytes = 8 * ((q.bit_length() + 63) // 64)
+    count = _count(q, n)
+    while True:
+        arr, accepted = _candidates(_row_stream(seed, i, count * word_bytes), q)
+        if accepted.sum() >= n:
+            return _to_ints(arr[accepted][:n], q)
+        count *= 2
+
+
+def expand_rows(seed: bytes, q: int, n: int, start: int, stop: int) -> np.ndarray:
+    """
+    :param seed: Matrix seed
+    :param q: Modulus
+    :param n: Number of columns
+    :param start: First row
+    :param stop: End row (exclusive)
+    :return: Rows [start, stop) as an int64 array when q < 2^63, otherwise an object array
+    """
+    rows = stop - start
+    words = (q.bit_length() + 63) // 64
+    count = _count(q, n)
+    buf = b"".join(_row_stream(seed, i, count * 8 * words) for i in range(start, stop))
+    arr, accepted = _candidates(buf, q)
+    accepted = accepted.reshape(rows, count)
+
+    # Keep the first n accepted candidates of every row, rows short of n are expanded further
+    rank = np.cumsum(accepted, axis=1)
+    keep = accepted & (rank <= n)
+    if rows == 0 or rank[:, -1].min() >= n:
+        return _to_ints(arr[keep.reshape(-1)], q).reshape(rows, n)
+    out = [expand_row(seed, q, n, start + r) if rank[r, -1] < n else _to_ints(arr[r * count:(r + 1) * count][keep[r]], q)
+           for r in range(rows)]
+    return np.stack(out)
+
+
+def expand_blocks(seed: bytes, q: int, m: int, n: int, block: int = 4096) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Stream the m x n matrix in row blocks
+
+    :return: Iterator of (first row, block of rows)
+    """
+    for start in range(0, m, block):
+        yield start, expand_rows(seed, q, n, start, min(m, start + block))
+
+
+def expand_matrix(seed: bytes, q: int, m: int, n: int) -> np.ndarray:
+    """
+    :return: The whole m x n matrix
+    """
+    return expand_rows(seed, q, n, 0, m)
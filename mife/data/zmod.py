@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import os
 import secrets
 
+from concurrent.futures import ThreadPoolExecutor
 from mife.data.group import GroupBase, GroupElem
-from typing import Self, TypedDict
+from typing import Self, TypedDict, List, Callable
 from gmpy2 import powmod, gcd, invert, mpz
+from mife.data.gmpy_compat import powmod_exp_list, powmod_base_list
 from Crypto.Util.number import isPrime
 
 
@@ -65,6 +68,20 @@ class _ZmodElem(GroupElem):
     def __rmul__(self, other: int):
         return _ZmodElem(self.group, powmod(self.val, other, self.group.modulus))
 
+    def mul_many(self, scalars: List[int], workers: int = 1) -> List[_ZmodElem]:
+        # powmod_exp_list releases the GIL, so chunks run in threads
+        mod = self.group.modulus
+        vals = _chunked(lambda chunk: powmod_exp_list(self.val, chunk, mod), scalars, workers)
+        return [_ZmodElem(self.group, v) for v in vals]
+
+    @classmethod
+    def scale_many(cls, elems: List[_ZmodElem], k: int, workers: int = 1) -> List[_ZmodElem]:
+        if len(elems) == 0:
+            return []
+        group = elems[0].group
+        vals = _chunked(lambda chunk: powmod_base_list(chunk, k, group.modulus), [e.val for e in elems], workers)
+        return [_ZmodElem(group, v) for v in vals]
+
     def __eq__(self, other):
         return type(self) == type(other) and self.group == other.group and self.val == other.val
 
@@ -77,4 +94,15 @@ class _ZmodElem(GroupElem):
     def export(self) -> dict:
         return {
             "val": int(self.val)
-        }
\ No newline at end of file
+        }
+
+def _chunked(func: Callable, items: List, workers: int) -> List:
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(items))
+    if workers <= 1:
+        return func(items)
+    size = -(-len(items) // workers)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        chunks = executor.map(func, [items[i:i + size] for i in range(0, len(items), size)])
+    return [v for chunk in chunks for v in chunk]
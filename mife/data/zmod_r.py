@@ -1,14 +1,19 @@
 from __future__ import annotations
 
-from typing import Self
-from gmpy2 import mpz
-from Crypto.Util.number import inverse
+from operator import mul
+from typing import Self, List
+from gmpy2 import mpz, invert
 
 
 class ZmodR():
 
+    # Values are only reduced once they grow past modulus * 2^LAZY_BITS
+    LAZY_BITS = 64
+
     def __init__(self, modulus: int):
         self.modulus = modulus
+        self._mod = mpz(modulus)
+        self._bound = self._mod << ZmodR.LAZY_BITS
 
     def __call__(self, elem: int) -> _ZmodRElem:
         elem = elem % self.modulus
@@ -32,56 +37,89 @@ class ZmodR():
     def identity(self) -> _ZmodRElem:
         return _ZmodRElem(self, mpz(0))
 
+    def dot(self, x: List[_ZmodRElem | int], y: List[_ZmodRElem | int]) -> _ZmodRElem:
+        """
+        Fused inner product, the products are summed unreduced and reduced once
+
+        :param x: First vector
+        :param y: Second vector
+        :return: <x, y> as an element of the ring
+        """
+        if len(x) != len(y):
+            raise Exception("Length of inner product different")
+        return _ZmodRElem(self, sum(map(mul, map(_raw, x), map(_raw, y)), mpz(0)) % self._mod)
+
+
+def _raw(a: _ZmodRElem | int) -> mpz:
+    return a._val if type(a) is _ZmodRElem else a
+
 
 class _ZmodRElem():
+    __slots__ = ("group", "_val")
 
     def __init__(self, group: ZmodR, val: mpz):
         self.group = group
         self._val = val
 
+    @staticmethod
+    def _lazy(group: ZmodR, val: mpz) -> _ZmodRElem:
+        if val >= group._bound or val <= -group._bound:
+            val = val % group._mod
+        return _ZmodRElem(group, val)
+
     @property
     def val(self):
-        self._val = self._val % self.group.modulus
-        return self._val
+        v = self._val
+        if v < 0 or v >= self.group._mod:
+            v = self._val = v % self.group._mod
+        return v
 
     def __radd__(self, other):
         return self.__add__(other)
 
     def __add__(self, other: Self) -> Self:
-        if isinstance(other, int) or isinstance(other, mpz):
-            return _ZmodRElem(self.group, (self._val + other) % self.group.modulus)
-        if self.group != other.group:
-            return Exception(f"Addition not define for element of {self.group} and {other.group}")
-        return _ZmodRElem(self.group, (self._val + other._val) % self.group.modulus)
+        if type(other) is _ZmodRElem:
+            if self.group is not other.group and self.group != other.group:
+                return Exception(f"Addition not define for element of {self.group} and {other.group}")
+            return _ZmodRElem._lazy(self.group, self._val + other._val)
+        return _ZmodRElem._lazy(self.group, self._val + other)
 
     def __rsub__(self, other):
-        return _ZmodRElem(self.group, (other - self._val) % self.group.modulus)
+        return _ZmodRElem._lazy(self.group, other - self._val)
 
     def __neg__(self) -> Self:
         return _ZmodRElem(self.group, -self._val)
 
     def __sub__(self, other):
-        return self.__add__(-other)
+        if type(other) is _ZmodRElem:
+            return _ZmodRElem._lazy(self.group, self._val - other._val)
+        return _ZmodRElem._lazy(self.group, self._val - other)
 
     def __rmul__(self, other):
         return self.__mul__(other)
 
     def __mul__(self, other: _ZmodRElem):
-        if isinstance(other, int) or isinstance(other, mpz):
-            return _ZmodRElem(self.group, (self._val * other) % self.group.modulus)
-        return _ZmodRElem(self.group, (self._val * other._val) % self.group.modulus)
+        if type(other) is _ZmodRElem:
+            return _ZmodRElem._lazy(self.group, self._val * other._val)
+        return _ZmodRElem._lazy(self.group, self._val * other)
+
+    def fma(self, a: _ZmodRElem | int, b: _ZmodRElem | int) -> _ZmodRElem:
+        """
+        Fused multiply-add
+
+        :return: self + a * b with at most one reduction
+        """
+        return _ZmodRElem._lazy(self.group, self._val + _raw(a) * _raw(b))
 
     def __truediv__(self, other):
-        if isinstance(other, int):
-            return self.__mul__(_ZmodRElem(self.group, mpz(inverse(other, self.group.modulus))))
-        return self.__mul__(_ZmodRElem(self.group, mpz(inverse(other._val, self.group.modulus))))
+        return self.__mul__(_ZmodRElem(self.group, invert(_raw(other), self.group._mod)))
 
     def __rtruediv__(self, other):
-        return _ZmodRElem(self.group, other * mpz(inverse(self._val, self.group.modulus)))
+        return _ZmodRElem(self.group, other * invert(self._val, self.group._mod) % self.group._mod)
 
     def __eq__(self, other):
-        if (isinstance(other, int) or isinstance(other, mpz)):
-            return self.val == _ZmodRElem(self.group, other).val
+        if isinstance(other, int) or isinstance(other, mpz):
+            return (self._val - other) % self.group._mod == 0
         return type(self) == type(other) and self.group == other.group and self.val == other.val
 
     def __int__(self):
@@ -91,4 +129,4 @@ class _ZmodRElem():
         return hash(self.val)
 
     def __str__(self):
-        return str(self.val)
\ No newline at end of file
+        return str(self.val)
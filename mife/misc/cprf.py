@@ -3,6 +3,8 @@ from Crypto.Cipher import AES
 from hashlib import sha256
 from typing import List
 
+import numpy as np
+
 class CPRF:
     def __init__(self, n: int):
         self.keys = None
@@ -27,12 +29,64 @@ class CPRF:
 
     @staticmethod
     def eval(n, i, keys: List[bytes], x: bytes, length: int):
-        res = 0
+        return CPRF.eval_many(n, i, keys, [x], length)[0]
+
+    @staticmethod
+    def ciphers(n, i, keys: List[bytes]) -> List:
+        """
+        Expand the AES key schedules of the peer keys once, for reuse across eval_many calls.
+        They hold the secret keys, so keep them with the party that owns the keys
+
+        :return: ECB cipher per peer, None at index i
+        """
+        return [None if j == i else AES.new(keys[j], AES.MODE_ECB) for j in range(n)]
+
+    @staticmethod
+    def eval_many(n, i, keys: List[bytes], inputs: List[bytes], length: int, ciphers: List = None) -> List[int]:
+        """
+        Evaluate the CPRF on several inputs, equal to [eval(n, i, keys, x, length) for x in inputs]
+
+        :param n: Number of parties
+        :param i: Index of this party
+        :param keys: Keys of this party from keygen
+        :param inputs: Inputs to evaluate on
+        :param length: Output length in bytes
+        :param ciphers: Result of ciphers(n, i, keys), expanded for this call when None
+        :return: Outputs for every input
+        """
+        if not inputs:
+            return []
+        if ciphers is None:
+            ciphers = CPRF.ciphers(n, i, keys)
+        count = len(inputs)
+        blocks = (length + 15) // 16
+
+        # The AES-CTR counter blocks (nonce || counter) of all inputs, so every peer encrypts them
+        # with a single ECB call instead of one CTR cipher per input
+        nonces = np.frombuffer(b''.join(sha256(x).digest()[:8] for x in inputs), dtype=np.uint8).reshape(count, 1, 8)
+        counters = np.arange(blocks, dtype='>u8').view(np.uint8).reshape(1, blocks, 8)
+        ctr = np.concatenate((np.broadcast_to(nonces, (count, blocks, 8)),
+                              np.broadcast_to(counters, (count, blocks, 8))), axis=2).tobytes()
+
+        # Outputs are laid out in slots with zero guard bytes on top, so the keystreams of all
+        # peers can be summed as single integers without carries crossing into the next slot
+        guard = (n.bit_length() + 7) // 8 + 1
+        slot = length + guard
+        pos, neg = 0, 0
         for j in range(n):
             if j == i:
                 continue
-            nonce = sha256(x).digest()
-            cipher = AES.new(keys[j], AES.MODE_CTR, nonce=nonce[:8])
-            prf_out = cipher.encrypt(b'\x00' * length)
-            res += (-1)**(j < i) * int.from_bytes(prf_out, 'big')
-        return res
+            stream = np.frombuffer(ciphers[j].encrypt(ctr), dtype=np.uint8).reshape(count, blocks * 16)
+            padded = np.zeros((count, slot), dtype=np.uint8)
+            padded[:, guard:] = stream[:, :length]
+            value = int.from_bytes(padded.tobytes(), 'big')
+            if j < i:
+                neg += value
+            else:
+                pos += value
+
+        size = count * slot
+        pos, neg = pos.to_bytes(size, 'big'), neg.to_bytes(size, 'big')
+        return [int.from_bytes(pos[k:k + slot], 'big') - int.from_bytes(neg[k:k + slot], 'big')
+                for k in range(0, size, slot)]
+
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import queue
+import threading
+from typing import Dict, Iterable, List
+
+from Crypto.Util.number import isPrime, getStrongPrime as getStrongPrimeCrypto
+
+from mife.common import cache_path
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Strong prime generation for Paillier keys and Zmod groups. The search is raced in a process pool,
+# and an optional on-disk cache keeps fresh primes ready for the next setup. A cached
+# prime is removed from the file when it is taken, so no prime is ever handed out twice. The file is
+# readable by its owner only and is refilled by a background thread.
+
+_CACHE_FILE = "strong_primes.json"
+
+
+def generate_strong_primes(bits: int, count: int = 1, workers: int = None) -> List[int]:
+    """
+    Every worker searches from its own random starting point and the first count distinct primes
+    found are kept, so a single prime is also found faster with more workers
+
+    :param bits: Bit length of the primes, a multiple of 128 of at least 512
+    :param count: Number of primes
+    :param workers: Number of worker processes, defaults to the cpu count. Runs in process if <= 1
+    :return: count fresh strong primes
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        return [getStrongPrimeCrypto(bits) for _ in range(count)]
+
+    found = queue.Queue()
+    res = []
+    # Leaving the block terminates the searches still running
+    with multiprocessing.Pool(workers) as pool:
+        def search():
+            pool.apply_async(getStrongPrimeCrypto, (bits,), callback=found.put, error_callback=found.put)
+
+        for _ in range(workers):
+            search()
+        while len(res) < count:
+            p = found.get()
+            if isinstance(p, BaseException):
+                raise p
+            if p not in res:
+                res.append(p)
+            # Keep every worker busy until enough primes are found
+            if len(res) < count:
+                search()
+    return res
+
+
+class PrimeCache:
+    def __init__(self, size: int = 4, path: str = None):
+        """
+        On-disk cache of fresh strong primes, shared between processes of the same user
+
+        :param size: Number of primes kept per bit length by the refill thread
+        :param path: Cache file, defaults to strong_primes.json in the cache directory
+        """
+        if fcntl is None:
+            raise Exception("Prime cache requires file locking (fcntl)")
+        self.size = size
+        self.path = path if path is not None else cache_path(_CACHE_FILE)
+        self._thread = None
+        self._stop = None
+        self._wake = threading.Event()
+
+    def _locked(self, update):
+        # Read, update and rewrite the file under an exclusive lock, the lock file also gets mode 0600
+        fd = os.open(self.path + ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            entries = self._load()
+            res = update(entries)
+            self._save(entries)
+            return res
+        finally:
+            os.close(fd)
+
+    def _load(self) -> Dict[int, List[int]]:
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            return {int(bits): [int(p, 16) for p in primes] for bits, primes in data.items()}
+        except (OSError, ValueError, AttributeError, TypeError):
+            return {}
+
+    def _save(self, entries: Dict[int, List[int]]):
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump({str(bits): [hex(p) for p in primes] for bits, primes in entries.items() if primes}, f)
+        os.replace(tmp, self.path)
+
+    def count(self, bits: int) -> int:
+        return len(self._load().get(bits, []))
+
+    def put(self, bits: int, primes: List[int]):
+        self._locked(lambda entries: entries.setdefault(bits, []).extend(primes))
+
+    def take(self, bits: int, count: int = 1) -> List[int]:
+        """
+        :return: Up to count cached primes of the given bit length, removed from the cache
+        """
+        def pop(entries):
+            cached = entries.get(bits, [])
+            res = []
+            while cached and len(res) < count:
+                p = cached.pop()
+                # Entries are checked again since the file may have been edited
+                if p.bit_length() == bits and isPrime(p):
+                    res.append(p)
+            return res
+
+        res = self._locked(pop)
+        self._wake.set()
+        return res
+
+    def refill(self, bits: Iterable[int] = (1024,), workers: int = None, stop: threading.Event = None) -> bool:
+        """
+        Top up the cache to size primes of every given bit length
+
+        :param bits: Bit lengths to keep
+        :param workers: Number of worker processes
+        :param stop: Abandon the refill when set, the primes found so far are not stored
+        :return: Whether any prime was added
+        """
+        missing = {b: self.size - self.count(b) for b in bits}
+        missing = {b: c for b, c in missing.items() if c > 0}
+        for b, c in missing.items():
+            primes = generate_strong_primes(b, c, workers)
+            if stop is not None and stop.is_set():
+                break
+            self.put(b, primes)
+        return bool(missing)
+
+    def start_refill(self, bits: Iterable[int] = (1024,), workers: int = None):
+        """
+        Keep size primes of every given bit length in the cache from a background thread
+
+        :param bits: Bit lengths to keep
+        :param workers: Number of worker processes used per refill
+        """
+        if self._thread is not None:
+            return
+        bits = list(bits)
+        stop = self._stop = threading.Event()
+
+        def refill():
+            while not stop.is_set():
+                if not self.refill(bits, workers, stop):
+                    self._wake.wait(1)
+                    self._wake.clear()
+
+        self._thread = threading.Thread(target=refill, daemon=True)
+        self._thread.start()
+
+    def stop_refill(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._wake.set()
+            # Waits for a search in progress, so the file is not written after this returns
+            self._thread.join()
+            self._thread = None
+
+
+_cache = None
+
+
+def enable_cache(bits: Iterable[int] = (1024,), size: int = 4, refill: bool = True,
+                 workers: int = None, path: str = None) -> PrimeCache:
+    """
+    Use an on-disk cache of fresh primes for strong_primes
+
+    :param bits: Bit lengths kept by the refill thread
+    :param size: Number of primes kept per bit length
+    :param refill: Start the background refill thread
+    :param workers: Number of worker processes used per refill
+    :param path: Cache file, defaults to strong_primes.json in the cache directory
+    :return: The cache
+    """
+    global _cache
+    disable_cache()
+    _cache = PrimeCache(size, path)
+    if refill:
+        _cache.start_refill(bits, workers)
+    return _cache
+
+
+def disable_cache():
+    global _cache
+    if _cache is not None:
+        _cache.stop_refill()
+        _cache = None
+
+
+def strong_primes(bits: int, count: int = 1, workers: int = None) -> List[int]:
+    """
+    :param bits: Bit length of the primes
+    :param count: Number of primes
+    :param workers: Number of worker processes for the primes not in the cache
+    :return: count distinct strong primes, from the cache when enabled and otherwise generated in parallel
+    """
+    res = _cache.take(bits, count) if _cache is not None else []
+    if len(res) < count:
+        res += generate_strong_primes(bits, count - len(res), workers)
+    return res
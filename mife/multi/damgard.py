@@ -2,7 +2,7 @@ from secrets import randbelow
 from typing import List, Tuple
 
 from mife.data.matrix import Matrix
-from mife.common import discrete_log_bound, inner_product, getStrongPrime
+from mife.common import discrete_log_bound, inner_product, getStrongPrime, sparse_vector, sparse_inner_product
 from mife.data.group import GroupBase, GroupElem
 from mife.data.zmod import Zmod
 
@@ -10,6 +10,10 @@ from mife.data.zmod import Zmod
 # https://eprint.iacr.org/2017/972.pdf
 
 
+def _to_group(M: Matrix, g: GroupElem, workers: int) -> Matrix:
+    return Matrix(Matrix.unflatten(g.mul_many(Matrix.flatten(M.M), workers), M.n, M.m))
+
+
 class _FeDamgardMulti_MPK:
 
     def __init__(self, a: Matrix, wa: Matrix):
@@ -133,6 +137,7 @@ class _FeDamgardMulti_SK:
         :param z: <u, y>
         """
         self.y = y
+        self.y_sparse = [sparse_vector(y_i) for y_i in y]
         self.d = d
         self.z = z
 
@@ -164,13 +169,15 @@ class _FeDamgardMulti_C:
 
 class FeDamgardMulti:
     @staticmethod
-    def generate(n: int, m: int, F: GroupBase = None) -> _FeDamgardMulti_MK:
+    def generate(n: int, m: int, F: GroupBase = None, workers: int = 1) -> _FeDamgardMulti_MK:
         """
         Generate a FeDamgardMulti master key
 
         :param n: Number of vector positions
         :param m: Dimension of the vector in each input
         :param F: Group to use for the scheme. If set to None, a random 1024 bit prime group will be used
+        :param workers: Number of processes for the group exponentiations, None for the cpu count. Each
+                        call starts its own pool, which only pays off for large dimensions
         :return: FeDamgardMulti master key
         """
         if F is None:
@@ -180,20 +187,20 @@ class FeDamgardMulti:
         W = Matrix([[randbelow(F.order()), randbelow(F.order())] for _ in range(m)])
         u = Matrix([[randbelow(F.order()) for _ in range(m)] for _ in range(n)])
 
-        to_group = lambda x: x * g
-
         msk = _FeDamgardMulti_MSK(W, u)
-        mpk = _FeDamgardMulti_MPK(a_v.apply_func(to_group), (W * a_v.T).apply_func(to_group))
+        mpk = _FeDamgardMulti_MPK(_to_group(a_v, g, workers), _to_group(W * a_v.T, g, workers))
 
         return _FeDamgardMulti_MK(g, n, m, F, msk=msk, mpk=mpk)
 
     @staticmethod
-    def encrypt(x: List[int], key: _FeDamgardMulti_EncK) -> _FeDamgardMulti_C:
+    def encrypt(x: List[int], key: _FeDamgardMulti_EncK, workers: int = 1) -> _FeDamgardMulti_C:
         """
         Encrypt a message vector
 
         :param x: Message vector (Dimension must be m)
         :param key: FeDamgardMulti public key
+        :param workers: Number of processes for the group exponentiations, None for the cpu count. Each
+                        call starts its own pool, which only pays off for large dimensions
         :return: FeDamgardMulti cipher text
         """
         x = Matrix(x)
@@ -201,7 +208,10 @@ class FeDamgardMulti:
 
         t = r * key.mpk.a
 
-        c = (x + key.u).apply_func(lambda x: x * key.g) + (r * key.mpk.wa).T
+        wa = Matrix.flatten(key.mpk.wa.M)
+        r_wa = Matrix(type(key.g).scale_many(wa, r, workers))
+
+        c = _to_group(x + key.u, key.g, workers) + r_wa
 
         return _FeDamgardMulti_C(t, c)
 
@@ -219,8 +229,12 @@ class FeDamgardMulti:
         """
         cul = key.F.identity()
         for i in range(key.n):
+            # d_i = y_i * w vanishes with y_i
+            if not sk.y_sparse[i]:
+                continue
+
             # [y_i dot c_i]
-            yc = inner_product(sk.y[i], c[i].c[0], identity=key.F.identity())
+            yc = sparse_inner_product(c[i].c[0], sk.y_sparse[i], key.F.identity())
 
             # [d_i dot t_i]
             dt = inner_product(sk.d[i][0], c[i].t[0], identity=key.F.identity())
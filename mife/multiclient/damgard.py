@@ -1,8 +1,12 @@
-from typing import List, Tuple
+import threading
+import time
+from collections import OrderedDict
+from secrets import randbelow
+from typing import List, Tuple, Iterable
 
 from mife.common import discrete_log_bound, getStrongPrime
 
-from mife.data.group import GroupBase
+from mife.data.group import GroupBase, GroupElem
 from mife.data.zmod import Zmod
 from mife.misc.cprf import CPRF
 
@@ -40,7 +44,13 @@ class _FeDamgardMultiClient_EncK:
     def __init__(self, index: int, enc_key: List[bytes]):
         self.index = index
         self.enc_key = enc_key
-        pass
+        self._ciphers = None
+
+    def ciphers(self) -> list:
+        # AES key schedules of the CPRF keys, kept with the key so they go away with it
+        if self._ciphers is None:
+            self._ciphers = CPRF.ciphers(len(self.enc_key), self.index, self.enc_key)
+        return self._ciphers
 
     def export(self):
         pass
@@ -71,6 +81,109 @@ class _FeDamgardMultiClient_C:
         pass
 
 
+class _FeDamgardMultiClient_Pad:
+    def __init__(self, tag: bytes, g_r: GroupElem, h_r: GroupElem, c: List[GroupElem]):
+        """
+        Everything of a cipher text that does not depend on the message
+
+        :param tag: Tag the pads were derived for
+        :param g_r: r * g
+        :param h_r: r * h
+        :param c: r * mpk[i] + pad[i] * g
+        """
+        self.tag = tag
+        self.g_r = g_r
+        self.h_r = h_r
+        self.c = c
+
+
+class _FeDamgardMultiClient_PadScheduler:
+    def __init__(self, key: _FeDamgardMultiClient_EncK, pub: _FeDamgardMultiClient_MK, capacity: int = 16):
+        """
+        Precompute the pads of upcoming tags of one client in a background thread
+
+        :param key: Encryption key of the client
+        :param pub: Public key
+        :param capacity: Largest number of precomputed tags held at once
+        """
+        self.key = key
+        self.pub = pub
+        self.capacity = capacity
+        self.ready = OrderedDict()
+        self.pending = OrderedDict()
+        self.computing = None
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stop = False
+
+    def schedule(self, tags: Iterable[bytes], expiry: Iterable[float] = None):
+        """
+        :param tags: Upcoming tags, computed in this order
+        :param expiry: Time (as time.time()) after which each tag is dropped, None to keep it until used
+        """
+        tags = list(tags)
+        expiry = [None] * len(tags) if expiry is None else list(expiry)
+        with self._cond:
+            for tag, t in zip(tags, expiry):
+                if tag not in self.ready and tag != self.computing:
+                    self.pending[tag] = t
+            self._cond.notify_all()
+
+    def _evict(self):
+        now = time.time()
+        for tag in [tag for tag, t in self.pending.items() if t is not None and t < now]:
+            del self.pending[tag]
+        for tag in [tag for tag, (t, _) in self.ready.items() if t is not None and t < now]:
+            del self.ready[tag]
+
+    def take(self, tag: bytes) -> _FeDamgardMultiClient_Pad:
+        """
+        :return: Precomputed pad of the tag, removed from the cache, or None if it is not ready
+        """
+        with self._cond:
+            self._evict()
+            self.pending.pop(tag, None)
+            if self.computing == tag:
+                # Encrypted without it, the pad in progress is dropped
+                self.computing = None
+            entry = self.ready.pop(tag, None)
+            self._cond.notify_all()
+        return entry[1] if entry is not None else None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop = False
+
+        def work():
+            while True:
+                with self._cond:
+                    self._evict()
+                    while not self._stop and (not self.pending or len(self.ready) >= self.capacity):
+                        self._cond.wait(1)
+                        self._evict()
+                    if self._stop:
+                        return
+                    tag, t = self.pending.popitem(last=False)
+                    self.computing = tag
+                pad = FeDamgardMultiClient.precompute(tag, self.key, self.pub)
+                with self._cond:
+                    if self.computing == tag:
+                        self.ready[tag] = (t, pad)
+                    self.computing = None
+
+        self._thread = threading.Thread(target=work, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            with self._cond:
+                self._stop = True
+                self._cond.notify_all()
+            self._thread.join()
+            self._thread = None
+
+
 class FeDamgardMultiClient:
 
     @staticmethod
@@ -84,25 +197,62 @@ class FeDamgardMultiClient:
         return _FeDamgardMultiClient_MK(n, m, ipfe, cprf)
 
     @staticmethod
-    def encrypt(x: List[int], tag: bytes, key: _FeDamgardMultiClient_EncK, pub: _FeDamgardMultiClient_MK) \
-            -> _FeDamgardMultiClient_C:
+    def precompute(tag: bytes, key: _FeDamgardMultiClient_EncK, pub: _FeDamgardMultiClient_MK) \
+            -> _FeDamgardMultiClient_Pad:
+        """
+        Derive the pads of a tag and the message independent part of the cipher text
+
+        :param tag: Tag of the cipher text
+        :param key: Encryption key of the client
+        :param pub: Public key
+        :return: Precomputed pad, usable for one encryption only
+        """
+        length = pub.ipfe.F.order().bit_length() // 8
+
+        tag_lst = CPRF.eval_many(pub.n, key.index, key.enc_key,
+                                 [tag + f'-{i}'.encode() for i in range(pub.n * pub.m)], length, key.ciphers())
+
+        ipfe = pub.ipfe
+        r = randbelow(ipfe.F.order())
+        c = [r * ipfe.mpk[i] + tag_lst[i] * ipfe.g for i in range(ipfe.n)]
+        return _FeDamgardMultiClient_Pad(tag, r * ipfe.g, r * ipfe.h, c)
+
+    @staticmethod
+    def encrypt(x: List[int], tag: bytes, key: _FeDamgardMultiClient_EncK, pub: _FeDamgardMultiClient_MK,
+                scheduler: _FeDamgardMultiClient_PadScheduler = None) -> _FeDamgardMultiClient_C:
+        """
+        :param scheduler: Pad scheduler of the client, its precomputed pad of the tag is used when ready
+        """
         if len(x) != pub.m:
             raise Exception(f"Encrypt vector must be of length {pub.m}")
 
-        length = pub.ipfe.F.order().bit_length() // 8
-
-        tag_lst = []
-        for i in range(pub.n * pub.m):
-            temp = CPRF.eval(pub.n, key.index, key.enc_key, tag + f'-{i}'.encode(), length)
-            tag_lst.append(temp)
+        pad = scheduler.take(tag) if scheduler is not None else None
+        if pad is None:
+            pad = FeDamgardMultiClient.precompute(tag, key, pub)
 
-        pad_x = [0 for _ in range(pub.m * key.index)] + x + [0 for _ in range(pub.m * (pub.n - key.index - 1))]
+        # Only the m entries of this client carry a message term
+        c = list(pad.c)
+        offset = pub.m * key.index
+        for i in range(pub.m):
+            if x[i]:
+                c[offset + i] = c[offset + i] + x[i] * pub.ipfe.g
 
-        assert len(pad_x) == len(tag_lst)
-        actual_x = [i + j for i, j in zip(pad_x, tag_lst)]
-        c = FeDamgard.encrypt(actual_x, pub.ipfe)
+        return _FeDamgardMultiClient_C(tag, _FeDamgard_C(pad.g_r, pad.h_r, c))
 
-        return _FeDamgardMultiClient_C(tag, c)
+    @staticmethod
+    def pad_scheduler(key: _FeDamgardMultiClient_EncK, pub: _FeDamgardMultiClient_MK,
+                      capacity: int = 16) -> _FeDamgardMultiClient_PadScheduler:
+        """
+        Create a started pad scheduler for a client, tags to precompute are added with schedule
+
+        :param key: Encryption key of the client
+        :param pub: Public key
+        :param capacity: Largest number of precomputed tags held at once
+        :return: Pad scheduler
+        """
+        scheduler = _FeDamgardMultiClient_PadScheduler(key, pub, capacity)
+        scheduler.start()
+        return scheduler
 
     @staticmethod
     def decrypt(c: List[_FeDamgardMultiClient_C], pub: _FeDamgardMultiClient_MK,
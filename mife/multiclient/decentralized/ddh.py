@@ -48,6 +48,7 @@ class _FeDDHMultiClientDec_MK:
         self.index = index
         self.sk = sk
         self.exchange_key = [b'' for _ in range(pub.n)]
+        self._ciphers = None
         self.share = [[] for _ in range(self.pub.n)]
 
     def regenerate_sk(self):
@@ -63,20 +64,19 @@ class _FeDDHMultiClientDec_MK:
         if index == self.index:
             raise Exception(f"You cannot exchange key with yourself")
 
+        self._ciphers = None
         self.exchange_key[index] = key_agreement(static_priv=self.exc_priv_key, static_pub=pub_key, kdf=kdf)
 
     def generate_share(self, epoch=0):
         length = self.pub.F.order().bit_length() // 8
-        self.share = [[] for _ in range(self.pub.n)]
-        for i in range(self.pub.n):
-            for j in range(self.pub.m):
-                nonce = long_to_bytes(i * self.pub.m + j)
-                self.share[i].append(
-                    (cprf.CPRF.eval(self.pub.n, self.index, self.exchange_key,
-                                    b'a' + long_to_bytes(epoch) + nonce, length) % self.pub.F.order(),
-                     cprf.CPRF.eval(self.pub.n, self.index, self.exchange_key,
-                                    b'b' + long_to_bytes(epoch) + nonce, length) % self.pub.F.order())
-                )
+        count = self.pub.n * self.pub.m
+        inputs = [prefix + long_to_bytes(epoch) + long_to_bytes(k) for prefix in (b'a', b'b') for k in range(count)]
+        if self._ciphers is None:
+            self._ciphers = cprf.CPRF.ciphers(self.pub.n, self.index, self.exchange_key)
+        out = cprf.CPRF.eval_many(self.pub.n, self.index, self.exchange_key, inputs, length, self._ciphers)
+        order = self.pub.F.order()
+        self.share = [[(out[i * self.pub.m + j] % order, out[count + i * self.pub.m + j] % order)
+                       for j in range(self.pub.m)] for i in range(self.pub.n)]
 
 
 class _FeDDHMultiClientDec_SK:
@@ -124,12 +124,24 @@ class FeDDHMultiClientDec:
                 key: _FeDDHMultiClientDec_PK, sk: List[_FeDDHMultiClientDec_SK],
                 bound: Tuple[int, int]) -> int:
 
-        y = sk[0].y
         d0, d1 = 0, 0
         for i in range(key.n):
             d0 += sk[i].d[0]
             d1 += sk[i].d[1]
 
+        return FeDDHMultiClientDec.decrypt_sum(c, tag, key, sk[0].y, (d0, d1), bound)
+
+    @staticmethod
+    def decrypt_sum(c: List[_FeDDHMultiClientDec_C], tag: bytes,
+                    key: _FeDDHMultiClientDec_PK, y: List[List[int]], d: Tuple[int, int],
+                    bound: Tuple[int, int]) -> int:
+        """
+        Decrypt with the sum of the partial decryption keys of all parties
+
+        :param y: Function vector
+        :param d: Sums of both components of the partial decryption keys
+        """
+        d0, d1 = d
         u1, u2 = key.hash(tag)
         u1, u2 = key.g * u1, key.g * u2
 
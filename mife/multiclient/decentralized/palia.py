@@ -3,10 +3,62 @@ from __future__ import annotations
 from typing import List, Tuple, Callable
 
 from mife.data.group import GroupBase
-from mife.data.paillier import PaillierKey, PaillierElem, Paillier
+from mife.data.paillier import PaillierKey, PaillierElem, Paillier, multi_exp
 from mife.multiclient.decentralized.ddh import (FeDDHMultiClientDec, _FeDDHMultiClientDec_PK,
                                                 _FeDDHMultiClientDec_C, _FeDDHMultiClientDec_MK,
                                                 _FeDDHMultiClientDec_SK)
+
+
+def _key_bound(pub: _FeDDHMultiClientDec_PK) -> int:
+    # Upper bound of an aggregated key component: every party sums n * m products of a coefficient
+    # and a share below F.order(), plus m products with its own secret
+    o = pub.F.order() - 1
+    return pub.n * (pub.n + 1) * pub.m * o * o
+
+
+class _Palia_KeyAggregate:
+    def __init__(self, pub: _FeDDHMultiClientDec_PK):
+        """
+        Running homomorphic sum of the Paillier encrypted partial decryption keys
+
+        :param pub: Public parameters of the scheme
+        """
+        self.pub = pub
+        self.d = None
+        self.parties = set()
+
+    def add(self, index: int, sk: _FeDDHMultiClientDec_SK):
+        """
+        Fold the partial decryption key of a party into the sum
+
+        :param index: Index of the party
+        :param sk: Partial decryption key with Paillier encrypted components
+        """
+        if (index < 0) or (index >= self.pub.n):
+            raise Exception(f"Index must be within [0,{self.pub.n})")
+        if index in self.parties:
+            raise Exception(f"Partial key of party {index} already added")
+        self.parties.add(index)
+        if self.d is None:
+            self.d = sk.d
+        else:
+            self.d = (self.d[0] + sk.d[0], self.d[1] + sk.d[1])
+
+    def complete(self) -> bool:
+        return len(self.parties) == self.pub.n
+
+    def decrypt(self, mk: PaillierKey) -> Tuple[int, int]:
+        """
+        :param mk: Paillier private key of the querier
+        :return: Sums of both components of the partial decryption keys
+        """
+        if not self.complete():
+            raise Exception(f"Only {len(self.parties)} of {self.pub.n} partial keys received")
+        if _key_bound(self.pub) >= mk.n:
+            raise Exception("Paillier modulus too small, the aggregated key would wrap")
+        return int(mk.decrypt(self.d[0])), int(mk.decrypt(self.d[1]))
+
+
 class Palia:
     @staticmethod
     def generate(n: int, m: int, F: GroupBase = None,
@@ -21,19 +73,69 @@ class Palia:
     def decrypt(c: List[_FeDDHMultiClientDec_C], tag: bytes,
                 key: _FeDDHMultiClientDec_PK, sk: List[_FeDDHMultiClientDec_SK], y: List[List[int]], mk: PaillierKey,
                 bound: Tuple[int, int]) -> int:
-        dec_sk = [_FeDDHMultiClientDec_SK(y, (mk.decrypt(sk[i].d[0]), mk.decrypt(sk[i].d[1]))) for i in range(len(sk))]
-        return FeDDHMultiClientDec.decrypt(c, tag, key, dec_sk, bound)
+        agg = Palia.aggregate(key)
+        for i in range(len(sk)):
+            agg.add(i, sk[i])
+        return Palia.decrypt_aggregate(c, tag, key, agg, y, mk, bound)
+
+    @staticmethod
+    def aggregate(key: _FeDDHMultiClientDec_PK) -> _Palia_KeyAggregate:
+        """
+        Start folding partial decryption keys as the parties respond, only the sum is decrypted
+
+        :param key: Public parameters of the scheme
+        :return: Empty aggregate of partial decryption keys
+        """
+        return _Palia_KeyAggregate(key)
+
+    @staticmethod
+    def decrypt_aggregate(c: List[_FeDDHMultiClientDec_C], tag: bytes,
+                          key: _FeDDHMultiClientDec_PK, agg: _Palia_KeyAggregate, y: List[List[int]],
+                          mk: PaillierKey, bound: Tuple[int, int]) -> int:
+        """
+        Decrypt with an aggregate of all partial decryption keys, two Paillier decryptions in total
+        """
+        return FeDDHMultiClientDec.decrypt_sum(c, tag, key, y, agg.decrypt(mk), bound)
 
     @staticmethod
     def keygen(enc_y: List[List[PaillierElem]], key: _FeDDHMultiClientDec_MK) -> _FeDDHMultiClientDec_SK:
-        return FeDDHMultiClientDec.keygen(enc_y, key)
+        """
+        FeDDHMultiClientDec.keygen over the encrypted function vector, each component is a single
+        multi-exponentiation of the cipher texts instead of n * m separate exponentiations
+
+        :param enc_y: Paillier encrypted function vector
+        :param key: Party master key
+        :return: Partial decryption key with Paillier encrypted components
+        """
+        if len(enc_y) != key.pub.n or any(len(row) != key.pub.m for row in enc_y):
+            raise Exception(f"Function vector must be a {key.pub.n} x {key.pub.m} matrix")
+
+        bases, e1, e2 = [], [], []
+        for i in range(key.pub.n):
+            for j in range(key.pub.m):
+                v1, v2 = key.share[i][j]
+                if i == key.index:
+                    # The own row carries both the secret and the share
+                    v1, v2 = v1 + key.sk[j][0], v2 + key.sk[j][1]
+                bases.append(enc_y[i][j])
+                e1.append(v1)
+                e2.append(v2)
+
+        return _FeDDHMultiClientDec_SK(enc_y, (multi_exp(bases, e1), multi_exp(bases, e2)))
 
     @staticmethod
     def encrypt_query(y: List[List[int]], pk: PaillierKey, pub: _FeDDHMultiClientDec_PK) -> List[List[PaillierElem]]:
-        return [[pk.encrypt(y[i][j] % pub.F.order()) for j in range(len(y[i]))] for i in range(len(y))]
+        enc = pk.encrypt_many([v % pub.F.order() for row in y for v in row])
+        res, pos = [], 0
+        for row in y:
+            res.append(enc[pos:pos + len(row)])
+            pos += len(row)
+        return res
 
     @staticmethod
     def generate_query_key(pub: _FeDDHMultiClientDec_PK) -> PaillierKey:
-        bitsize = ((pub.F.order().bit_length() + (pub.n * pub.m).bit_length() + 127) // 128) * 128
-        bitsize = max(512, bitsize)
+        bitsize = pub.F.order().bit_length() + (pub.n * pub.m).bit_length()
+        # n = p * q has at least 2 * bitsize - 1 bits and must exceed the aggregated key
+        bitsize = max(bitsize, (_key_bound(pub).bit_length() + 2) // 2 + 1)
+        bitsize = max(512, ((bitsize + 127) // 128) * 128)
         return Paillier.generate(bitsize)
\ No newline at end of file
@@ -2,7 +2,7 @@ from secrets import randbelow
 from Crypto.Util.number import bytes_to_long
 from typing import List, Tuple, Callable
 
-from mife.common import discrete_log_bound, inner_product, getStrongPrime
+from mife.common import discrete_log_bound, getStrongPrime, sparse_vector, sparse_inner_product
 from mife.data.group import GroupBase, GroupElem
 from mife.data.zmod import Zmod
 
@@ -123,6 +123,7 @@ class _FeDDHMultiClient_SK:
         :param d: <msk, y>
         """
         self.y = y
+        self.y_sparse = [sparse_vector(y_i) for y_i in y]
         self.d = d
 
     def export(self):
@@ -141,6 +142,7 @@ class _FeDDHMultiClient_SK_Safe:
         :param td: g1 * <msk, y>, g2 * <msk, y>
         """
         self.y = y
+        self.y_sparse = [sparse_vector(y_i) for y_i in y]
         self.td = td
 
     def export(self):
@@ -234,7 +236,7 @@ class FeDDHMultiClient:
         cul = key.F.identity()
 
         for i in range(key.n):
-            cul = cul + inner_product(c[i].c, sk.y[i], key.F.identity())
+            cul = cul + sparse_inner_product(c[i].c, sk.y_sparse[i], key.F.identity())
 
         cul = cul - (sk.d[0] * u1 + sk.d[1] * u2)
         return discrete_log_bound(cul, key.g, bound)
@@ -254,7 +256,7 @@ class FeDDHMultiClient:
         cul = key.F.identity()
 
         for i in range(key.n):
-            cul = cul + inner_product(c[i].c, sk.y[i], key.F.identity())
+            cul = cul + sparse_inner_product(c[i].c, sk.y_sparse[i], key.F.identity())
 
         cul = cul - (sk.td[0] + sk.td[1])
         return discrete_log_bound(cul, key.g, bound)
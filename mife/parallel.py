@@ -0,0 +1,26 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+def parallel_map(func, items, workers=None, chunksize=None):
+    """
+    Map func over items in a process pool, keeping the order of items.
+    func and items must be picklable, func should be a module-level function
+    (use functools.partial to bind extra arguments)
+
+    :param func: Function to apply
+    :param items: Items to map over
+    :param workers: Number of worker processes, defaults to the cpu count. Runs in process if <= 1
+    :param chunksize: Number of items sent to a worker at a time, defaults to an even split
+    :return: List of results
+    """
+    items = list(items)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(items))
+    if workers <= 1:
+        return [func(item) for item in items]
+    if chunksize is None:
+        chunksize = -(-len(items) // workers)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, items, chunksize=chunksize))
@@ -1,7 +1,7 @@
 from secrets import randbelow
 from typing import List, Tuple
 
-from mife.common import inner_product, discrete_log_bound, getStrongPrime
+from mife.common import inner_product, discrete_log_bound, getStrongPrime, sparse_vector, sparse_inner_product
 from mife.data.zmod import Zmod
 from mife.data.group import GroupBase, GroupElem
 
@@ -54,6 +54,7 @@ class _FeDamgard_SK:
         :param tx: <t, y>
         """
         self.y = y
+        self.y_sparse = sparse_vector(y)
         self.sx = sx
         self.tx = tx
 
@@ -74,6 +75,7 @@ class _FeDamgard_SK_Safe:
         :param h_r_tx: h * (r + <t, y>)
         """
         self.y = y
+        self.y_sparse = sparse_vector(y)
         self.g_r_sx = g_r_sx
         self.h_r_tx = h_r_tx
 
@@ -159,9 +161,7 @@ class FeDamgard:
         :param bound: Bound for discrete logarithm search, the decrypted text should be within the bound
         :return: Decrypted message
         """
-        cul = pub.F.identity()
-        for i in range(pub.n):
-            cul = cul + sk.y[i] * c.c[i]
+        cul = sparse_inner_product(c.c, sk.y_sparse, pub.F.identity())
         cul = cul - sk.sx * c.g_r - sk.tx * c.h_r
         return discrete_log_bound(cul, pub.g, bound)
 
@@ -176,9 +176,7 @@ class FeDamgard:
         :param bound: Bound for discrete logarithm search, the decrypted text should be within the bound
         :return: Decrypted message
         """
-        cul = pub.F.identity()
-        for i in range(pub.n):
-            cul = cul + sk.y[i] * c.c[i]
+        cul = sparse_inner_product(c.c, sk.y_sparse, pub.F.identity())
         cul = cul - sk.g_r_sx - sk.h_r_tx
         return discrete_log_bound(cul, pub.g, bound)
 
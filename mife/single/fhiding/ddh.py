@@ -1,10 +1,13 @@
+from functools import partial
 from secrets import randbelow
 from typing import List, Tuple, Any
 
-from mife.common import discrete_log_bound, invertible_matrix, discrete_log_bound_brute
+from mife.common import discrete_log_bound, random_invertible_matrix, discrete_log_bound_brute
+from mife.parallel import parallel_map
 from mife.data.pairing import PairingBase
 from mife.data.pyecc_bn128_wrapper import Bn128Pairing
 from mife.data.matrix import Matrix
+from mife.data.mod_matrix import ModMatrix
 from mife.data.group import GroupElem
 from mife.data.zmod_r import ZmodR
 
@@ -12,8 +15,17 @@ from mife.data.zmod_r import ZmodR
 # References:
 # https://eprint.iacr.org/2016/440.pdf
 
+def _scalar_mul(g: GroupElem, k: int) -> GroupElem:
+    return k * g
+
+
+def _batch_mul(g: GroupElem, scalars: List[List[int]], workers: int) -> List[List[GroupElem]]:
+    flat = parallel_map(partial(_scalar_mul, g), Matrix.flatten(scalars), workers)
+    return Matrix.unflatten(flat, len(scalars), len(scalars[0]))
+
+
 class _FeDDH_MSK:
-    def __init__(self,  g1: GroupElem, g2: GroupElem, B: Matrix, B_star: Matrix, B_determinant: Any):
+    def __init__(self,  g1: GroupElem, g2: GroupElem, B: ModMatrix, B_star: ModMatrix, B_determinant: int):
         self.g1 = g1
         self.g2 = g2
         self.B = B
@@ -61,9 +73,8 @@ class FeDDH:
         g2 = F.generator2()
 
         G = ZmodR(F.order())
-        B = invertible_matrix(G, n)
-        B_determinant = B.determinant()
-        B_star = int(B_determinant) * B.inverse().T
+        B, B_inverse, B_determinant = random_invertible_matrix(G.order(), n)
+        B_star = B_determinant * B_inverse.T
 
         msk = _FeDDH_MSK(g1, g2, B, B_star, B_determinant)
 
@@ -81,13 +92,13 @@ class FeDDH:
         if len(x) != key.n:
             raise Exception(f"Encrypt vector must be of length {key.n}")
 
-        beta = randbelow(key.G.order())
+        q = key.G.order()
+        beta = randbelow(q)
 
         c1 = beta * key.msk.g2
 
-        x = [key.G(x[i]) for i in range(key.n)]
-        exponents = Matrix.flatten((Matrix(x) * key.msk.B_star).M)
-        c2 = [int(exponents[i] * beta) * key.msk.g2 for i in range(key.n)]
+        exponents = (ModMatrix(x, q) * key.msk.B_star).buf
+        c2 = [exponents[i] * beta % q * key.msk.g2 for i in range(key.n)]
 
         return _FeDDH_C(c1, c2)
 
@@ -125,12 +136,73 @@ class FeDDH:
         if not key.has_private_key():
             raise Exception("Private key not found in master key")
 
-        alpha = randbelow(key.G.order())
+        q = key.G.order()
+        alpha = randbelow(q)
 
-        k1 = (int(alpha * key.msk.B_determinant)) * key.msk.g1
+        k1 = alpha * key.msk.B_determinant % q * key.msk.g1
 
-        y = [key.G(y[i]) for i in range(key.n)]
-        exponents = Matrix.flatten((Matrix(y) * key.msk.B).M)
-        k2 = [int(exponents[i] * alpha) * key.msk.g1 for i in range(key.n)]
+        exponents = (ModMatrix(y, q) * key.msk.B).buf
+        k2 = [exponents[i] * alpha % q * key.msk.g1 for i in range(key.n)]
 
         return _FeDDH_SK(k1, k2)
+
+    @staticmethod
+    def encrypt_many(X: List[List[int]], key: _FeDDH_MK, workers: int = 1) -> List[_FeDDH_C]:
+        """
+        Encrypt several FeDDH message vectors, every vector gets its own randomness
+
+        :param X: List of message vectors
+        :param key: FeDDH master key
+        :param workers: Number of processes for the group exponentiations, None for the cpu count. Each call
+                        starts its own pool. Comb tables pickle by name, so the workers inherit or
+                        rebuild the tables of the generator instead of receiving them
+        :return: List of FeDDH cipher texts
+        """
+        for x in X:
+            if len(x) != key.n:
+                raise Exception(f"Encrypt vector must be of length {key.n}")
+        if len(X) == 0:
+            return []
+
+        q = key.G.order()
+        exponents = (ModMatrix(X, q) * key.msk.B_star).rows()
+
+        scalars = []
+        for row in exponents:
+            beta = randbelow(q)
+            scalars.append([beta] + [e * beta % q for e in row])
+
+        points = _batch_mul(key.msk.g2, scalars, workers)
+        return [_FeDDH_C(row[0], row[1:]) for row in points]
+
+    @staticmethod
+    def keygen_many(Y: List[List[int]], key: _FeDDH_MK, workers: int = 1) -> List[_FeDDH_SK]:
+        """
+        Generate several FeDDH decryption keys, every key gets its own randomness
+
+        :param Y: List of function vectors
+        :param key: FeDDH master key
+        :param workers: Number of processes for the group exponentiations, None for the cpu count. Each call
+                        starts its own pool. Comb tables pickle by name, so the workers inherit or
+                        rebuild the tables of the generator instead of receiving them
+        :return: List of FeDDH decryption keys
+        """
+        for y in Y:
+            if len(y) != key.n:
+                raise Exception(f"Function vector must be of length {key.n}")
+        if not key.has_private_key():
+            raise Exception("Private key not found in master key")
+        if len(Y) == 0:
+            return []
+
+        q = key.G.order()
+        det = key.msk.B_determinant
+        exponents = (ModMatrix(Y, q) * key.msk.B).rows()
+
+        scalars = []
+        for row in exponents:
+            alpha = randbelow(q)
+            scalars.append([alpha * det % q] + [e * alpha % q for e in row])
+
+        points = _batch_mul(key.msk.g1, scalars, workers)
+        return [_FeDDH_SK(row[0], row[1:]) for row in points]
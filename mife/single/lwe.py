@@ -1,12 +1,19 @@
+from __future__ import annotations
+
 import math
+import struct
 
-import random
+import numpy as np
 
 from secrets import randbelow
-from Crypto.Util.number import getPrime
-from typing import List
+from typing import List, Tuple
 
 from numpy import array as Matrix
+from mife.data.rns import RNSBasis, RNSMatrix
+from mife.common import pack_ints, unpack_ints
+from mife.data.gaussian import discrete_gaussian, TAIL
+from mife.data.seed_expand import new_seed, expand_blocks, expand_matrix
+from mife.single.lwe_params import LWEParams
 
 # References:
 # https://eprint.iacr.org/2015/608.pdf
@@ -14,7 +21,7 @@ from numpy import array as Matrix
 
 class _FeLWE_MK:
     def __init__(self, l: int, msg_bit: int, func_bit: int, k: int, n: int, m: int, q: int, U: Matrix, A: Matrix,
-                 alpha: float, Z: Matrix = None):
+                 alpha: float, Z: Matrix = None, seed: bytes = None):
         self.l = l
         self.msg_bit = msg_bit
         self.func_bit = func_bit
@@ -23,15 +30,39 @@ class _FeLWE_MK:
         self.m = m
         self.q = q
         self.U = U
-        self.A = A
+        self._A = A
+        self.seed = seed
         self.alpha = alpha
         self.msk = Z
+        self._rns = {}
+
+    @property
+    def A(self) -> Matrix:
+        # Keys holding only the seed expand A on first use
+        if self._A is None:
+            self._A = expand_matrix(self.seed, self.q, self.m, self.n).astype(object)
+        return self._A
+
+    def rns(self, name: str, basis: RNSBasis) -> RNSMatrix:
+        """
+        Residues of the key matrix A, U or msk, cached per basis since every call reuses them.
+        A seeded A is encoded block by block from the seed without materialising it.
+        """
+        if (name, basis.k) not in self._rns:
+            if name == "A" and self._A is None:
+                res = np.concatenate([basis.encode(block).res
+                                      for _, block in expand_blocks(self.seed, self.q, self.m, self.n)], axis=1)
+                self._rns[(name, basis.k)] = RNSMatrix(basis, res, (self.m, self.n))
+            else:
+                self._rns[(name, basis.k)] = basis.encode(getattr(self, name))
+        return self._rns[(name, basis.k)]
 
     def has_private_key(self) -> bool:
         return self.msk is not None
 
     def get_public_key(self):
-        return _FeLWE_MK(self.l, self.msg_bit, self.func_bit, self.k, self.n, self.m, self.q, self.U, self.A, self.alpha)
+        return _FeLWE_MK(self.l, self.msg_bit, self.func_bit, self.k, self.n, self.m, self.q, self.U, self._A, self.alpha,
+                         seed=self.seed)
 
     def export(self):
         pass
@@ -46,6 +77,34 @@ class _FeLWE_SK:
         pass
 
 
+class _FeLWE_SK_Batch:
+    def __init__(self, Y: Matrix, ZY: Matrix):
+        """
+        :param Y: Function vectors, one per row
+        :param ZY: Y @ Z, one decryption key per row
+        """
+        self.Y = Y
+        self.ZY = ZY
+        self._rns = {}
+
+    def rns(self, name: str, basis: RNSBasis) -> RNSMatrix:
+        """
+        Residues of Y or ZY, cached per basis for repeated decrypt_many calls
+        """
+        if (name, basis.k) not in self._rns:
+            self._rns[(name, basis.k)] = basis.encode(getattr(self, name))
+        return self._rns[(name, basis.k)]
+
+    def __len__(self) -> int:
+        return self.Y.shape[0]
+
+    def __getitem__(self, i: int) -> _FeLWE_SK:
+        return _FeLWE_SK(self.Y[i], self.ZY[i])
+
+    def export(self):
+        pass
+
+
 class _FeLWE_C:
     def __init__(self, c0: Matrix, c1: Matrix):
         self.c0 = c0
@@ -55,67 +114,153 @@ class _FeLWE_C:
         pass
 
 
+class _FeLWE_C_Compressed:
+    def __init__(self, c0: Matrix, c1: Matrix, bits0: int, bits1: int):
+        """
+        Cipher text with c0 and c1 rounded from Z_q to Z_{2^bits0} and Z_{2^bits1}
+        """
+        self.c0 = c0
+        self.c1 = c1
+        self.bits0 = bits0
+        self.bits1 = bits1
+
+    def decompress(self, q: int) -> _FeLWE_C:
+        return _FeLWE_C((self.c0 * q + (1 << (self.bits0 - 1))) >> self.bits0,
+                        (self.c1 * q + (1 << (self.bits1 - 1))) >> self.bits1)
+
+    def to_bytes(self) -> bytes:
+        """
+        :return: Header (m, bits0, l, bits1) followed by the bit-packed c0 and c1
+        """
+        return (struct.pack("<IIII", len(self.c0), self.bits0, len(self.c1), self.bits1) +
+                pack_ints(self.c0, self.bits0) + pack_ints(self.c1, self.bits1))
+
+    @staticmethod
+    def from_bytes(data: bytes, pub: _FeLWE_MK) -> _FeLWE_C_Compressed:
+        """
+        :param data: Output of to_bytes
+        :param pub: FeLWE public key the cipher text was encrypted under
+        """
+        m, bits0, l, bits1 = struct.unpack_from("<IIII", data)
+        if (m, l) != (pub.m, pub.l):
+            raise Exception("Cipher text does not match the public key")
+        c0_len = (m * bits0 + 7) // 8
+        return _FeLWE_C_Compressed(Matrix(unpack_ints(data[16:16 + c0_len], m, bits0), dtype=object),
+                                   Matrix(unpack_ints(data[16 + c0_len:], l, bits1), dtype=object), bits0, bits1)
+
+    def export(self):
+        pass
+
+
+def _sigmas(n: int, m: int, k: int):
+    sigma1 = math.sqrt(n * m.bit_length()) * max(math.sqrt(m), k)
+    sigma2 = math.sqrt((n ** 7) * m * (m.bit_length() ** 5)) * max(m, k * k)
+    return sigma1, sigma2
+
+
+def _compress_bits(pub) -> Tuple[int, int]:
+    y_bound = 1 << pub.func_bit
+    z_bound = math.ceil(TAIL * max(_sigmas(pub.n, pub.m, pub.k))) + 1
+    # l * y_bound * (q / 2^(bits1 + 1) + 1) <= q / (8 * k), and the same with m * l * y_bound * z_bound for c0
+    bits1 = (8 * pub.l * y_bound * (pub.k + 1)).bit_length()
+    bits0 = (8 * pub.m * pub.l * y_bound * z_bound * (pub.k + 1)).bit_length()
+    return bits0, bits1
+
+
+def _ciphertext_size(pub, bits: Tuple[int, int] = None) -> int:
+    """
+    :param bits: Bit sizes of the compressed c0 and c1, None for the uncompressed cipher text
+    :return: Bytes of the bit-packed cipher text, including the 16 byte header of a compressed one
+    """
+    if bits is None:
+        return (pub.m * pub.q.bit_length() + pub.l * pub.q.bit_length() + 7) // 8
+    return 16 + (pub.m * bits[0] + 7) // 8 + (pub.l * bits[1] + 7) // 8
+
+
+def _max_bits(X) -> int:
+    return max([int(abs(v)).bit_length() for v in Matrix(X, dtype=object).flat], default=0)
+
+
 class FeLWE:
     @staticmethod
     def sample(sigma1: float, sigma2: float, l: int, m: int):
-        sys_random = random.SystemRandom()
-        res = []
         half1 = m // 2
         half2 = m - half1
+        res = np.concatenate((discrete_gaussian(sigma1, l * half1).astype(object).reshape(l, half1),
+                              discrete_gaussian(sigma2, l * half2).astype(object).reshape(l, half2)), axis=1)
         for i in range(l):
-            row1 = [round(sys_random.gauss(0, sigma1)) for _ in range(half1)]
-            row2 = [round(sys_random.gauss(0, sigma2)) for _ in range(half2)]
-            row2[i] += 1
-            res.append(row1 + row2)
-        return Matrix(res, dtype=object)
+            res[i, half1 + i] += 1
+        return res
 
     @staticmethod
-    def generate(l: int, msg_bit: int, func_bit: int, n: int = None) -> _FeLWE_MK:
+    def generate(l: int, msg_bit: int, func_bit: int, n: int = None, seed_A: bool = False,
+                 params: LWEParams = None) -> _FeLWE_MK:
         """
         Generate a FeLWE master key
-        """
-        k = l << (msg_bit + func_bit)
 
-        if n is None:
-            n = max(l, 64)
-
-        q = getPrime(k.bit_length() * 2 + n.bit_length() * 15 + 10)
-        alpha = 1 / (k * k * (n * q.bit_length()) ** 7)
-
-        if q < math.sqrt(n) / alpha:
-            raise Exception("q too small")
-
-        m = n * q.bit_length()
+        :param seed_A: Store the 32 byte seed of A instead of A, it is expanded again when needed
+        :param params: Precomputed parameters, e.g. from lwe_params or preset, fresh primes are drawn when None
+        """
+        if params is None:
+            params = LWEParams.derive("adaptive", l, msg_bit, func_bit, n)
+        elif ((params.scheme, params.l, params.msg_bit, params.func_bit) != ("adaptive", l, msg_bit, func_bit) or
+              n not in (None, params.n)):
+            raise Exception("Parameters were derived for a different scheme, dimension or bounds")
+        l, k, n, q, m, alpha = params.l, params.k, params.n, params.q, params.m, params.alpha
 
-        sigma1 = math.sqrt(n * m.bit_length()) * max(math.sqrt(m), k)
-        sigma2 = math.sqrt((n ** 7) * m * (m.bit_length() ** 5)) * max(m, k * k)
+        sigma1, sigma2 = _sigmas(n, m, k)
 
-        A = Matrix([[randbelow(q) for _ in range(n)] for _ in range(m)], dtype=object)
+        seed = new_seed()
+        A = None if seed_A else expand_matrix(seed, q, m, n).astype(object)
         Z = FeLWE.sample(sigma1, sigma2, l, m)
 
-        U = (Z @ A) % q
+        key = _FeLWE_MK(l=l, msg_bit=msg_bit, func_bit=func_bit, k=k, n=n, m=m, q=q, U=None, A=A, alpha=alpha, Z=Z,
+                        seed=seed if seed_A else None)
 
-        return _FeLWE_MK(l=l, msg_bit=msg_bit, func_bit=func_bit, k=k, n=n, m=m, q=q, U=U, A=A, alpha=alpha, Z=Z)
+        basis = RNSBasis.for_bits(_max_bits(Z) + q.bit_length() + m.bit_length())
+        key.U = (key.rns("msk", basis) @ key.rns("A", basis)).mod(q)
+
+        return key
 
     @staticmethod
     def encrypt(x: List[int], pub: _FeLWE_MK) -> _FeLWE_C:
         if len(x) != pub.l:
             raise Exception("Encrypt vector must be of length l")
 
-        sys_random = random.SystemRandom()
-
         s = Matrix([randbelow(pub.q) for _ in range(pub.n)], dtype=object)
-        e0 = Matrix([round(sys_random.gauss(0, pub.alpha * pub.q)) for _ in range(pub.m)], dtype=object)
-        e1 = Matrix([round(sys_random.gauss(0, pub.alpha * pub.q)) for _ in range(pub.l)], dtype=object)
+        e0 = discrete_gaussian(pub.alpha * pub.q, pub.m).astype(object)
+        e1 = discrete_gaussian(pub.alpha * pub.q, pub.l).astype(object)
 
-        c0 = ((pub.A @ s) + e0) % pub.q
-        c1 = ((pub.U @ s) + e1 + ((pub.q // pub.k) * Matrix(x, dtype=object))) % pub.q
+        basis = RNSBasis.for_bits(2 * pub.q.bit_length() + max(pub.n, pub.l).bit_length())
+        s = basis.encode(s)
+
+        c0 = ((pub.rns("A", basis) @ s).decode() + e0) % pub.q
+        c1 = ((pub.rns("U", basis) @ s).decode() + e1 + ((pub.q // pub.k) * Matrix(x, dtype=object))) % pub.q
 
         return _FeLWE_C(c0, c1)
 
     @staticmethod
-    def decrypt(c: _FeLWE_C, pub: _FeLWE_MK, sk: _FeLWE_SK) -> int:
-        u = ((sk.y @ c.c1) - (sk.Zy @ c.c0)) % pub.q
+    def compress(c: _FeLWE_C, pub: _FeLWE_MK) -> _FeLWE_C | _FeLWE_C_Compressed:
+        """
+        Round c0 and c1 to the smallest power of two moduli whose rounding errors, multiplied
+        by any valid key, each stay below (q // k) / 8. c1 only meets y, c0 meets Zy, so c1
+        is compressed much further. c itself is returned when compressing does not save any bytes.
+        """
+        bits0, bits1 = _compress_bits(pub)
+        if bits0 >= pub.q.bit_length() or _ciphertext_size(pub, (bits0, bits1)) >= _ciphertext_size(pub):
+            return c
+        c0 = (((c.c0 << bits0) + pub.q // 2) // pub.q) & ((1 << bits0) - 1)
+        c1 = (((c.c1 << bits1) + pub.q // 2) // pub.q) & ((1 << bits1) - 1)
+        return _FeLWE_C_Compressed(c0, c1, bits0, bits1)
+
+    @staticmethod
+    def decrypt(c: _FeLWE_C | _FeLWE_C_Compressed, pub: _FeLWE_MK, sk: _FeLWE_SK) -> int:
+        if isinstance(c, _FeLWE_C_Compressed):
+            c = c.decompress(pub.q)
+        q_bits = pub.q.bit_length()
+        basis = RNSBasis.for_bits(max(_max_bits(sk.y) + q_bits + pub.l.bit_length(),
+                                      _max_bits(sk.Zy) + q_bits + pub.m.bit_length()) + 1)
+        u = int(((basis.encode(sk.y) @ basis.encode(c.c1)) - (basis.encode(sk.Zy) @ basis.encode(c.c0))).mod(pub.q))
         factor = (pub.q // pub.k)
         minimum = factor
 
@@ -131,6 +276,31 @@ class FeLWE:
             return answer - pub.k
         return answer
 
+    @staticmethod
+    def decrypt_many(C: List[_FeLWE_C | _FeLWE_C_Compressed], pub: _FeLWE_MK,
+                     sks: _FeLWE_SK_Batch) -> List[List[int]]:
+        """
+        Decrypt every cipher text with every key of a batch, two matrix products followed by vectorised rounding
+
+        :param C: Cipher texts, possibly compressed
+        :param pub: FeLWE public key
+        :param sks: Batch of decryption keys from keygen_many
+        :return: res[i][j] is the inner product of the function vector of key i and the message of C[j]
+        """
+        C = [c.decompress(pub.q) if isinstance(c, _FeLWE_C_Compressed) else c for c in C]
+        q_bits = pub.q.bit_length()
+        basis = RNSBasis.for_bits(max(_max_bits(sks.Y) + q_bits + pub.l.bit_length(),
+                                      _max_bits(sks.ZY) + q_bits + pub.m.bit_length()) + 1)
+        C0 = basis.encode(Matrix([c.c0 for c in C], dtype=object).reshape(len(C), pub.m))
+        C1 = basis.encode(Matrix([c.c1 for c in C], dtype=object).reshape(len(C), pub.l))
+        U = ((sks.rns("Y", basis) @ C1.T) - (sks.rns("ZY", basis) @ C0.T)).mod(pub.q)
+
+        # Nearest multiple of q // k, as the search in decrypt
+        factor = pub.q // pub.k
+        answer = ((2 * U + factor) // (2 * factor)) % pub.k
+        answer = np.where(answer > pub.k // 2, answer - pub.k, answer)
+        return [[int(v) for v in row] for row in answer]
+
     @staticmethod
     def keygen(y: List[int], key: _FeLWE_MK) -> _FeLWE_SK:
         if len(y) != key.l:
@@ -138,4 +308,22 @@ class FeLWE:
         if not key.has_private_key():
             raise Exception("Private key not found in master key")
         y = Matrix(y, dtype=object)
-        return _FeLWE_SK(y, y @ key.msk)
+        basis = RNSBasis.for_bits(_max_bits(y) + _max_bits(key.msk) + key.l.bit_length())
+        return _FeLWE_SK(y, (basis.encode(y) @ key.rns("msk", basis)).decode())
+
+    @staticmethod
+    def keygen_many(Y: List[List[int]], key: _FeLWE_MK) -> _FeLWE_SK_Batch:
+        """
+        Generate decryption keys for a batch of function vectors with one Y @ Z product
+
+        :param Y: Function vectors
+        :param key: FeLWE master key
+        :return: Batch of decryption keys, indexing it gives the key of Y[i]
+        """
+        if any(len(y) != key.l for y in Y):
+            raise Exception(f"Function vector must be of length {key.l}")
+        if not key.has_private_key():
+            raise Exception("Private key not found in master key")
+        Y = Matrix(Y, dtype=object).reshape(len(Y), key.l)
+        basis = RNSBasis.for_bits(_max_bits(Y) + _max_bits(key.msk) + key.l.bit_length())
+        return _FeLWE_SK_Batch(Y, (basis.encode(Y) @ key.rns("msk", basis)).decode())
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+from typing import Callable
+
+from Crypto.Util.number import getPrime, isPrime
+
+from mife.common import cache_path
+
+# Public parameters of the LWE schemes in mife.single.lwe ("adaptive") and mife.single.selective.lwe
+# ("selective"). Fresh parameters draw random primes with getPrime. Cached parameters use the largest
+# prime of the required bit length, which is taken from the presets below or from an on-disk cache
+# and validated before use, so generate only has to sample the secrets.
+
+
+class LWEParams:
+    def __init__(self, scheme: str, l: int, msg_bit: int, func_bit: int, n: int, q: int, p: int = None):
+        """
+        :param scheme: "adaptive" or "selective"
+        :param l: Dimension of vector
+        :param msg_bit: Upperbound of bit-size for each element in the message vector
+        :param func_bit: Upperbound of bit-size for each element in the function vector
+        :param n: Dimension of the secret key
+        :param q: Ciphertext modulus
+        :param p: Plaintext modulus of the selective scheme
+        """
+        self.scheme = scheme
+        self.l = l
+        self.msg_bit = msg_bit
+        self.func_bit = func_bit
+        self.n = n
+        self.q = q
+        self.p = p
+        self.k = l << (msg_bit + func_bit)
+        if scheme == "adaptive":
+            self.m = n * q.bit_length()
+            self.alpha = 1 / (self.k * self.k * (n * q.bit_length()) ** 7)
+            if q < math.sqrt(n) / self.alpha:
+                raise Exception("q too small")
+        elif scheme == "selective":
+            self.m = 2 * (l + n + 1) * q.bit_length() + 1
+            self.delta = round(q / p)
+        else:
+            raise Exception(f"Unknown LWE scheme {scheme}")
+
+    @staticmethod
+    def derive(scheme: str, l: int, msg_bit: int, func_bit: int, n: int = None,
+               prime: Callable[[int], int] = getPrime) -> LWEParams:
+        """
+        :param prime: Function returning a prime of the given bit length
+        :return: Parameters of the scheme for the configuration
+        """
+        if scheme == "adaptive":
+            if n is None:
+                n = max(l, 64)
+            k = l << (msg_bit + func_bit)
+            return LWEParams(scheme, l, msg_bit, func_bit, n, prime(k.bit_length() * 2 + n.bit_length() * 15 + 10))
+        if n is None:
+            n = 5
+        p = prime((msg_bit + func_bit) * 2 + l.bit_length() + 1)
+        q = prime(p.bit_length() + n.bit_length() * 2 + (msg_bit + func_bit) + l.bit_length() // 2)
+        return LWEParams(scheme, l, msg_bit, func_bit, n, q, p)
+
+    def generate(self, seed_A: bool = False):
+        """
+        :return: Master key of the scheme for these parameters
+        """
+        if self.scheme == "adaptive":
+            from mife.single.lwe import FeLWE
+        else:
+            from mife.single.selective.lwe import FeLWE
+        return FeLWE.generate(self.l, self.msg_bit, self.func_bit, self.n, seed_A=seed_A, params=self)
+
+    def public_key_size(self, seed_A: bool = False) -> int:
+        """
+        :return: Bytes of the public key with bit-packed entries mod q
+        """
+        q_bits = self.q.bit_length()
+        A = 8 * 32 if seed_A else self.m * self.n * q_bits
+        if self.scheme == "adaptive":
+            return (A + self.l * self.n * q_bits + 7) // 8
+        return (A + self.l * self.m * q_bits + 7) // 8
+
+    def ciphertext_size(self, compressed: bool = False) -> int:
+        """
+        :param compressed: Size after FeLWE.compress with its default y bound, which is the uncompressed
+                           size when compressing does not save any bytes
+        :return: Bytes of one bit-packed cipher text
+        """
+        if self.scheme == "adaptive":
+            from mife.single.lwe import _compress_bits, _ciphertext_size
+            bits = _compress_bits(self)
+            fits = bits[0] < self.q.bit_length()
+        else:
+            from mife.single.selective.lwe import _compress_bits, _ciphertext_size
+            bits = _compress_bits(self)
+            fits = bits < self.q.bit_length()
+        if compressed and fits:
+            return min(_ciphertext_size(self, bits), _ciphertext_size(self))
+        return _ciphertext_size(self)
+
+    def export(self) -> dict:
+        return {
+            "scheme": self.scheme,
+            "l": self.l,
+            "msg_bit": self.msg_bit,
+            "func_bit": self.func_bit,
+            "n": self.n,
+            "q": self.q,
+            "p": self.p
+        }
+
+
+def largest_prime(bits: int) -> int:
+    """
+    :return: The largest prime of the given bit length
+    """
+    candidate = (1 << bits) - 1
+    while not isPrime(candidate):
+        candidate -= 2
+    return candidate
+
+
+# Largest primes for the bit lengths used by the presets
+_PRESET_PRIMES = {
+    21: 0x1ffff7,
+    37: 0x1fffffffe7,
+    40: 0xffffffffa9,
+    43: 0x7ffffffffc7,
+    65: 0x1ffffffffffffffcf,
+    70: 0x3fffffffffffffffdd,
+    139: 0x7ffffffffffffffffffffffffffffffff45,
+    161: 0x1ffffffffffffffffffffffffffffffffffffff61,
+}
+
+PRESETS = {
+    "adaptive-small": ("adaptive", 10, 4, 4, 64),
+    "adaptive-medium": ("adaptive", 64, 8, 8, 64),
+    "selective-small": ("selective", 10, 4, 4, 5),
+    "selective-medium": ("selective", 100, 8, 8, 5),
+    "selective-large": ("selective", 1000, 8, 8, 5),
+}
+
+_CACHE_FILE = "lwe_primes.json"
+
+
+def _load_cache() -> dict:
+    path = cache_path(_CACHE_FILE)
+    try:
+        with open(path) as f:
+            cache = {int(bits): int(prime) for bits, prime in json.load(f).items()}
+    except (OSError, ValueError, AttributeError):
+        return {}
+    # Entries that are not primes of the stated length are dropped
+    return {bits: prime for bits, prime in cache.items() if prime.bit_length() == bits and isPrime(prime)}
+
+
+def _save_cache(cache: dict):
+    path = cache_path(_CACHE_FILE)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w") as f:
+            json.dump({str(bits): str(prime) for bits, prime in cache.items()}, f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def cached_prime(bits: int) -> int:
+    """
+    :return: The largest prime of the given bit length, from the presets or the on-disk cache
+    """
+    if bits in _PRESET_PRIMES:
+        return _PRESET_PRIMES[bits]
+    cache = _load_cache()
+    if bits not in cache:
+        cache[bits] = largest_prime(bits)
+        _save_cache(cache)
+    return cache[bits]
+
+
+def lwe_params(scheme: str, l: int, msg_bit: int, func_bit: int, n: int = None) -> LWEParams:
+    """
+    :return: Parameters with cached primes for the configuration
+    """
+    return LWEParams.derive(scheme, l, msg_bit, func_bit, n, cached_prime)
+
+
+def preset(name: str) -> LWEParams:
+    """
+    :param name: One of PRESETS
+    :return: Parameters of the preset
+    """
+    if name not in PRESETS:
+        raise Exception(f"Unknown LWE preset {name}")
+    return LWEParams.derive(*PRESETS[name], prime=cached_prime)
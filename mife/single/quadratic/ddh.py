@@ -1,10 +1,10 @@
 from secrets import randbelow
 from typing import List, Tuple
 
-from mife.common import discrete_log_bound, invertible_matrix
+from mife.common import discrete_log_bound_table, random_invertible_matrix
 from mife.data.pairing import PairingBase
 from mife.data.pyecc_bn128_wrapper import Bn128Pairing
-from mife.data.matrix import Matrix
+from mife.data.mod_matrix import ModMatrix
 from mife.data.group import GroupElem
 from mife.data.zmod_r import ZmodR, _ZmodRElem
 
@@ -85,9 +85,10 @@ class FeDDH:
         if len(x) != key.n or len(y) != key.n:
             raise Exception(f"Encrypt vector must be of length {key.n}")
 
-        gamma = randbelow(key.G.order())
-        W = invertible_matrix(key.G, 2)
-        W_iT = W.inverse().T
+        q = key.G.order()
+        gamma = randbelow(q)
+        W, W_inv, _ = random_invertible_matrix(q, 2)
+        W_iT = W_inv.T
 
         c = [[] for i in range(key.n)]
 
@@ -95,9 +96,9 @@ class FeDDH:
         g2 = key.F.generator2()
 
         for i in range(key.n):
-            a = Matrix.flatten((W_iT * Matrix([x[i], gamma * key.msk.s[i]]).T).M)
-            b = Matrix.flatten((W * Matrix([y[i], -key.msk.t[i]]).T).M)
-            c[i] = [int(a[0]) * g1, int(a[1]) * g1, int(b[0]) * g2, int(b[1]) * g2]
+            a = (W_iT * ModMatrix([x[i], gamma * key.msk.s[i]], q).T).buf
+            b = (W * ModMatrix([y[i], -key.msk.t[i]], q).T).buf
+            c[i] = [a[0] * g1, a[1] * g1, b[0] * g2, b[1] * g2]
 
         return _FeDDH_C(gamma * g1, c)
 
@@ -119,10 +120,7 @@ class FeDDH:
                 t = pub.F.pairing(c.c[i][0], c.c[j][2]) + pub.F.pairing(c.c[i][1], c.c[j][3])
                 out += sk.f[i][j] * t
 
-        g1 = pub.F.generator1()
-        g2 = pub.F.generator2()
-
-        return discrete_log_bound(out, pub.F.pairing(g1, g2), bound)
+        return discrete_log_bound_table(out, pub.F.generatorT(), bound)
 
 
     @staticmethod
@@ -139,13 +137,12 @@ class FeDDH:
         if not key.has_private_key():
             raise Exception("Private key not found in master key")
 
-        eval = 0
-
         for i in range(key.n):
             if len(f[i]) != key.n:
                 raise Exception(f"Function vector must be of shape {key.n} x {key.n}")
-            for j in range(key.n):
-                eval += f[i][j] * key.msk.s[i] * key.msk.t[j]
+
+        # sum_i s_i * <f_i, t>
+        eval = key.G.dot(key.msk.s, [key.G.dot(f[i], key.msk.t) for i in range(key.n)])
 
         g2f = int(eval) * key.F.generator2()
 
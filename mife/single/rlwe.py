@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import math
+import numpy as np
+
+from typing import List, Tuple
+
+from mife.data.ntt import NegacyclicNTT, ntt_primes, NTT_PRIME_BITS
+from mife.data.rns import RNSBasis, RNSMatrix
+from mife.data.gaussian import discrete_gaussian, random_uint64, TAIL
+
+# References:
+# https://eprint.iacr.org/2021/046.pdf
+#
+# Ring R_q = Z_q[X]/(X^N + 1) with q a product of NTT friendly primes, every element is kept as its
+# residues (k, N). Function keys are integer vectors, so only the constant coefficient of each
+# pk[i] * r is needed and the cipher text carries one polynomial plus l constants.
+
+# Width of the RLWE noise r and f0 in encryption
+SIGMA = 3.2
+
+# Statistical distance 2^-FLOOD_BITS per coordinate between f1 and f1 shifted by the noise it hides
+FLOOD_BITS = 40
+
+# Largest bit size of q for 128 bit classical security with small secrets (HomomorphicEncryption.org)
+_MAX_Q_BITS = {1024: 27, 2048: 54, 4096: 109, 8192: 218, 16384: 438, 32768: 881}
+
+
+_rings = {}
+
+
+def _sigmas(l: int, N: int, func_bit: int) -> Tuple[float, float, float]:
+    """
+    :return: (sigma1, sigma2, sigma3) for the secrets s[i] and key noise e[i], for r and f0, and for the
+             flooding noise f1
+    """
+    # Keys reveal sum(y[i] * s[i]), sigma1 covers the smoothing parameter of the lattice spanned by
+    # function vectors of norm up to sqrt(l) * 2^func_bit
+    sigma1 = max(SIGMA, math.sqrt(math.log2(N) * l) * (1 << func_bit))
+    sigma2 = SIGMA
+    # c[i] = (ct0 * s[i])[0] + (e[i] * r - f0 * s[i])[0] + f1[i] + x[i] * delta, so f1 has to flood the
+    # middle term to keep s[i] out of the decrypted values. Its coefficients are sums of 2N products
+    # of Gaussians, bounded by TAIL * sqrt(2N) * sigma1 * sigma2 except with negligible probability
+    sigma3 = (1 << FLOOD_BITS) * TAIL * math.sqrt(2 * N) * sigma1 * sigma2
+    return sigma1, sigma2, sigma3
+
+
+def _ring(N: int, primes: List[int]):
+    # NTT tables and RNS basis are shared by all keys of the same ring
+    if (N, tuple(primes)) not in _rings:
+        _rings[(N, tuple(primes))] = NegacyclicNTT(N, primes), RNSBasis(primes)
+    return _rings[(N, tuple(primes))]
+
+
+class _FeRLWE_MK:
+    def __init__(self, l: int, msg_bit: int, func_bit: int, N: int, primes: List[int], delta: int,
+                 a: np.ndarray, pk: np.ndarray, S: np.ndarray = None):
+        """
+        Initialize FeRLWE master key
+
+        :param l: Dimension of vector
+        :param msg_bit: Upperbound of bit-size for each element in the message vector
+        :param func_bit: Upperbound of bit-size for each element in the function vector
+        :param N: Ring degree
+        :param primes: NTT friendly primes, q is their product
+        :param delta: Scaling factor of the message, q // K
+        :param a: Residues (k, N) of the uniform ring element a
+        :param pk: Residues (k, l, N) of a * s[i] + e[i] for i in range(l)
+        :param S: Secrets s[i] as an int64 array (l, N)
+        """
+        self.l = l
+        self.msg_bit = msg_bit
+        self.func_bit = func_bit
+        self.N = N
+        self.primes = primes
+        self.delta = delta
+        self.a = a
+        self.pk = pk
+        self.msk = S
+        self.ntt, self.basis = _ring(N, primes)
+        self.q = self.basis.Q
+        self._pk_rns = None
+
+    def pk_rns(self) -> RNSMatrix:
+        """
+        pk as an l x N RNS matrix, its limbs are cached since every encryption multiplies by it
+        """
+        if self._pk_rns is None:
+            self._pk_rns = RNSMatrix(self.basis, self.pk, (self.l, self.N))
+        return self._pk_rns
+
+    def has_private_key(self) -> bool:
+        return self.msk is not None
+
+    def get_public_key(self):
+        return _FeRLWE_MK(self.l, self.msg_bit, self.func_bit, self.N, self.primes, self.delta, self.a, self.pk)
+
+    def export(self):
+        return {
+            "l": self.l,
+            "msg_bit": self.msg_bit,
+            "func_bit": self.func_bit,
+            "N": self.N,
+            "primes": self.primes,
+            "delta": self.delta,
+            "a": self.a.tolist(),
+            "pk": self.pk.tolist(),
+            "msk": self.msk.tolist() if self.msk is not None else None
+        }
+
+
+class _FeRLWE_SK:
+    def __init__(self, y: List[int], sk: np.ndarray):
+        """
+        Initialize FeRLWE decryption key
+
+        :param y: Function vector
+        :param sk: sum(y[i] * s[i]) as an int64 array of length N
+        """
+        self.y = y
+        self.sk = sk
+
+    def export(self):
+        return {
+            "y": self.y,
+            "sk": self.sk.tolist()
+        }
+
+
+class _FeRLWE_C:
+    def __init__(self, ct0: np.ndarray, c: np.ndarray):
+        """
+        Initialize FeRLWE cipher text
+
+        :param ct0: Residues (k, N) of a * r + f0
+        :param c: Residues (k, l) of [(pk[i] * r)[0] + f1[i] + x[i] * delta for i in range(l)]
+        """
+        self.ct0 = ct0
+        self.c = c
+
+    def export(self):
+        return {
+            "ct0": self.ct0.tolist(),
+            "c": self.c.tolist()
+        }
+
+
+def _negacyclic_reverse(v: np.ndarray) -> np.ndarray:
+    # w with (u * v)[0] = <u, w> in Z[X]/(X^N + 1), i.e. w = [v[0], -v[N - 1], ..., -v[1]]
+    return np.concatenate((v[..., :1], -v[..., :0:-1]), axis=-1)
+
+
+class FeRLWE:
+    @staticmethod
+    def parameters(l: int, msg_bit: int, func_bit: int, N: int = None):
+        """
+        Choose the ring degree and the primes so that decryption is always correct
+
+        :param l: Dimension of vector
+        :param msg_bit: Upperbound of bit-size for each element in the message vector
+        :param func_bit: Upperbound of bit-size for each element in the function vector
+        :param N: Ring degree, the smallest secure one is chosen when None
+        :return: (N, primes, K) where messages are scaled by q // K
+        """
+        K = 2 * l * (1 << (msg_bit + func_bit)) + 1
+        y_bound = 1 << func_bit
+        for degree in sorted(_MAX_Q_BITS) if N is None else [N]:
+            b1, b2, b3 = (math.ceil(TAIL * sigma) for sigma in _sigmas(l, degree, func_bit))
+            # sum(y[i] * ((e[i] * r)[0] + f1[i])) - (f0 * sk)[0] with sk = sum(y[i] * s[i])
+            noise = l * y_bound * (2 * degree * b1 * b2 + b3)
+            k = ((4 * K * noise).bit_length() + 1) // (NTT_PRIME_BITS - 1) + 1
+            primes = ntt_primes(degree, k)
+            if N is not None or math.prod(primes).bit_length() <= _MAX_Q_BITS[degree]:
+                return degree, primes, K
+        raise Exception("No secure ring degree for these parameters")
+
+    @staticmethod
+    def generate(l: int, msg_bit: int, func_bit: int, N: int = None) -> _FeRLWE_MK:
+        """
+        Generate a FeRLWE master key
+
+        :param l: Dimension of vector
+        :param msg_bit: Upperbound of bit-size for each element in the message vector
+        :param func_bit: Upperbound of bit-size for each element in the function vector
+        :param N: Ring degree, the smallest secure one is chosen when None
+        :return: FeRLWE master key
+        """
+        N, primes, K = FeRLWE.parameters(l, msg_bit, func_bit, N)
+        k = len(primes)
+        p = np.array(primes, dtype=np.uint64).reshape(k, 1)
+
+        # Uniform residues modulo every prime give a uniform element of R_q, the bias of the
+        # reduction is below 2^-34
+        sigma1, _, _ = _sigmas(l, N, func_bit)
+        a = random_uint64(k * N).reshape(k, N) % p
+        S = discrete_gaussian(sigma1, l * N).reshape(l, N)
+        E = discrete_gaussian(sigma1, l * N).reshape(l, N)
+
+        ntt, _ = _ring(N, primes)
+        pk = (ntt.multiply(a[:, None, :], ntt.encode(S)) + ntt.encode(E)) % p[:, :, None]
+        return _FeRLWE_MK(l, msg_bit, func_bit, N, primes, math.prod(primes) // K, a, pk, S)
+
+    @staticmethod
+    def encrypt(x: List[int], pub: _FeRLWE_MK) -> _FeRLWE_C:
+        """
+        Encrypt FeRLWE message vector
+
+        :param x: Message vector
+        :param pub: FeRLWE public key
+        :return: FeRLWE cipher text
+        """
+        if len(x) != pub.l:
+            raise Exception("Encrypt vector must be of length l")
+
+        k, N = len(pub.primes), pub.N
+        p = pub.basis.p.reshape(k, 1)
+        _, sigma2, sigma3 = _sigmas(pub.l, N, pub.func_bit)
+        r = discrete_gaussian(sigma2, N)
+        f0 = discrete_gaussian(sigma2, N)
+        f1 = discrete_gaussian(sigma3, pub.l)
+
+        ct0 = (pub.ntt.multiply(pub.a, pub.ntt.encode(r)) + pub.ntt.encode(f0)) % p
+
+        # (pk[i] * r)[0] for all i as one product with the negacyclic reverse of r
+        basis = pub.basis
+        pk_r = pub.pk_rns() @ basis.encode(_negacyclic_reverse(r))
+        c = pk_r + basis.encode(f1.astype(object) + np.array(x, dtype=object) * pub.delta)
+
+        return _FeRLWE_C(ct0, c.res.reshape(k, pub.l))
+
+    @staticmethod
+    def decrypt(c: _FeRLWE_C, pub: _FeRLWE_MK, sk: _FeRLWE_SK) -> int:
+        """
+        Decrypt FeRLWE cipher text
+
+        :param c: FeRLWE cipher text
+        :param pub: FeRLWE public key
+        :param sk: FeRLWE decryption key
+        :return: Decrypted message
+        """
+        basis = pub.basis
+        k = len(pub.primes)
+        y_c = basis.encode(np.array(sk.y, dtype=np.int64)) @ RNSMatrix(basis, c.c.reshape(k, 1, -1), (pub.l,))
+        ct0_sk = RNSMatrix(basis, c.ct0.reshape(k, 1, -1), (pub.N,)) @ basis.encode(_negacyclic_reverse(sk.sk))
+        t = int((y_c - ct0_sk).mod(pub.q))
+        if t > pub.q // 2:
+            t -= pub.q
+        return (2 * t + pub.delta) // (2 * pub.delta)
+
+    @staticmethod
+    def keygen(y: List[int], key: _FeRLWE_MK) -> _FeRLWE_SK:
+        """
+        Generate FeRLWE decryption key
+
+        :param y: Function vector
+        :param key: FeRLWE master key
+        :return: FeRLWE decryption key
+        """
+        if len(y) != key.l:
+            raise Exception(f"Function vector must be of length {key.l}")
+        if not key.has_private_key():
+            raise Exception("Private key not found in master key")
+        return _FeRLWE_SK(y, np.array(y, dtype=np.int64) @ key.msk)
@@ -1,7 +1,7 @@
 from secrets import randbelow
 from typing import List, Tuple
 
-from mife.common import inner_product, discrete_log_bound, getStrongPrime
+from mife.common import inner_product, discrete_log_bound, getStrongPrime, sparse_vector, sparse_inner_product
 from mife.data.zmod import Zmod
 from mife.data.group import GroupBase, GroupElem
 
@@ -50,6 +50,7 @@ class _FeDDH_SK:
         :param sk: <msk, y>
         """
         self.y = y
+        self.y_sparse = sparse_vector(y)
         self.sk = sk
 
     def export(self):
@@ -121,9 +122,7 @@ class FeDDH:
         :param bound: Bound for discrete logarithm search, the decrypted text should be within the bound
         :return: Decrypted message
         """
-        cul = pub.F.identity()
-        for i in range(pub.n):
-            cul = cul + sk.y[i] * c.c[i]
+        cul = sparse_inner_product(c.c, sk.y_sparse, pub.F.identity())
         cul = cul - sk.sk * c.g_r
         return discrete_log_bound(cul, pub.g, bound)
 
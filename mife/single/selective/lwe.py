@@ -1,13 +1,20 @@
+from __future__ import annotations
+
+import os
+import struct
 import gmpy2
-import random
+import numpy as np
 
 from secrets import randbelow
-from Crypto.Util.number import getPrime
 from typing import List
 
-from mife.common import inner_product
+from mife.common import pack_ints, unpack_ints
 from mife.data.zmod_r import ZmodR
-from mife.data.matrix import Matrix
+from mife.data.mod_matrix import ModMatrix
+from mife.data.rns import RNSBasis, RNSMatrix
+from mife.data.gaussian import discrete_gaussian
+from mife.data.seed_expand import new_seed, expand_blocks, expand_matrix
+from mife.single.lwe_params import LWEParams
 
 # References:
 # https://eprint.iacr.org/2015/017.pdf
@@ -15,7 +22,8 @@ from mife.data.matrix import Matrix
 
 class _FeLWE_MK:
     def __init__(self, p: int, q: int, l: int, n: int, m: int, delta: int, G: ZmodR,
-                 A: Matrix, mpk: List[Matrix], msk: List[Matrix] = None):
+                 A: ModMatrix, mpk: List[ModMatrix], msk: List[ModMatrix] = None, seed: bytes = None,
+                 func_bit: int = None):
         """
         Initialize FeLWE master key
 
@@ -28,7 +36,9 @@ class _FeLWE_MK:
         :param G: Ring Z_q
         :param A: Random Matrix of size m x n
         :param mpk: [(A * s[i].T).T + e[i] for i in range(l)]
-        :param msk: [Matrix([random_element_in_G for _ in range(n)]) for _ in range(l)]
+        :param msk: [ModMatrix([random_element_in_G for _ in range(n)], q) for _ in range(l)]
+        :param seed: Seed A is expanded from when A is not stored
+        :param func_bit: Upperbound of bit-size for each element in the function vector
         """
         self.p = p
         self.q = q
@@ -36,16 +46,43 @@ class _FeLWE_MK:
         self.n = n
         self.m = m
         self.G = G
-        self.A = A
+        self._A = A
+        self.seed = seed
         self.msk = msk
         self.mpk = mpk
         self.delta = delta
+        self.func_bit = func_bit
+        self._rns = {}
+
+    @property
+    def A(self) -> ModMatrix:
+        # Keys holding only the seed expand A on first use
+        if self._A is None:
+            self._A = ModMatrix._raw(expand_matrix(self.seed, self.q, self.m, self.n).reshape(-1).tolist(),
+                                     self.q, self.m, self.n)
+        return self._A
+
+    def rns(self, name: str, basis: RNSBasis) -> RNSMatrix:
+        """
+        Residues of A (m x n) or of the stacked mpk (l x m), cached per basis since every encryption reuses them.
+        A seeded A is encoded block by block from the seed without materialising it.
+        """
+        if (name, basis.k) not in self._rns:
+            if name == "A" and self._A is None:
+                res = np.concatenate([basis.encode(block).res
+                                      for _, block in expand_blocks(self.seed, self.q, self.m, self.n)], axis=1)
+                self._rns[(name, basis.k)] = RNSMatrix(basis, res, (self.m, self.n))
+            else:
+                M = self.A if name == "A" else ModMatrix.stack(self.mpk)
+                self._rns[(name, basis.k)] = basis.encode(np.array(M.buf, dtype=object).reshape(M.n, M.m))
+        return self._rns[(name, basis.k)]
 
     def has_private_key(self) -> bool:
         return self.msk is not None
 
     def get_public_key(self):
-        return _FeLWE_MK(self.p, self.q, self.l, self.n, self.m, self.delta, self.G, self.A, self.mpk)
+        return _FeLWE_MK(self.p, self.q, self.l, self.n, self.m, self.delta, self.G, self._A, self.mpk, seed=self.seed,
+                          func_bit=self.func_bit)
 
     def export(self):
         return {
@@ -55,15 +92,17 @@ class _FeLWE_MK:
             "n": self.n,
             "m": self.m,
             "delta": self.delta,
+            "func_bit": self.func_bit,
             "G": self.G.export(),
-            "A": self.A.export(),
+            "A": self._A.export() if self.seed is None else None,
+            "seed": self.seed.hex() if self.seed is not None else None,
             "mpk": [x.export() for x in self.mpk],
             "msk": [x.export() for x in self.msk] if self.msk is not None else None
         }
 
 
 class _FeLWE_SK:
-    def __init__(self, y: List[int], sk: Matrix):
+    def __init__(self, y: List[int], sk: ModMatrix):
         """
         Initialize FeLWE decryption key
 
@@ -80,7 +119,7 @@ class _FeLWE_SK:
         }
 
 class _FeLWE_C:
-    def __init__(self, a_r: Matrix, c: List[int]):
+    def __init__(self, a_r: ModMatrix, c: List[int]):
         """
         Initialize FeLWE cipher text
 
@@ -97,9 +136,99 @@ class _FeLWE_C:
         }
 
 
+class _FeLWE_C_Compressed:
+    def __init__(self, a_r: ModMatrix, c: List[int], bits: int):
+        """
+        Initialize a FeLWE cipher text whose c is rounded from Z_q to Z_{2^bits}
+
+        :param a_r: r * A, kept modulo q
+        :param c: [round(c[i] * 2^bits / q) mod 2^bits for i in range(l)]
+        :param bits: Bit size of the compressed modulus
+        """
+        self.a_r = a_r
+        self.c = c
+        self.bits = bits
+
+    def decompress(self, q: int) -> _FeLWE_C:
+        return _FeLWE_C(self.a_r, [(x * q + (1 << (self.bits - 1))) >> self.bits for x in self.c])
+
+    def to_bytes(self) -> bytes:
+        """
+        :return: Header (n, bit size of q, l, bits) followed by the bit-packed a_r and c
+        """
+        a_bits = self.a_r.q.bit_length()
+        return (struct.pack("<IIII", self.a_r.m, a_bits, len(self.c), self.bits) +
+                pack_ints(self.a_r.buf, a_bits) + pack_ints(self.c, self.bits))
+
+    @staticmethod
+    def from_bytes(data: bytes, pub: _FeLWE_MK) -> _FeLWE_C_Compressed:
+        """
+        :param data: Output of to_bytes
+        :param pub: FeLWE public key the cipher text was encrypted under
+        """
+        n, a_bits, l, bits = struct.unpack_from("<IIII", data)
+        if (n, a_bits, l) != (pub.n, pub.q.bit_length(), pub.l):
+            raise Exception("Cipher text does not match the public key")
+        a_len = (n * a_bits + 7) // 8
+        a_r = ModMatrix._raw(unpack_ints(data[16:16 + a_len], n, a_bits), pub.q, 1, n)
+        return _FeLWE_C_Compressed(a_r, unpack_ints(data[16 + a_len:], l, bits), bits)
+
+    def export(self):
+        return {
+            "a_r": self.a_r.export(),
+            "c": self.c,
+            "bits": self.bits
+        }
+
+
+class _FeLWE_C_Batch:
+    def __init__(self, a_r: np.ndarray, c: np.ndarray, q: int):
+        """
+        Initialize a batch of FeLWE cipher texts, one row per message
+
+        :param a_r: R * A
+        :param c: R * mpk^T + X * delta
+        :param q: Ciphertext modulus
+        """
+        self.a_r = a_r
+        self.c = c
+        self.q = q
+
+    def __len__(self) -> int:
+        return self.c.shape[0]
+
+    def __getitem__(self, i: int) -> _FeLWE_C:
+        return _FeLWE_C(ModMatrix._raw(self.a_r[i].tolist(), self.q, 1, self.a_r.shape[1]), self.c[i].tolist())
+
+    def export(self):
+        return {
+            "a_r": [[str(x) for x in row] for row in self.a_r.tolist()],
+            "c": self.c.tolist()
+        }
+
+
+def _compress_bits(pub, y_bound: int = None) -> int:
+    if y_bound is None:
+        y_bound = 1 << pub.func_bit
+    # l * y_bound * (q / 2^(bits + 1) + 1) <= q / (8 * p)
+    return (8 * pub.l * y_bound * pub.p).bit_length()
+
+
+def _ciphertext_size(pub, bits: int = None) -> int:
+    """
+    :param bits: Bit size of the compressed c, None for the uncompressed cipher text
+    :return: Bytes of the bit-packed cipher text, including the 16 byte header of a compressed one
+    """
+    q_bits = pub.q.bit_length()
+    if bits is None:
+        return (pub.n * q_bits + pub.l * q_bits + 7) // 8
+    return 16 + (pub.n * q_bits + 7) // 8 + (pub.l * bits + 7) // 8
+
+
 class FeLWE:
     @staticmethod
-    def generate(l: int, msg_bit: int, func_bit: int, n: int = 5) -> _FeLWE_MK:
+    def generate(l: int, msg_bit: int, func_bit: int, n: int = None, seed_A: bool = False,
+                 params: LWEParams = None) -> _FeLWE_MK:
         """
         Generate a FeLWE master key
 
@@ -110,27 +239,37 @@ class FeLWE:
         :param l: Dimension of vector
         :param msg_bit: Upperbound of bit-size for each element in the message vector
         :param func_bit: Upperbound of bit-size for each element in the function vector
-        :param n: Dimension of the secret key
+        :param n: Dimension of the secret key, defaults to 5 or to that of params
+        :param seed_A: Store the 32 byte seed of A instead of A, it is expanded again when needed
+        :param params: Precomputed parameters, e.g. from lwe_params or preset, fresh primes are drawn when None
         :return: FeLWE master key
         """
-        p = getPrime((msg_bit + func_bit) * 2 + l.bit_length() + 1)
-        q = getPrime(p.bit_length() + n.bit_length() * 2 + (msg_bit + func_bit) + l.bit_length() // 2)
+        if params is None:
+            params = LWEParams.derive("selective", l, msg_bit, func_bit, n)
+        elif ((params.scheme, params.l, params.msg_bit, params.func_bit) != ("selective", l, msg_bit, func_bit) or
+              n not in (None, params.n)):
+            raise Exception("Parameters were derived for a different scheme, dimension or bounds")
+        l, n, p, q, m, delta = params.l, params.n, params.p, params.q, params.m, params.delta
         G = ZmodR(q)
 
-        m = 2 * (l + n + 1) * q.bit_length() + 1
-
-        delta = round(q / p)
         sigma = q / (2**func_bit * p * gmpy2.sqrt(2 * l * m * n))
 
-        sys_random = random.SystemRandom()
+        seed = new_seed()
+        A = None if seed_A else ModMatrix._raw(expand_matrix(seed, q, m, n).reshape(-1).tolist(), q, m, n)
+        S = ModMatrix([randbelow(q) for _ in range(l * n)], q, l, n)
+        E = discrete_gaussian(float(sigma), l * m).astype(object).reshape(l, m)
 
-        A = Matrix([[G(random.randrange(q)) for _ in range(n)] for _ in range(m)])
-        s = [Matrix([G(randbelow(q)) for _ in range(n)]) for _ in range(l)]
-        e = [Matrix([G(round(sys_random.gauss(0, sigma))) for _ in range(m)]) for _ in range(l)]
+        key = _FeLWE_MK(p=p, q=q, l=l, n=n, m=m, A=A, G=G, delta=delta, mpk=None, msk=None,
+                        seed=seed if seed_A else None, func_bit=func_bit)
 
-        mpk = [(A * s[i].T).T + e[i] for i in range(l)]
+        # Row i of S * A^T + E is (A * s[i].T).T + e[i]
+        basis = RNSBasis.for_bits(2 * q.bit_length() + n.bit_length())
+        S_rns = basis.encode(np.array(S.buf, dtype=object).reshape(l, n))
+        P = ((S_rns @ key.rns("A", basis).T).decode() + E) % q
 
-        return _FeLWE_MK(p=p, q=q, l=l, n=n, m=m, A=A, G=G, delta=delta, mpk=mpk, msk=s)
+        key.msk = [S.row(i) for i in range(l)]
+        key.mpk = [ModMatrix._raw(row.tolist(), q, 1, m) for row in P]
+        return key
 
     @staticmethod
     def encrypt(x: List[int], pub: _FeLWE_MK) -> _FeLWE_C:
@@ -144,31 +283,68 @@ class FeLWE:
         if len(x) != pub.l:
             raise Exception("Encrypt vector must be of length l")
 
-        c = []
+        basis = RNSBasis.for_bits(pub.q.bit_length() + pub.m.bit_length())
+        r = basis.encode(np.array([randbelow(2) for _ in range(pub.m)], dtype=np.int64))
 
-        r = Matrix([pub.G(randbelow(2)) for _ in range(pub.m)])
-        a_r = r * pub.A
+        a_r = ModMatrix._raw((r @ pub.rns("A", basis)).mod(pub.q).tolist(), pub.q, 1, pub.n)
+        c = ((pub.rns("mpk", basis) @ r).decode() + np.array(x, dtype=object) * pub.delta) % pub.q
 
-        for i in range(pub.l):
-            c.append(pub.mpk[i].dot(r) + x[i] * pub.delta)
+        return _FeLWE_C(a_r, c.tolist())
 
-        return _FeLWE_C(a_r, c)
+    @staticmethod
+    def encrypt_many(X: List[List[int]], pub: _FeLWE_MK) -> _FeLWE_C_Batch:
+        """
+        Encrypt a batch of FeLWE message vectors, the subset sums of all messages are
+        drawn as one 0/1 matrix R and computed with two matrix products
+
+        :param X: Message vectors
+        :param pub: FeLWE public key
+        :return: Batch of FeLWE cipher texts, indexing it gives the cipher text of X[i]
+        """
+        if any(len(x) != pub.l for x in X):
+            raise Exception("Encrypt vector must be of length l")
+
+        N = len(X)
+        basis = RNSBasis.for_bits(pub.q.bit_length() + pub.m.bit_length())
+        bits = np.unpackbits(np.frombuffer(os.urandom((N * pub.m + 7) // 8), dtype=np.uint8))
+        R = basis.encode(bits[:N * pub.m].astype(np.int64).reshape(N, pub.m))
+
+        a_r = (R @ pub.rns("A", basis)).mod(pub.q)
+        c = ((R @ pub.rns("mpk", basis).T).decode() + np.array(X, dtype=object).reshape(N, pub.l) * pub.delta) % pub.q
+
+        return _FeLWE_C_Batch(a_r, c, pub.q)
 
     @staticmethod
-    def decrypt(c: _FeLWE_C, pub: _FeLWE_MK, sk: _FeLWE_SK) -> int:
+    def compress(c: _FeLWE_C, pub: _FeLWE_MK, y_bound: int = None) -> _FeLWE_C | _FeLWE_C_Compressed:
         """
-        Decrypt FeLWE cipher text
+        Round c from Z_q to the smallest Z_{2^bits} whose rounding error, summed over a function
+        vector, stays below delta / 8. a_r is kept as is since <msk, y> is uniform modulo q.
 
         :param c: FeLWE cipher text
         :param pub: FeLWE public key
+        :param y_bound: Upper bound of |y[i]| for the function vectors this cipher text is decrypted with,
+                        defaults to 2^func_bit
+        :return: Compressed FeLWE cipher text, or c itself when compressing does not save any bytes
+        """
+        bits = _compress_bits(pub, y_bound)
+        if bits >= pub.q.bit_length() or _ciphertext_size(pub, bits) >= _ciphertext_size(pub):
+            return c
+        mask = (1 << bits) - 1
+        return _FeLWE_C_Compressed(c.a_r, [((x << bits) + pub.q // 2) // pub.q & mask for x in c.c], bits)
+
+    @staticmethod
+    def decrypt(c: _FeLWE_C | _FeLWE_C_Compressed, pub: _FeLWE_MK, sk: _FeLWE_SK) -> int:
+        """
+        Decrypt FeLWE cipher text
+
+        :param c: FeLWE cipher text, possibly compressed
+        :param pub: FeLWE public key
         :param sk: FeLWE decryption key
         :return: Decrypted message
         """
-        cul = pub.G(0)
-        for i in range(pub.l):
-            cul = cul + sk.y[i] * c.c[i]
-        cul = cul - sk.sk.dot(c.a_r)
-        t = int(cul)
+        if isinstance(c, _FeLWE_C_Compressed):
+            c = c.decompress(pub.q)
+        t = (sum(sk.y[i] * c.c[i] for i in range(pub.l)) - sk.sk.dot(c.a_r)) % pub.q
         if t > pub.q//2:
             t = -(pub.q - t)
         return round(t / pub.delta)
@@ -186,5 +362,5 @@ class FeLWE:
             raise Exception(f"Function vector must be of length {key.l}")
         if not key.has_private_key():
             raise Exception("Private key not found in master key")
-        sk = inner_product(key.msk, y, identity=Matrix([0 for _ in range(key.n)]))
+        sk = ModMatrix(y, key.q) * ModMatrix.stack(key.msk)
         return _FeLWE_SK(y, sk)
@@ -1,5 +1,5 @@
 from tests.test_base import TestBase
-from mife.data.pyecc_bn128_wrapper import Bn128Pairing
+from mife.data.pyecc_bn128_wrapper import Bn128Pairing, Bn128PairingPoint1, Bn128PairingPoint2
 import time, logging
 
 class TestBn128(TestBase):
@@ -27,3 +27,17 @@ class TestBn128(TestBase):
         end1 = time.time()
 
         logging.info(f'Bn128 Pairing Basic 2 : {end1 - start1}s')
+
+    def test_fixed_base(self):
+        G = Bn128Pairing()
+        g1 = G.generator1()
+        g2 = G.generator2()
+        k = G.order() - 12345
+
+        start1 = time.time()
+        self.assertEqual(k * g1, Bn128PairingPoint1(g1.point) * k)
+        self.assertEqual(k * g2, Bn128PairingPoint2(g2.point) * k)
+        self.assertEqual(0 * g1, G.identity1())
+        end1 = time.time()
+
+        logging.info(f'Bn128 Fixed Base : {end1 - start1}s')
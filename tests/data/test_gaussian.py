@@ -0,0 +1,44 @@
+import random
+from tests.test_base import TestBase
+from mife.data.gaussian import DiscreteGaussian, discrete_gaussian
+import numpy as np
+import time, logging
+
+
+class TestGaussian(TestBase):
+
+    def test_distribution(self):
+        n = 200000
+        for sigma in [3.2, 100.0, 2.0 ** 20]:
+            x = discrete_gaussian(sigma, n)
+            self.assertEqual(n, len(x))
+            self.assertEqual(np.int64, x.dtype)
+            self.assertLess(abs(x.mean()), 6 * sigma / n ** 0.5 + 1e-9)
+            self.assertLess(abs(x.std() / sigma - 1), 0.05)
+
+        small = DiscreteGaussian(3.2)
+        x = small.sample(n)
+        self.assertLessEqual(np.abs(x).max(), small.bound)
+
+    def test_huge_sigma(self):
+        sigma = 2.0 ** 100
+        x = discrete_gaussian(sigma, 1000)
+        self.assertEqual(object, x.dtype)
+        self.assertLess(abs(float(np.std(x.astype(float))) / sigma - 1), 0.2)
+        # Composed samples are not limited to the 53 bit precision of a single float
+        self.assertGreater(len({int(v) % 4096 for v in x}), 800)
+
+    def test_performance(self):
+        n = 100000
+        sigma = 1000.0
+        sys_random = random.SystemRandom()
+
+        start1 = time.time()
+        [round(sys_random.gauss(0, sigma)) for _ in range(n)]
+        end1 = time.time()
+
+        start2 = time.time()
+        discrete_gaussian(sigma, n)
+        end2 = time.time()
+
+        logging.info(f'Gaussian sampling (n={n}) : SystemRandom.gauss {end1 - start1}s, discrete_gaussian {end2 - start2}s')
@@ -0,0 +1,72 @@
+from random import randrange
+from tests.test_base import TestBase
+from mife.data.matrix import Matrix
+from mife.data.mod_matrix import ModMatrix, NotInvertibleError
+from mife.data.zmod_r import ZmodR
+from mife.common import invertible_mod_matrix
+import time, logging
+
+class TestModMatrix(TestBase):
+
+    q = 21888242871839275222246405745257275088548364400416034343698204186575808495617
+
+    def test_matches_matrix(self):
+        G = ZmodR(TestModMatrix.q)
+        n, m, k = 6, 5, 4
+        A = Matrix([[G(randrange(TestModMatrix.q)) for _ in range(m)] for _ in range(n)])
+        B = Matrix([[G(randrange(TestModMatrix.q)) for _ in range(k)] for _ in range(m)])
+        A_mod = ModMatrix.from_matrix(A, TestModMatrix.q)
+        B_mod = ModMatrix.from_matrix(B, TestModMatrix.q)
+
+        self.assertEqual(A * B, (A_mod * B_mod).to_matrix(G))
+        self.assertEqual(A.T, A_mod.T.to_matrix(G))
+        self.assertEqual(A + A, (A_mod + A_mod).to_matrix(G))
+        self.assertEqual(3 * A, (3 * A_mod).to_matrix(G))
+        self.assertEqual(A.row(1).dot(A.row(2)), A_mod.row(1).dot(A_mod.row(2)))
+        self.assertEqual(A.export(), A_mod.export())
+
+    def test_inverse(self):
+        G = ZmodR(TestModMatrix.q)
+        n = 8
+        A = Matrix([[G(randrange(TestModMatrix.q)) for _ in range(n)] for _ in range(n)])
+        A_mod = ModMatrix.from_matrix(A, TestModMatrix.q)
+
+        inv, det = A_mod.inverse(with_determinant=True)
+        identity = ModMatrix([[int(i == j) for j in range(n)] for i in range(n)], TestModMatrix.q)
+        self.assertEqual(identity, A_mod * inv)
+        self.assertEqual(1, det * A_mod.T.inverse().determinant() % TestModMatrix.q)
+        self.assertEqual(30, ModMatrix([[2, 7, 1], [0, 3, 5], [0, 0, 5]], TestModMatrix.q).determinant())
+        self.assertEqual(TestModMatrix.q - 1, ModMatrix([[0, 1], [1, 0]], TestModMatrix.q).determinant())
+
+        with self.assertRaises(NotInvertibleError):
+            ModMatrix([[1, 2], [2, 4]], TestModMatrix.q).inverse()
+
+    def test_lu_cached(self):
+        n = 50
+        M = invertible_mod_matrix(TestModMatrix.q, n)
+        lu = M.lu()
+
+        start1 = time.time()
+        inv, det = M.inverse(with_determinant=True)
+        end1 = time.time()
+
+        logging.info(f'ModMatrix inverse from cached LU (n={n}) : {end1 - start1}s')
+
+        self.assertIs(lu, M.lu())
+        self.assertEqual(det, M.determinant())
+        self.assertEqual(M * inv, inv * M)
+
+    def test_performance(self):
+        G = ZmodR(TestModMatrix.q)
+        n = 30
+        A = Matrix([[G(randrange(TestModMatrix.q)) for _ in range(n)] for _ in range(n)])
+        A_mod = ModMatrix.from_matrix(A, TestModMatrix.q)
+
+        start1 = time.time()
+        A * A
+        end1 = time.time()
+        start2 = time.time()
+        A_mod * A_mod
+        end2 = time.time()
+
+        logging.info(f'Matrix product (n={n}) : {end1 - start1}s, ModMatrix product : {end2 - start2}s')
@@ -0,0 +1,49 @@
+from tests.test_base import TestBase
+from mife.data.ntt import NegacyclicNTT, ntt_primes
+import numpy as np
+import time, logging
+
+
+class TestNTT(TestBase):
+
+    def test_multiply(self):
+        N = 64
+        ntt = NegacyclicNTT(N, ntt_primes(N, 2))
+        a = np.random.randint(-100, 100, N)
+        b = np.random.randint(-100, 100, N)
+
+        # Schoolbook product modulo X^N + 1
+        expected = np.zeros(N, dtype=object)
+        for i in range(N):
+            for j in range(N):
+                if i + j < N:
+                    expected[i + j] += int(a[i]) * int(b[j])
+                else:
+                    expected[i + j - N] -= int(a[i]) * int(b[j])
+
+        A, B = ntt.encode(a), ntt.encode(b)
+        self.assertTrue(np.array_equal(ntt.encode(expected), ntt.multiply(A, B)))
+        self.assertTrue(np.array_equal(A, ntt.inverse(ntt.forward(A))))
+
+        S = np.random.randint(-5, 5, (3, N))
+        batch = ntt.multiply(A[:, None, :], ntt.encode(S))
+        for i in range(3):
+            self.assertTrue(np.array_equal(ntt.multiply(A, ntt.encode(S[i])), batch[:, i]))
+
+    def test_primes(self):
+        for N in [1024, 4096]:
+            for p in ntt_primes(N, 3):
+                self.assertEqual(1, p % (2 * N))
+                self.assertLess(p, 1 << 30)
+
+    def test_performance(self):
+        N = 4096
+        ntt = NegacyclicNTT(N, ntt_primes(N, 3))
+        a = ntt.encode(np.random.randint(-5, 5, N))
+        b = ntt.encode(np.random.randint(-5, 5, N))
+
+        start1 = time.time()
+        ntt.multiply(a, b)
+        end1 = time.time()
+
+        logging.info(f'Negacyclic NTT product (N={N}, 3 primes) : {end1 - start1}s')
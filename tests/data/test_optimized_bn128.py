@@ -0,0 +1,72 @@
+from tests.test_base import TestBase
+from mife.data.pyecc_bn128_wrapper import Bn128Pairing
+from mife.data.pyecc_optimized_bn128_wrapper import (OptimizedBn128Pairing, OptimizedBn128PairingPoint1,
+                                                    OptimizedBn128PairingPoint2)
+from mife.common import discrete_log_bound
+import time, logging
+
+class TestOptimizedBn128(TestBase):
+    def test_basics(self):
+        G = OptimizedBn128Pairing()
+        g1 = G.generator1()
+        g2 = G.generator2()
+        gT = G.generatorT()
+
+        start1 = time.time()
+        self.assertEqual(G.pairing(g1 + g1, 3 * g2), (4 * gT) + (3 * gT) - (1 * gT))
+        end1 = time.time()
+
+        logging.info(f'Optimized Bn128 Pairing Basic 1 : {end1 - start1}s')
+
+    def test_bilinear(self):
+        G = OptimizedBn128Pairing()
+        g1 = G.generator1()
+        g2 = G.generator2()
+
+        start1 = time.time()
+        self.assertEqual(G.pairing(12345 * g1, 678 * g2), G.pairing(678 * g1, 12345 * g2))
+        self.assertEqual(G.pairing(-g1, g2), -G.generatorT())
+        self.assertEqual(G.pairing(G.identity1(), g2), G.identityT())
+        end1 = time.time()
+
+        logging.info(f'Optimized Bn128 Pairing Bilinear : {end1 - start1}s')
+
+    def test_match_bn128(self):
+        G = OptimizedBn128Pairing()
+        H = Bn128Pairing()
+
+        start1 = time.time()
+        self.assertEqual(G.pairing(5 * G.generator1(), 7 * G.generator2()),
+                         H.pairing(5 * H.generator1(), 7 * H.generator2()))
+        end1 = time.time()
+
+        logging.info(f'Optimized Bn128 Pairing Match : {end1 - start1}s')
+
+    def test_fixed_base(self):
+        G = OptimizedBn128Pairing()
+        g1 = G.generator1()
+        g2 = G.generator2()
+        k = G.order() - 12345
+
+        start1 = time.time()
+        self.assertEqual(k * g1, OptimizedBn128PairingPoint1(g1.point) * k)
+        self.assertEqual(k * g2, OptimizedBn128PairingPoint2(g2.point) * k)
+        self.assertEqual(0 * g1, G.identity1())
+        self.assertEqual(-1 * g2, -g2)
+        end1 = time.time()
+
+        logging.info(f'Optimized Bn128 Fixed Base : {end1 - start1}s')
+
+    def test_target_group(self):
+        G = OptimizedBn128Pairing()
+        gT = G.generatorT()
+
+        start1 = time.time()
+        self.assertEqual(-3 * gT, -(3 * gT))
+        self.assertEqual((G.order() - 3) * gT, -(3 * gT))
+        self.assertEqual(100 * gT, sum([gT for _ in range(100)], start=G.identityT()))
+        self.assertEqual(gT - gT, G.identityT())
+        self.assertEqual(discrete_log_bound(-123456 * gT, gT, (-200000, 200000)), -123456)
+        end1 = time.time()
+
+        logging.info(f'Optimized Bn128 Target Group : {end1 - start1}s')
@@ -1,5 +1,5 @@
 from tests.test_base import TestBase
-from mife.data.paillier import Paillier
+from mife.data.paillier import Paillier, PaillierKey, multi_exp
 import time, logging
 
 class TestPaillier(TestBase):
@@ -84,4 +84,53 @@ class TestPaillier(TestBase):
 
         end1 = time.time()
 
-        logging.info(f'Paillier Homomorphic 2 : {end1 - start1}s')
\ No newline at end of file
+        logging.info(f'Paillier Homomorphic 2 : {end1 - start1}s')
+
+    def test_crt_and_pool(self):
+        sk = Paillier.generate(1024, TestPaillier.p, TestPaillier.q)
+        pk = sk.getPublicKey()
+        slow = PaillierKey(sk.n, sk.g, sk.lcm)
+
+        cs = pk.encrypt_many([i * 1000 - 3 for i in range(10)])
+        start1 = time.time()
+        res1 = [slow.decrypt(c) for c in cs]
+        end1 = time.time()
+        start2 = time.time()
+        res2 = [sk.decrypt(c) for c in cs]
+        end2 = time.time()
+
+        logging.info(f'Paillier decrypt (10 cipher texts) : without CRT {end1 - start1}s, with CRT {end2 - start2}s')
+
+        expected = [(i * 1000 - 3) % sk.n for i in range(10)]
+        self.assertEqual(expected, res1)
+        self.assertEqual(expected, res2)
+
+        pk.start_pool(size=8, batch=4)
+        try:
+            time.sleep(0.5)
+            start3 = time.time()
+            cs = [pk.encrypt(i) for i in range(8)]
+            end3 = time.time()
+        finally:
+            pk.stop_pool()
+
+        logging.info(f'Paillier encrypt from r^n pool (8 cipher texts) : {end3 - start3}s')
+        self.assertEqual(list(range(8)), [sk.decrypt(c) for c in cs])
+
+    def test_multi_exp(self):
+        sk = Paillier.generate(1024, TestPaillier.p, TestPaillier.q)
+        pk = sk.getPublicKey()
+        xs = [i * 7 - 100 for i in range(200)]
+        es = [(i * 0x9e3779b97f4a7c15 ** 3) % (1 << 256) for i in range(200)]
+        es[3] = 0
+        es[5] = -5
+        cs = pk.encrypt_many(xs)
+
+        start = time.time()
+        res = multi_exp(cs, es)
+        end = time.time()
+
+        logging.info(f'Paillier multi-exponentiation (200 cipher texts, 256 bit scalars) : {end - start}s')
+        self.assertEqual(sum(x * e for x, e in zip(xs, es)) % sk.n, sk.decrypt(res))
+        self.assertEqual(sk.decrypt(sum(e * c for c, e in zip(cs, es) if e >= 0)),
+                         sk.decrypt(multi_exp([c for c, e in zip(cs, es) if e >= 0], [e for e in es if e >= 0])))
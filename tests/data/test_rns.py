@@ -0,0 +1,56 @@
+from secrets import randbelow
+from tests.test_base import TestBase
+from mife.data.rns import RNSBasis
+import numpy as np
+import time, logging
+
+
+class TestRNS(TestBase):
+
+    q = 21888242871839275222246405745257275088548364400416034343698204186575808495617
+
+    def test_matmul(self):
+        q = TestRNS.q
+        n, m, k = 7, 300, 5
+        A = np.array([[randbelow(q) for _ in range(m)] for _ in range(n)], dtype=object)
+        B = np.array([[randbelow(q) - q // 2 for _ in range(k)] for _ in range(m)], dtype=object)
+        basis = RNSBasis.for_bits(2 * q.bit_length() + m.bit_length())
+
+        self.assertTrue(np.array_equal(A @ B, (basis.encode(A) @ basis.encode(B)).decode()))
+        self.assertTrue(np.array_equal((A @ B) % q, (basis.encode(A) @ basis.encode(B)).mod(q)))
+        self.assertTrue(np.array_equal(B.T @ A.T, (basis.encode(B).T @ basis.encode(A).T).decode()))
+
+    def test_vectors(self):
+        q = TestRNS.q
+        basis = RNSBasis.for_bits(2 * q.bit_length() + 8)
+        A = np.array([[randbelow(q) for _ in range(20)] for _ in range(10)], dtype=object)
+        x = np.array([randbelow(q) - q // 2 for _ in range(10)], dtype=object)
+        y = np.array([randbelow(2) for _ in range(20)], dtype=np.int64)
+
+        self.assertTrue(np.array_equal(x @ A, (basis.encode(x) @ basis.encode(A)).decode()))
+        self.assertTrue(np.array_equal(A @ y, (basis.encode(A) @ basis.encode(y)).decode()))
+        self.assertEqual(x @ x, (basis.encode(x) @ basis.encode(x)).decode())
+
+        a, b = basis.encode(x), basis.encode(x[::-1].copy())
+        self.assertTrue(np.array_equal(x - x[::-1], (a - b).decode()))
+        self.assertTrue(np.array_equal(-x + x[::-1], (-a + b).decode()))
+        self.assertTrue(np.array_equal(-3 * x, (-3 * a).decode()))
+
+    def test_performance(self):
+        q = TestRNS.q
+        n, m = 10, 2000
+        A = np.array([[randbelow(q) for _ in range(m)] for _ in range(n)], dtype=object)
+        B = np.array([[randbelow(q) for _ in range(64)] for _ in range(m)], dtype=object)
+        basis = RNSBasis.for_bits(2 * q.bit_length() + m.bit_length())
+
+        start1 = time.time()
+        expected = A @ B
+        end1 = time.time()
+
+        start2 = time.time()
+        res = (basis.encode(A) @ basis.encode(B)).decode()
+        end2 = time.time()
+
+        logging.info(f'Object matrix product ({n}x{m} by {m}x64) : {end1 - start1}s, RNS product : {end2 - start2}s')
+
+        self.assertTrue(np.array_equal(expected, res))
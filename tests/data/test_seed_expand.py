@@ -0,0 +1,31 @@
+from tests.test_base import TestBase
+from mife.data.seed_expand import new_seed, expand_matrix, expand_blocks, expand_rows, expand_row
+import numpy as np
+import time, logging
+
+
+class TestSeedExpand(TestBase):
+
+    q = 21888242871839275222246405745257275088548364400416034343698204186575808495617
+
+    def test_expand(self):
+        seed = new_seed()
+        for q in [97, (1 << 61) - 1, (1 << 64) - 59, TestSeedExpand.q]:
+            A = expand_matrix(seed, q, 300, 7)
+            self.assertEqual((300, 7), A.shape)
+            self.assertTrue(all(0 <= int(v) < q for v in A.flat))
+            self.assertTrue(np.array_equal(A, expand_matrix(seed, q, 300, 7)))
+            self.assertTrue(np.array_equal(A, np.concatenate([b for _, b in expand_blocks(seed, q, 300, 7, block=64)])))
+            self.assertTrue(np.array_equal(A[100:150], expand_rows(seed, q, 7, 100, 150)))
+            self.assertTrue(np.array_equal(A[5], expand_row(seed, q, 7, 5)))
+            self.assertFalse(np.array_equal(A, expand_matrix(new_seed(), q, 300, 7)))
+
+    def test_performance(self):
+        q = TestSeedExpand.q
+        m, n = 10000, 64
+
+        start1 = time.time()
+        expand_matrix(new_seed(), q, m, n)
+        end1 = time.time()
+
+        logging.info(f'Seed expansion of {m}x{n} matrix mod {q.bit_length()} bit q : {end1 - start1}s')
@@ -0,0 +1,83 @@
+from secrets import randbelow
+from gmpy2 import mpz
+from tests.test_base import TestBase
+from mife.data.zmod_r import ZmodR
+import time, logging
+
+
+class _ReferenceElem:
+    # Previous _ZmodRElem arithmetic (reduce on every operation), kept for timing comparison
+
+    def __init__(self, modulus, val):
+        self.modulus = modulus
+        self._val = val
+
+    def __add__(self, other):
+        return _ReferenceElem(self.modulus, (self._val + other._val) % self.modulus)
+
+    def __mul__(self, other):
+        return _ReferenceElem(self.modulus, (self._val * other._val) % self.modulus)
+
+    @property
+    def val(self):
+        self._val = self._val % self.modulus
+        return self._val
+
+
+class TestZmodR(TestBase):
+
+    q = 21888242871839275222246405745257275088548364400416034343698204186575808495617
+
+    def test_arithmetic(self):
+        G = ZmodR(101)
+        a, b = G(5), G(7)
+        self.assertEqual(12, a + b)
+        self.assertEqual(99, a - b)
+        self.assertEqual(96, -a)
+        self.assertEqual(35, a * b)
+        self.assertEqual(a, a / b * b)
+        self.assertEqual(G(3), 3 / a * a)
+        self.assertEqual(G(99), a - b)
+        self.assertEqual(hash(G(99)), hash(a - b))
+        self.assertEqual(56, G.dot([a, b], [b, 3]))
+        self.assertEqual(19, a.fma(b, 2))
+
+        c = a
+        for _ in range(200):
+            c = c * b + a - b
+        expected = 5
+        for _ in range(200):
+            expected = (expected * 7 + 5 - 7) % 101
+        self.assertEqual(expected, int(c))
+
+    def test_dot_performance(self):
+        q = TestZmodR.q
+        G = ZmodR(q)
+        n = 20000
+        x = [randbelow(q) for _ in range(n)]
+        y = [randbelow(q) for _ in range(n)]
+
+        ref_x = [_ReferenceElem(q, mpz(v)) for v in x]
+        ref_y = [_ReferenceElem(q, mpz(v)) for v in y]
+        start1 = time.time()
+        cul = _ReferenceElem(q, mpz(0))
+        for a, b in zip(ref_x, ref_y):
+            cul = cul + a * b
+        end1 = time.time()
+
+        elem_x = [G(v) for v in x]
+        elem_y = [G(v) for v in y]
+        start2 = time.time()
+        acc = G(0)
+        for a, b in zip(elem_x, elem_y):
+            acc = acc.fma(a, b)
+        end2 = time.time()
+
+        start3 = time.time()
+        res = G.dot(elem_x, elem_y)
+        end3 = time.time()
+
+        logging.info(f'ZmodR dot product (n={n}) : reference {end1 - start1}s, fma {end2 - start2}s, dot {end3 - start3}s')
+
+        self.assertEqual(cul.val, acc)
+        self.assertEqual(cul.val, res)
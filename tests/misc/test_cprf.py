@@ -1,7 +1,22 @@
 import unittest
+import time
 import logging
 from mife.misc.cprf import CPRF
+from Crypto.Cipher import AES
 from Crypto.Util.number import getPrime
+from hashlib import sha256
+
+
+def eval_ctr(n, i, keys, x, length):
+    # Reference: one AES-CTR keystream per peer, as CPRF.eval computed it before eval_many
+    res = 0
+    for j in range(n):
+        if j == i:
+            continue
+        cipher = AES.new(keys[j], AES.MODE_CTR, nonce=sha256(x).digest()[:8])
+        res += (-1)**(j < i) * int.from_bytes(cipher.encrypt(b'\x00' * length), 'big')
+    return res
+
 
 class TestCPRF(unittest.TestCase):
     logging.getLogger().setLevel(logging.INFO)
@@ -23,3 +38,26 @@ class TestCPRF(unittest.TestCase):
         x = b'123456'
         res = [cprf.eval(n, i, keys[i], x, 512) for i in range(n)]
         assert sum(res) == 0
+
+    def test_cprf_many(self):
+        n = 10
+        cprf = CPRF(n)
+        cprf.setup_key()
+        keys = [cprf.keygen(i) for i in range(n)]
+        xs = [f'tag-{k}'.encode() for k in range(500)]
+
+        start = time.time()
+        res = [cprf.eval_many(n, i, keys[i], xs, 128) for i in range(n)]
+        end = time.time()
+        logging.info(f'CPRF eval_many (n={n}, {len(xs)} inputs) : {end - start}s')
+
+        for k in range(len(xs)):
+            assert sum(res[i][k] for i in range(n)) == 0
+        for k in (0, 7, 499):
+            assert res[3][k] == eval_ctr(n, 3, keys[3], xs[k], 128)
+            assert cprf.eval(n, 3, keys[3], xs[k], 128) == eval_ctr(n, 3, keys[3], xs[k], 128)
+        # Lengths that are not a multiple of the AES block size
+        ciphers = CPRF.ciphers(n, 0, keys[0])
+        for length in (1, 17, 100):
+            out = cprf.eval_many(n, 0, keys[0], xs[:3], length, ciphers)
+            assert out == [eval_ctr(n, 0, keys[0], x, length) for x in xs[:3]]
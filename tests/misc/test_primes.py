@@ -0,0 +1,81 @@
+import os
+import stat
+import time
+import logging
+import tempfile
+
+from Crypto.Util.number import isPrime
+from tests.test_base import TestBase
+from mife.misc.primes import PrimeCache, generate_strong_primes, enable_cache, disable_cache, strong_primes
+
+
+class TestPrimes(TestBase):
+
+    def test_generate(self):
+        start = time.time()
+        primes = generate_strong_primes(512, 2, workers=2)
+        end = time.time()
+        logging.info(f'Parallel strong prime search (2 x 512 bits) : {end - start}s')
+
+        self.assertEqual(2, len(primes))
+        self.assertNotEqual(primes[0], primes[1])
+        for p in primes:
+            self.assertEqual(512, p.bit_length())
+            self.assertTrue(isPrime(p))
+
+    def test_generate_single(self):
+        start = time.time()
+        primes = generate_strong_primes(512, 1, workers=2)
+        end = time.time()
+        logging.info(f'Raced strong prime search (1 x 512 bits, 2 workers) : {end - start}s')
+
+        self.assertEqual(1, len(primes))
+        self.assertEqual(512, primes[0].bit_length())
+        self.assertTrue(isPrime(primes[0]))
+        with self.assertRaises(ValueError):
+            generate_strong_primes(500, 1, workers=2)
+
+    def test_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "primes.json")
+            cache = PrimeCache(size=2, path=path)
+            primes = generate_strong_primes(512, 2, workers=1)
+            cache.put(512, primes + [primes[0] + 2])
+
+            self.assertEqual(0o600, stat.S_IMODE(os.stat(path).st_mode))
+            self.assertEqual(3, cache.count(512))
+
+            # The composite entry is dropped, every prime is handed out once
+            taken = cache.take(512, 3)
+            self.assertEqual(sorted(primes), sorted(taken))
+            self.assertEqual([], cache.take(512))
+            self.assertEqual([], cache.take(1024))
+
+    def test_refill(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "primes.json")
+            cache = enable_cache(bits=(512,), size=2, refill=False, path=path)
+            try:
+                start = time.time()
+                self.assertTrue(cache.refill((512,), workers=1))
+                end = time.time()
+                logging.info(f'Prime cache refill (2 x 512 bits) : {end - start}s')
+                self.assertEqual(2, cache.count(512))
+                self.assertFalse(cache.refill((512,), workers=1))
+
+                cached = cache._load()[512]
+                primes = strong_primes(512, 3, workers=1)
+                self.assertEqual(3, len(set(primes)))
+                self.assertTrue(set(cached) <= set(primes))
+                self.assertEqual(0, cache.count(512))
+            finally:
+                disable_cache()
+
+    def test_refill_thread(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "primes.json")
+            cache = PrimeCache(size=1, path=path)
+            cache.start_refill((512,), workers=1)
+            # stop_refill waits for the pass in progress, nothing is written after it returns
+            cache.stop_refill()
+            self.assertLessEqual(cache.count(512), 1)
@@ -125,3 +125,56 @@ class TestFeDamgardMulti(TestBase):
         self.assertEqual(expected, res)
 
 
+
+    def test_scheme_parallel(self):
+        start = time.time()
+        n = 4
+        m = 64
+        x = [[i * 10 + j for j in range(m)] for i in range(n)]
+        y = [[i - j for j in range(m)] for i in range(n)]
+        key = FeDamgardMulti.generate(n, m, workers=2)
+        cs = [FeDamgardMulti.encrypt(x[i], key.get_enc_key(i), workers=2) for i in range(n)]
+        sk = FeDamgardMulti.keygen(y, key)
+        res = FeDamgardMulti.decrypt(cs, key.get_public_key(), sk, (-1000000, 1000000))
+        end = time.time()
+
+        logging.info(f'FeDamgardMulti parallel performance with Prime Group (n={n},m={m}): {end - start}s')
+
+        expected = 0
+        for i in range(n):
+            expected += sum([a * b for a, b in zip(x[i], y[i])])
+
+        self.assertEqual(expected, res)
+
+    def test_scheme_parallel_curve(self):
+        n = 2
+        m = 4
+        x = [[i + j for j in range(m)] for i in range(n)]
+        y = [[i - j for j in range(m)] for i in range(n)]
+        key = FeDamgardMulti.generate(n, m, WrapCurve(P192), workers=2)
+        cs = [FeDamgardMulti.encrypt(x[i], key.get_enc_key(i), workers=2) for i in range(n)]
+        sk = FeDamgardMulti.keygen(y, key)
+        res = FeDamgardMulti.decrypt(cs, key.get_public_key(), sk, (-1000, 1000))
+
+        expected = 0
+        for i in range(n):
+            expected += sum([a * b for a, b in zip(x[i], y[i])])
+
+        self.assertEqual(expected, res)
+
+    def test_scheme_sparse(self):
+        n = 4
+        m = 10
+        x = [[i * 10 + j for j in range(m)] for i in range(n)]
+        y = [[0 for _ in range(m)] for _ in range(n)]
+        y[1][2], y[1][3], y[3][9] = -1, 1, 2
+        key = FeDamgardMulti.generate(n, m)
+        cs = [FeDamgardMulti.encrypt(x[i], key.get_enc_key(i)) for i in range(n)]
+        sk = FeDamgardMulti.keygen(y, key)
+        res = FeDamgardMulti.decrypt(cs, key.get_public_key(), sk, (-1000, 1000))
+
+        expected = 0
+        for i in range(n):
+            expected += sum([a * b for a, b in zip(x[i], y[i])])
+
+        self.assertEqual(expected, res)
@@ -109,3 +109,44 @@ class TestPalia(TestBase):
             expected += sum([a * b for a, b in zip(x[i], y[i])])
 
         self.assertEqual(expected, res)
+
+    def test_scheme_aggregate(self):
+        n = 4
+        m = 6
+        x = [[i * 3 + j for j in range(m)] for i in range(n)]
+        y = [[(i + 1) * (j - 2) for j in range(m)] for i in range(n)]
+        tag = b"testingtag123"
+        pub = Palia.generate(n, m, Curve25519)
+        keys = [pub.generate_party(i) for i in range(n)]
+
+        for i in range(n):
+            for j in range(n):
+                if i == j: continue
+                keys[i].exchange(j, keys[j].get_exc_public_key())
+
+        for i in range(n):
+            keys[i].generate_share()
+
+        mk = Palia.generate_query_key(pub)
+        enc_y = Palia.encrypt_query(y, mk.getPublicKey(), pub)
+        cs = [Palia.encrypt(x[i], tag, keys[i]) for i in range(n)]
+
+        # Partial keys arrive in any order and are folded as they come
+        agg = Palia.aggregate(pub)
+        for i in reversed(range(n)):
+            self.assertFalse(agg.complete())
+            agg.add(i, Palia.keygen(enc_y, keys[i]))
+        self.assertTrue(agg.complete())
+        with self.assertRaises(Exception):
+            agg.add(0, Palia.keygen(enc_y, keys[0]))
+
+        start = time.time()
+        res = Palia.decrypt_aggregate(cs, tag, pub, agg, y, mk, (-10000, 10000))
+        end = time.time()
+        logging.info(f'Palia aggregated decryption with Curve25519 (n={n},m={m}): {end - start}s')
+
+        expected = 0
+        for i in range(n):
+            expected += sum([a * b for a, b in zip(x[i], y[i])])
+
+        self.assertEqual(expected, res)
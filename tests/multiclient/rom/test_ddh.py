@@ -149,4 +149,22 @@ class TestFeDDHMultiClient(TestBase):
         for i in range(n):
             expected += sum([a * b for a, b in zip(x[i], y[i])])
 
-        self.assertEqual(expected, res)
\ No newline at end of file
+        self.assertEqual(expected, res)
+
+    def test_scheme_sparse(self):
+        n = 3
+        m = 20
+        x = [[i + j for j in range(m)] for i in range(n)]
+        y = [[0 for _ in range(m)] for _ in range(n)]
+        y[0][1], y[0][5], y[2][19] = 1, -1, 5
+        tag = b"testingtag123"
+        key = FeDDHMultiClient.generate(n, m, WrapCurve(P256))
+        cs = [FeDDHMultiClient.encrypt(x[i], tag, key.get_enc_key(i)) for i in range(n)]
+        sk = FeDDHMultiClient.keygen(y, key)
+        res = FeDDHMultiClient.decrypt(cs, tag, key.get_public_key(), sk, (-1000, 1000))
+
+        expected = 0
+        for i in range(n):
+            expected += sum([a * b for a, b in zip(x[i], y[i])])
+
+        self.assertEqual(expected, res)
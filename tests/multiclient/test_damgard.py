@@ -90,3 +90,41 @@ class TestFeDamgardMultiClient(TestBase):
             expected += sum([a * b for a, b in zip(x[i], y[i])])
 
         self.assertEqual(expected, res)
+
+    def test_scheme_scheduler(self):
+        n = 3
+        m = 5
+        x = [[i * 2 - j for j in range(m)] for i in range(n)]
+        y = [[i + j - 3 for j in range(m)] for i in range(n)]
+        key = FeDamgardMultiClient.generate(n, m)
+        pub = key.get_public_key()
+        enc_keys = [key.get_enc_key(i) for i in range(n)]
+        tags = [f'{t}'.encode() for t in range(3)]
+
+        schedulers = [FeDamgardMultiClient.pad_scheduler(enc_keys[i], pub, capacity=2) for i in range(n)]
+        try:
+            for s in schedulers:
+                # The expired tag is never computed
+                s.schedule([b'expired'], [time.time() - 1])
+                s.schedule(tags)
+            wait = time.time()
+            while any(len(s.ready) < 2 for s in schedulers) and time.time() - wait < 60:
+                time.sleep(0.05)
+            for s in schedulers:
+                self.assertEqual(list(s.ready), tags[:2])
+
+            sk = FeDamgardMultiClient.keygen(y, key)
+            expected = 0
+            for i in range(n):
+                expected += sum([a * b for a, b in zip(x[i], y[i])])
+
+            for tag in tags:
+                start = time.time()
+                cs = [FeDamgardMultiClient.encrypt(x[i], tag, enc_keys[i], pub, schedulers[i]) for i in range(n)]
+                end = time.time()
+                logging.info(f'FeDamgardMultiClient online encryption with precomputed pads (n={n},m={m}): '
+                             f'{end - start}s')
+                self.assertEqual(expected, FeDamgardMultiClient.decrypt(cs, pub, sk, (-2000, 2000)))
+        finally:
+            for s in schedulers:
+                s.stop()
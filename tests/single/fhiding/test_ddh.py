@@ -2,6 +2,7 @@ import time
 import logging
 from tests.test_base import TestBase
 from mife.single.fhiding.ddh import FeDDH
+from mife.data.pyecc_optimized_bn128_wrapper import OptimizedBn128Pairing
 
 class TestFeDDH(TestBase):
 
@@ -38,4 +39,44 @@ class TestFeDDH(TestBase):
         expected = sum([a * b for a, b in zip(x, y)])
         self.assertEqual(expected, m)
 
+    def test_scheme_optimized_pairing(self):
+        start = time.time()
+        n = 10
+        x = [i for i in range(n)]
+        y = [i - 5 for i in range(n)]
+        key = FeDDH.generate(n, OptimizedBn128Pairing())
+        c = FeDDH.encrypt(x, key)
+        sk = FeDDH.keygen(y, key)
+        m = FeDDH.decrypt(c, key.get_public_key(), sk, (-1000, 1000))
+        end = time.time()
+
+        logging.info(f'Function Hiding FeDDH optimized pairing performance (n={n}): {end - start}s')
 
+        expected = sum([a * b for a, b in zip(x, y)])
+        self.assertEqual(expected, m)
+
+    def test_scheme_many(self):
+        start = time.time()
+        n = 4
+        X = [[i + j for i in range(n)] for j in range(3)]
+        Y = [[i - j for i in range(n)] for j in range(2)]
+        key = FeDDH.generate(n, OptimizedBn128Pairing())
+        cs = FeDDH.encrypt_many(X, key, workers=2)
+        sks = FeDDH.keygen_many(Y, key, workers=1)
+        for x, c in zip(X, cs):
+            for y, sk in zip(Y, sks):
+                m = FeDDH.decrypt(c, key.get_public_key(), sk, (-1000, 1000))
+                self.assertEqual(sum([a * b for a, b in zip(x, y)]), m)
+        end = time.time()
+
+        logging.info(f'Function Hiding FeDDH batch performance (n={n}, {len(X)} x {len(Y)}): {end - start}s')
+
+    def test_scheme_many_bn128(self):
+        n = 2
+        x = [3, 4]
+        y = [5, -6]
+        key = FeDDH.generate(n)
+        c = FeDDH.encrypt_many([x], key, workers=2)[0]
+        sk = FeDDH.keygen_many([y], key, workers=2)[0]
+        m = FeDDH.decrypt(c, key.get_public_key(), sk, (-100, 100))
+        self.assertEqual(-9, m)
@@ -2,6 +2,7 @@ import time
 import logging
 from tests.test_base import TestBase
 from mife.single.quadratic.ddh import FeDDH
+from mife.data.pyecc_optimized_bn128_wrapper import OptimizedBn128Pairing
 
 class TestFeDDH(TestBase):
 
@@ -51,4 +52,70 @@ class TestFeDDH(TestBase):
 
         self.assertEqual(expected, m)
 
+    def test_scheme_optimized_pairing(self):
+        start = time.time()
+        n = 4
+        x = [i + 2 for i in range(n)]
+        y = [i - 3 for i in range(n)]
+        f = [[i * j + 1 for j in range(n)] for i in range(n)]
+
+        key = FeDDH.generate(n, OptimizedBn128Pairing())
+        c = FeDDH.encrypt(x, y, key)
+        sk = FeDDH.keygen(f, key)
+        m = FeDDH.decrypt(c, key.get_public_key(), sk, (-10000, 10000))
+        end = time.time()
+
+        logging.info(f'Quadratic FeDDH optimized pairing performance (n={n}): {end - start}s')
+
+        expected = 0
+        for i in range(n):
+            for j in range(n):
+                expected += f[i][j] * x[i] * y[j]
+
+        self.assertEqual(expected, m)
+
+    def test_scheme_negative_coefficients(self):
+        start = time.time()
+        n = 3
+        x = [i - 2 for i in range(n)]
+        y = [i + 3 for i in range(n)]
+        f = [[i - j - 1 for j in range(n)] for i in range(n)]
+
+        key = FeDDH.generate(n, OptimizedBn128Pairing())
+        c = FeDDH.encrypt(x, y, key)
+        sk = FeDDH.keygen(f, key)
+        m = FeDDH.decrypt(c, key.get_public_key(), sk, (-10000, 10000))
+        end = time.time()
+
+        logging.info(f'Quadratic FeDDH negative coefficients performance (n={n}): {end - start}s')
+
+        expected = 0
+        for i in range(n):
+            for j in range(n):
+                expected += f[i][j] * x[i] * y[j]
+
+        self.assertEqual(expected, m)
+
+    def test_scheme_reuse_dlog_table(self):
+        n = 3
+        f = [[i + j for j in range(n)] for i in range(n)]
+        key = FeDDH.generate(n, OptimizedBn128Pairing())
+        sk = FeDDH.keygen(f, key)
+
+        for t in range(3):
+            x = [i * t - 4 for i in range(n)]
+            y = [i + t for i in range(n)]
+            c = FeDDH.encrypt(x, y, key)
+
+            start = time.time()
+            m = FeDDH.decrypt(c, key.get_public_key(), sk, (-100000, 100000))
+            end = time.time()
+
+            logging.info(f'Quadratic FeDDH decrypt {t} (n={n}): {end - start}s')
+
+            expected = 0
+            for i in range(n):
+                for j in range(n):
+                    expected += f[i][j] * x[i] * y[j]
 
+            self.assertEqual(expected, m)
@@ -67,3 +67,22 @@ class TestFeDDH(TestBase):
         expected = sum([a * b for a, b in zip(x, y)])
         self.assertEqual(expected, m)
 
+
+    def test_scheme_sparse(self):
+        start = time.time()
+        n = 1000
+        x = [i for i in range(n)]
+        y = [0 for _ in range(n)]
+        for i in range(0, n, 25):
+            y[i] = 1 if i % 50 == 0 else -1
+        y[7] = 3
+        key = FeDDH.generate(n)
+        c = FeDDH.encrypt(x, key)
+        sk = FeDDH.keygen(y, key)
+        m = FeDDH.decrypt(c, key.get_public_key(), sk, (-100000, 100000))
+        end = time.time()
+
+        logging.info(f'FeDDH sparse function vector performance (n={n}, nonzero={len(sk.y_sparse)}): {end - start}s')
+
+        expected = sum([a * b for a, b in zip(x, y)])
+        self.assertEqual(expected, m)
@@ -3,7 +3,8 @@ import logging
 import json
 
 from tests.test_base import TestBase
-from mife.single.selective.lwe import FeLWE
+from mife.single.selective.lwe import FeLWE, _FeLWE_C_Compressed, _ciphertext_size
+from mife.single.lwe_params import preset
 
 
 class TestFeLWE(TestBase):
@@ -19,6 +20,78 @@ class TestFeLWE(TestBase):
         json.dumps(sk.export())
         json.dumps(key.get_public_key().export())
 
+    def test_scheme_seeded(self):
+        n = 10
+        x = [i - 10 for i in range(n)]
+        y = [i for i in range(n)]
+        key = FeLWE.generate(n, 4, 4, seed_A=True)
+        export = key.get_public_key().export()
+        json.dumps(export)
+        c = FeLWE.encrypt(x, key.get_public_key())
+        sk = FeLWE.keygen(y, key)
+        m = FeLWE.decrypt(c, key.get_public_key(), sk)
+
+        self.assertIsNone(export["A"])
+        self.assertEqual(key.seed.hex(), export["seed"])
+        self.assertEqual(sum([a * b for a, b in zip(x, y)]), m)
+
+    def test_encrypt_many(self):
+        n, batch = 20, 50
+        X = [[(i * j) % 16 for i in range(n)] for j in range(batch)]
+        y = [i - 10 for i in range(n)]
+        key = FeLWE.generate(n, 4, 4)
+        pub = key.get_public_key()
+        sk = FeLWE.keygen(y, key)
+
+        start1 = time.time()
+        [FeLWE.encrypt(x, pub) for x in X]
+        end1 = time.time()
+
+        start2 = time.time()
+        C = FeLWE.encrypt_many(X, pub)
+        end2 = time.time()
+
+        logging.info(f'Selective FeLWE encrypt (n={n}, batch={batch}) : one by one {end1 - start1}s, encrypt_many {end2 - start2}s')
+
+        json.dumps(C.export())
+        self.assertEqual(batch, len(C))
+        for i in range(batch):
+            self.assertEqual(sum([a * b for a, b in zip(X[i], y)]), FeLWE.decrypt(C[i], pub, sk))
+
+    def test_scheme_compressed(self):
+        n = 100
+        x = [i for i in range(n)]
+        y = [255 - i for i in range(n)]
+        key = preset("selective-medium").generate()
+        pub = key.get_public_key()
+        c = FeLWE.encrypt(x, pub)
+        sk = FeLWE.keygen(y, key)
+
+        compressed = FeLWE.compress(c, pub)
+        data = compressed.to_bytes()
+        restored = _FeLWE_C_Compressed.from_bytes(data, pub)
+        logging.info(f'Selective FeLWE compressed cipher text (n={n}): {len(data)} bytes, '
+                     f'uncompressed {_ciphertext_size(pub)} bytes')
+
+        self.assertLess(compressed.bits, pub.q.bit_length())
+        self.assertLess(len(data), _ciphertext_size(pub))
+        self.assertEqual(c.a_r, restored.a_r)
+        self.assertEqual(sum([a * b for a, b in zip(x, y)]), FeLWE.decrypt(restored, pub, sk))
+        json.dumps(compressed.export())
+
+    def test_compress_no_gain(self):
+        n = 10
+        x = [i for i in range(n)]
+        y = [15 - i for i in range(n)]
+        key = preset("selective-small").generate()
+        c = FeLWE.encrypt(x, key)
+        sk = FeLWE.keygen(y, key)
+
+        # The 16 byte header outweighs the bits saved on 10 entries
+        self.assertIs(c, FeLWE.compress(c, key))
+        self.assertIs(c, FeLWE.compress(c, key, y_bound=1 << 20))
+        self.assertEqual(sum([a * b for a, b in zip(x, y)]), FeLWE.decrypt(FeLWE.compress(c, key), key, sk))
+
     def test_scheme_1(self):
         start = time.time()
         n = 10
@@ -82,3 +82,15 @@ class TestFeDamgard(TestBase):
         expected = sum([a * b for a, b in zip(x, y)])
         self.assertEqual(expected, m)
 
+
+    def test_scheme_sparse(self):
+        n = 50
+        x = [i for i in range(n)]
+        y = [0 for _ in range(n)]
+        y[3], y[10], y[20] = 1, -1, -7
+        key = FeDamgard.generate(n)
+        c = FeDamgard.encrypt(x, key)
+        sk = FeDamgard.keygen(y, key)
+        m = FeDamgard.decrypt(c, key.get_public_key(), sk, (-1000, 1000))
+        self.assertEqual([(3, 1), (10, -1), (20, -7)], sk.y_sparse)
+        self.assertEqual(sum([a * b for a, b in zip(x, y)]), m)
@@ -3,7 +3,7 @@ import logging
 import json
 
 from tests.test_base import TestBase
-from mife.single.lwe import FeLWE
+from mife.single.lwe import FeLWE, _FeLWE_C_Compressed, _ciphertext_size
 
 
 class TestFeLWE(TestBase):
@@ -72,3 +72,68 @@ class TestFeLWE(TestBase):
         expected = sum([a * b for a, b in zip(x, y)])
         self.assertEqual(expected, m)
 
+
+    def test_scheme_seeded(self):
+        start = time.time()
+        n = 10
+        x = [i - 10 for i in range(n)]
+        y = [i for i in range(n)]
+        key = FeLWE.generate(n, 4, 4, seed_A=True)
+        pub = key.get_public_key()
+        c = FeLWE.encrypt(x, pub)
+        sk = FeLWE.keygen(y, key)
+        m = FeLWE.decrypt(c, pub, sk)
+        end = time.time()
+
+        logging.info(f'FeLWE seeded A performance (n={n}): {end - start}s')
+
+        expected = sum([a * b for a, b in zip(x, y)])
+        self.assertEqual(expected, m)
+        self.assertEqual(32, len(key.seed))
+        self.assertEqual(key.U.tolist(), ((key.msk @ pub.A) % key.q).tolist())
+
+    def test_scheme_many(self):
+        n, keys, batch = 10, 20, 20
+        X = [[(i * j) % 16 - 8 for i in range(n)] for j in range(batch)]
+        Y = [[(i + j) % 16 for i in range(n)] for j in range(keys)]
+        key = FeLWE.generate(n, 4, 4)
+        pub = key.get_public_key()
+        C = [FeLWE.encrypt(x, pub) for x in X]
+
+        start1 = time.time()
+        sks = [FeLWE.keygen(y, key) for y in Y]
+        res1 = [[FeLWE.decrypt(c, pub, sk) for c in C] for sk in sks]
+        end1 = time.time()
+
+        start2 = time.time()
+        sk_batch = FeLWE.keygen_many(Y, key)
+        res2 = FeLWE.decrypt_many(C, pub, sk_batch)
+        end2 = time.time()
+
+        logging.info(f'FeLWE keygen and decrypt (n={n}, {keys} keys x {batch} cipher texts) : one by one {end1 - start1}s, batched {end2 - start2}s')
+
+        expected = [[sum([a * b for a, b in zip(x, y)]) for x in X] for y in Y]
+        self.assertEqual(expected, res1)
+        self.assertEqual(expected, res2)
+        self.assertEqual(sks[3].Zy.tolist(), sk_batch[3].Zy.tolist())
+
+    def test_scheme_compressed(self):
+        n = 10
+        x = [i - 10 for i in range(n)]
+        y = [i for i in range(n)]
+        key = FeLWE.generate(n, 4, 4)
+        pub = key.get_public_key()
+        c = FeLWE.encrypt(x, pub)
+        sk = FeLWE.keygen(y, key)
+
+        compressed = FeLWE.compress(c, pub)
+        data = compressed.to_bytes()
+        logging.info(f'FeLWE compressed cipher text (n={n}): {len(data)} bytes, '
+                     f'uncompressed {_ciphertext_size(pub)} bytes')
+
+        expected = sum([a * b for a, b in zip(x, y)])
+        self.assertLess(len(data), _ciphertext_size(pub))
+        self.assertLess(compressed.bits1, compressed.bits0)
+        self.assertLess(compressed.bits0, pub.q.bit_length())
+        self.assertEqual(expected, FeLWE.decrypt(_FeLWE_C_Compressed.from_bytes(data, pub), pub, sk))
+        self.assertEqual([[expected]], FeLWE.decrypt_many([compressed], pub, FeLWE.keygen_many([y], key)))
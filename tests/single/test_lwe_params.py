@@ -0,0 +1,84 @@
+import os
+import time
+import logging
+import tempfile
+
+from tests.test_base import TestBase
+from mife.single.lwe_params import PRESETS, _PRESET_PRIMES, preset, lwe_params, largest_prime
+from mife.single.lwe import FeLWE
+from mife.single.selective.lwe import FeLWE as FeLWESelective
+
+
+class TestLWEParams(TestBase):
+
+    def test_preset_primes(self):
+        for bits, prime in _PRESET_PRIMES.items():
+            self.assertEqual(largest_prime(bits), prime)
+        for name in PRESETS:
+            params = preset(name)
+            logging.info(f'LWE preset {name}: public key {params.public_key_size()} bytes '
+                         f'({params.public_key_size(seed_A=True)} with seeded A), '
+                         f'cipher text {params.ciphertext_size()} bytes ({params.ciphertext_size(compressed=True)} compressed)')
+            self.assertLess(params.public_key_size(seed_A=True), params.public_key_size())
+            self.assertLessEqual(params.ciphertext_size(compressed=True), params.ciphertext_size())
+
+        # Only 10 entries of selective-small are compressed, too few to make up for the header
+        for name in ["adaptive-small", "adaptive-medium", "selective-medium", "selective-large"]:
+            params = preset(name)
+            self.assertLess(params.ciphertext_size(compressed=True), params.ciphertext_size())
+        params = preset("selective-small")
+        self.assertEqual(params.ciphertext_size(), params.ciphertext_size(compressed=True))
+
+    def test_preset_scheme(self):
+        n = 10
+        x = [i for i in range(n)]
+        y = [i + 1 for i in range(n)]
+
+        key = preset("selective-small").generate()
+        c = FeLWESelective.encrypt(x, key)
+        sk = FeLWESelective.keygen(y, key)
+        self.assertEqual(sum([a * b for a, b in zip(x, y)]), FeLWESelective.decrypt(c, key.get_public_key(), sk))
+
+        key = preset("adaptive-small").generate(seed_A=True)
+        c = FeLWE.encrypt(x, key.get_public_key())
+        sk = FeLWE.keygen(y, key)
+        self.assertEqual(sum([a * b for a, b in zip(x, y)]), FeLWE.decrypt(c, key.get_public_key(), sk))
+        self.assertEqual(preset("adaptive-small").q, key.q)
+
+    def test_params_mismatch(self):
+        with self.assertRaises(Exception):
+            FeLWESelective.generate(10, 4, 8, params=preset("selective-small"))
+        with self.assertRaises(Exception):
+            FeLWE.generate(10, 8, 4, params=preset("adaptive-small"))
+        with self.assertRaises(Exception):
+            FeLWE.generate(10, 4, 4, params=preset("selective-small"))
+        with self.assertRaises(Exception):
+            FeLWESelective.generate(10, 4, 4, n=8, params=preset("selective-small"))
+        with self.assertRaises(Exception):
+            FeLWE.generate(10, 4, 4, n=32, params=preset("adaptive-small"))
+        self.assertEqual(5, FeLWESelective.generate(10, 4, 4, n=5, params=preset("selective-small")).n)
+
+    def test_disk_cache(self):
+        old = os.environ.get("PYMIFE_CACHE")
+        with tempfile.TemporaryDirectory() as directory:
+            os.environ["PYMIFE_CACHE"] = directory
+            try:
+                start1 = time.time()
+                params = lwe_params("selective", 20, 9, 5)
+                end1 = time.time()
+                start2 = time.time()
+                cached = lwe_params("selective", 20, 9, 5)
+                end2 = time.time()
+                self.assertTrue(os.path.exists(os.path.join(directory, "lwe_primes.json")))
+            finally:
+                if old is None:
+                    del os.environ["PYMIFE_CACHE"]
+                else:
+                    os.environ["PYMIFE_CACHE"] = old
+
+        logging.info(f'LWE parameters (l=20): first {end1 - start1}s, from disk cache {end2 - start2}s')
+
+        self.assertEqual(params.q, cached.q)
+        self.assertEqual(params.p, cached.p)
+        key = FeLWESelective.generate(20, 9, 5, params=cached)
+        self.assertEqual(cached.q, key.q)
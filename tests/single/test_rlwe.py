@@ -0,0 +1,78 @@
+import time
+import logging
+import json
+
+from tests.test_base import TestBase
+from mife.single.rlwe import FeRLWE, _sigmas, SIGMA, FLOOD_BITS
+from mife.single.lwe_params import LWEParams
+
+
+class TestFeRLWE(TestBase):
+
+    def test_export(self):
+        n = 10
+        x = [i for i in range(n)]
+        key = FeRLWE.generate(n, 4, 4)
+        c = FeRLWE.encrypt(x, key)
+        sk = FeRLWE.keygen(x, key)
+        json.dumps(key.export())
+        json.dumps(c.export())
+        json.dumps(sk.export())
+        json.dumps(key.get_public_key().export())
+
+    def test_sigmas(self):
+        N, _, _ = FeRLWE.parameters(100, 8, 8)
+        sigma1, sigma2, sigma3 = _sigmas(100, N, 8)
+        # f1 floods the noise terms (e[i] * r - f0 * s[i])[0] by a factor 2^FLOOD_BITS
+        self.assertEqual(SIGMA, sigma2)
+        self.assertGreaterEqual(sigma1, 10 * 256)
+        self.assertGreater(sigma3, 2 ** FLOOD_BITS * (2 * N) ** 0.5 * sigma1 * sigma2)
+
+    def test_scheme_1(self):
+        start = time.time()
+        n = 10
+        x = [i - 10 for i in range(n)]
+        y = [i for i in range(n)]
+        key = FeRLWE.generate(n, 4, 4)
+        c = FeRLWE.encrypt(x, key)
+        sk = FeRLWE.keygen(y, key)
+        m = FeRLWE.decrypt(c, key.get_public_key(), sk)
+        end = time.time()
+
+        logging.info(f'FeRLWE test scheme 1 performance (n={n}): {end - start}s')
+
+        expected = sum([a * b for a, b in zip(x, y)])
+        self.assertEqual(expected, m)
+
+    def test_scheme_2(self):
+        start = time.time()
+        n = 200
+        x = [(i * 37) % 512 - 256 for i in range(n)]
+        y = [(i * 11) % 32 - 16 for i in range(n)]
+        key = FeRLWE.generate(n, 9, 5)
+        c = FeRLWE.encrypt(x, key)
+        sk = FeRLWE.keygen(y, key)
+        m = FeRLWE.decrypt(c, key.get_public_key(), sk)
+        end = time.time()
+
+        logging.info(f'FeRLWE test scheme 2 performance (n={n}): {end - start}s')
+
+        expected = sum([a * b for a, b in zip(x, y)])
+        self.assertEqual(expected, m)
+
+    def test_key_size(self):
+        n = 100
+        key = FeRLWE.generate(n, 8, 8)
+        c = FeRLWE.encrypt([1] * n, key)
+        rlwe_key = (key.a.size + key.pk.size) * 30 // 8
+        lwe_key = LWEParams.derive("adaptive", n, 8, 8).public_key_size()
+
+        start = time.time()
+        for _ in range(10):
+            FeRLWE.encrypt([1] * n, key)
+        end = time.time()
+
+        logging.info(f'FeRLWE (n={n}, N={key.N}): public key {rlwe_key} bytes against {lwe_key} for adaptive LWE, '
+                     f'cipher text {(c.ct0.size + c.c.size) * 30 // 8} bytes, encrypt {(end - start) / 10}s')
+
+        self.assertLess(rlwe_key * 2, lwe_key)
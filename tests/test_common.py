@@ -5,7 +5,12 @@ from mife.data.zmod_r import ZmodR
 from tests.test_base import TestBase
 from Crypto.Util.number import getStrongPrime
 from mife.data.matrix import Matrix
-from mife.common import invertible_matrix
+from mife.common import invertible_matrix, random_invertible_matrix, DiscreteLogTable, discrete_log_bound, small_mul, \
+    pack_ints, unpack_ints
+from mife.data.mod_matrix import ModMatrix
+from mife.data.zmod import Zmod
+from mife.data.fastecdsa_wrapper import WrapCurve
+from fastecdsa.curve import P256
 from secrets import randbelow
 from gmpy2 import powmod
 
@@ -35,3 +40,70 @@ class TestCommon(TestBase):
         self.assertEqual(A.determinant() * Ai.determinant(), 1)
         end1 = time.time()
         logging.info(f'invertible_matrix : {end1 - start1}s')
+
+    def test_random_invertible_matrix(self):
+        q = 101
+        n = 10
+        start1 = time.time()
+        A, Ai, det = random_invertible_matrix(q, n)
+        end1 = time.time()
+        identity = ModMatrix([[int(i == j) for j in range(n)] for i in range(n)], q)
+        self.assertEqual(A * Ai, identity)
+        self.assertEqual(Ai * A, identity)
+        self.assertEqual(A.determinant(), det)
+        logging.info(f'random_invertible_matrix : {end1 - start1}s')
+
+    def test_apply_func_parallel(self):
+        M = Matrix([[i - j for j in range(20)] for i in range(10)])
+        self.assertEqual(M.apply_func(abs), M.apply_func(abs, workers=2, chunksize=7))
+
+    def test_small_mul(self):
+        G = Zmod(getStrongPrime(512))
+        g = G.generator()
+        for k in [1, -1, 2, -3, 77, -(1 << 16) + 1, 1 << 20, -(1 << 20)]:
+            self.assertEqual(k * g, small_mul(g, k))
+
+    def test_small_mul_benchmark(self):
+        ks = [1, -1, 3, 255, -255, 40000] * 20
+        for name, G in [("Zmod-1024", Zmod(getStrongPrime(1024))), ("P256", WrapCurve(P256))]:
+            g = G.generator()
+
+            start1 = time.time()
+            res1 = [k * g for k in ks]
+            end1 = time.time()
+
+            start2 = time.time()
+            res2 = [small_mul(g, k) for k in ks]
+            end2 = time.time()
+
+            logging.info(f'{name} small coefficients ({len(ks)}) : scalar multiply {end1 - start1}s, '
+                         f'small_mul {end2 - start2}s')
+            self.assertEqual(res1, res2)
+
+    def test_pack_ints(self):
+        for bits in [1, 7, 8, 61, 139]:
+            values = [randbelow(1 << bits) for _ in range(100)]
+            data = pack_ints(values, bits)
+            self.assertEqual((100 * bits + 7) // 8, len(data))
+            self.assertEqual(values, unpack_ints(data, 100, bits))
+
+    def test_discrete_log_table(self):
+        G = Zmod(getStrongPrime(512))
+        g = G.generator()
+        table = DiscreteLogTable(g)
+        xs = [randbelow(2000000) - 1000000 for _ in range(10)]
+
+        start1 = time.time()
+        for x in xs:
+            self.assertEqual(table.log(x * g, (-1000000, 1000000)), x)
+        self.assertEqual(table.log(5 * g, (5, 5)), 5)
+        end1 = time.time()
+
+        start2 = time.time()
+        for x in xs:
+            self.assertEqual(discrete_log_bound(x * g, g, (-1000000, 1000000)), x)
+        end2 = time.time()
+
+        logging.info(f'discrete log table : {end1 - start1}s')
+        logging.info(f'discrete log kangaroo : {end2 - start2}s')
+